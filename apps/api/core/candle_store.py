@@ -0,0 +1,488 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import ccxt.async_support as ccxt_async
+
+from apps.api.core.config import settings
+from apps.api.core.single_flight import sync_flight
+from apps.api.utils.ohlcv_history import fetch_ohlcv_history, fetch_ohlcv_since
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+SeriesKey = Tuple[str, str, str]  # (exchange, symbol, timeframe)
+Gap = Tuple[int, int]  # (last stored ts before the gap, first stored ts after it)
+
+
+class CandleStore(ABC):
+    """
+    Persistent OHLCV candles keyed by (exchange, symbol, timeframe, timestamp).
+    Rows are ccxt-shaped lists [timestamp(ms), open, high, low, close, volume], oldest first.
+    """
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def write(self, key: SeriesKey, candles: List[list]) -> int:
+        """Upserts ``candles`` (a re-fetched forming candle replaces the stored one)."""
+        ...
+
+    @abstractmethod
+    async def read(self, key: SeriesKey, start: Optional[int] = None, end: Optional[int] = None,
+                   limit: Optional[int] = None) -> List[list]:
+        """Candles with start <= ts <= end; with ``limit``, the latest ``limit`` of them."""
+        ...
+
+    @abstractmethod
+    async def latest_timestamp(self, key: SeriesKey) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    async def find_gaps(self, key: SeriesKey, tf_ms: int, start: int, end: int) -> List[Gap]:
+        """Holes longer than one bar between consecutive stored candles in [start, end]."""
+        ...
+
+    @abstractmethod
+    async def count(self, key: SeriesKey, start: int, end: int) -> int:
+        """Number of stored candles with start <= ts < end."""
+        ...
+
+    @abstractmethod
+    async def read_page(self, key: SeriesKey, start: int, end: int, limit: int) -> List[list]:
+        """The first ``limit`` candles with start <= ts < end (oldest first)."""
+        ...
+
+    @abstractmethod
+    async def mark_complete(self, key: SeriesKey, start: int, end: int):
+        """Records that [start, end) was fully downloaded (missing bars in it are exchange downtime)."""
+        ...
+
+    @abstractmethod
+    async def is_complete(self, key: SeriesKey, start: int, end: int) -> bool:
+        """True if one range recorded by mark_complete covers [start, end)."""
+        ...
+
+    async def iter_range(self, key: SeriesKey, start: int, end: int, batch: int = 5000) -> AsyncIterator[List[list]]:
+        """Candles with start <= ts < end in pages of up to ``batch`` rows (keyset pagination on ts)."""
+        while start < end:
+            page = await self.read_page(key, start, end, batch)
+            if not page:
+                return
+            yield page
+            if len(page) < batch:
+                return
+            start = page[-1][0] + 1
+
+
+class SQLiteCandleStore(CandleStore):
+    """
+    Embedded backend for local runs: one SQLite file, accessed from a single worker thread
+    so the event loop never blocks on disk I/O and the connection is never shared.
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS candles (
+            exchange TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            open REAL, high REAL, low REAL, close REAL, volume REAL,
+            PRIMARY KEY (exchange, symbol, timeframe, ts)
+        ) WITHOUT ROWID
+        """,
+        # Fully downloaded [start_ts, end_ts) ranges (see mark_complete)
+        """
+        CREATE TABLE IF NOT EXISTS complete_ranges (
+            exchange TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            start_ts INTEGER NOT NULL,
+            end_ts INTEGER NOT NULL,
+            PRIMARY KEY (exchange, symbol, timeframe, start_ts, end_ts)
+        ) WITHOUT ROWID
+        """,
+    ]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="candle-store")
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._thread, fn, *args)
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+        return self._conn
+
+    async def start(self):
+        await self._call(self._connect)
+
+    async def close(self):
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._call(_close)
+
+    async def write(self, key: SeriesKey, candles: List[list]) -> int:
+        if not candles:
+            return 0
+
+        def _write():
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (exchange, symbol, timeframe, ts) DO UPDATE SET "
+                    "open = excluded.open, high = excluded.high, low = excluded.low, "
+                    "close = excluded.close, volume = excluded.volume",
+                    [(*key, int(c[0]), *c[1:6]) for c in candles],
+                )
+            return len(candles)
+        return await self._call(_write)
+
+    async def read(self, key: SeriesKey, start: Optional[int] = None, end: Optional[int] = None,
+                   limit: Optional[int] = None) -> List[list]:
+        def _read():
+            rows = self._connect().execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE exchange = ? AND symbol = ? AND timeframe = ? AND ts >= ? AND ts <= ? "
+                "ORDER BY ts DESC LIMIT ?",
+                (*key, start if start is not None else -2 ** 62, end if end is not None else 2 ** 62,
+                 limit if limit is not None else -1),
+            ).fetchall()
+            return [list(row) for row in reversed(rows)]
+        return await self._call(_read)
+
+    async def latest_timestamp(self, key: SeriesKey) -> Optional[int]:
+        def _latest():
+            row = self._connect().execute(
+                "SELECT MAX(ts) FROM candles WHERE exchange = ? AND symbol = ? AND timeframe = ?", key
+            ).fetchone()
+            return row[0]
+        return await self._call(_latest)
+
+    async def find_gaps(self, key: SeriesKey, tf_ms: int, start: int, end: int) -> List[Gap]:
+        def _gaps():
+            return [tuple(row) for row in self._connect().execute(
+                "SELECT ts, next_ts FROM ("
+                "  SELECT ts, LEAD(ts) OVER (ORDER BY ts) AS next_ts FROM candles"
+                "  WHERE exchange = ? AND symbol = ? AND timeframe = ? AND ts >= ? AND ts <= ?"
+                ") WHERE next_ts - ts > ?",
+                (*key, start, end, tf_ms),
+            )]
+        return await self._call(_gaps)
+
+    async def count(self, key: SeriesKey, start: int, end: int) -> int:
+        def _count():
+            return self._connect().execute(
+                "SELECT COUNT(*) FROM candles "
+                "WHERE exchange = ? AND symbol = ? AND timeframe = ? AND ts >= ? AND ts < ?",
+                (*key, start, end),
+            ).fetchone()[0]
+        return await self._call(_count)
+
+    async def read_page(self, key: SeriesKey, start: int, end: int, limit: int) -> List[list]:
+        def _page():
+            rows = self._connect().execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE exchange = ? AND symbol = ? AND timeframe = ? AND ts >= ? AND ts < ? "
+                "ORDER BY ts LIMIT ?",
+                (*key, start, end, limit),
+            ).fetchall()
+            return [list(row) for row in rows]
+        return await self._call(_page)
+
+    async def mark_complete(self, key: SeriesKey, start: int, end: int):
+        def _mark():
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO complete_ranges VALUES (?, ?, ?, ?, ?)", (*key, start, end))
+        await self._call(_mark)
+
+    async def is_complete(self, key: SeriesKey, start: int, end: int) -> bool:
+        def _complete():
+            return self._connect().execute(
+                "SELECT 1 FROM complete_ranges "
+                "WHERE exchange = ? AND symbol = ? AND timeframe = ? AND start_ts <= ? AND end_ts >= ? LIMIT 1",
+                (*key, start, end),
+            ).fetchone() is not None
+        return await self._call(_complete)
+
+
+class TimescaleCandleStore(CandleStore):
+    """
+    TimescaleDB backend (docker-compose ``db`` service): a ``candles`` hypertable partitioned
+    on the integer millisecond timestamp, accessed through an asyncpg pool.
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS candles (
+            exchange TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            ts BIGINT NOT NULL,
+            open DOUBLE PRECISION, high DOUBLE PRECISION, low DOUBLE PRECISION,
+            close DOUBLE PRECISION, volume DOUBLE PRECISION,
+            PRIMARY KEY (exchange, symbol, timeframe, ts)
+        )
+        """,
+        # 7-day chunks (in ms) on the integer time column
+        "SELECT create_hypertable('candles', 'ts', chunk_time_interval => 604800000, if_not_exists => TRUE)",
+        # Fully downloaded [start_ts, end_ts) ranges (see mark_complete)
+        """
+        CREATE TABLE IF NOT EXISTS complete_ranges (
+            exchange TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            start_ts BIGINT NOT NULL,
+            end_ts BIGINT NOT NULL,
+            PRIMARY KEY (exchange, symbol, timeframe, start_ts, end_ts)
+        )
+        """,
+    ]
+
+    def __init__(self, dsn: str):
+        if asyncpg is None:
+            raise RuntimeError("asyncpg is not installed (required for CANDLE_STORE=timescale)")
+        self.dsn = dsn
+        self._pool = None
+
+    async def start(self):
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=10)
+            async with self._pool.acquire() as conn:
+                for statement in self.SCHEMA:
+                    await conn.execute(statement)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def write(self, key: SeriesKey, candles: List[list]) -> int:
+        if not candles:
+            return 0
+        async with self._pool.acquire() as conn:
+            await conn.executemany(
+                "INSERT INTO candles VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9) "
+                "ON CONFLICT (exchange, symbol, timeframe, ts) DO UPDATE SET "
+                "open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low, "
+                "close = EXCLUDED.close, volume = EXCLUDED.volume",
+                [(*key, int(c[0]), *map(float, c[1:6])) for c in candles],
+            )
+        return len(candles)
+
+    async def read(self, key: SeriesKey, start: Optional[int] = None, end: Optional[int] = None,
+                   limit: Optional[int] = None) -> List[list]:
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE exchange = $1 AND symbol = $2 AND timeframe = $3 AND ts >= $4 AND ts <= $5 "
+                "ORDER BY ts DESC LIMIT $6",
+                *key, start if start is not None else -2 ** 62, end if end is not None else 2 ** 62, limit,
+            )
+        return [list(row) for row in reversed(rows)]
+
+    async def latest_timestamp(self, key: SeriesKey) -> Optional[int]:
+        async with self._pool.acquire() as conn:
+            return await conn.fetchval(
+                "SELECT MAX(ts) FROM candles WHERE exchange = $1 AND symbol = $2 AND timeframe = $3", *key
+            )
+
+    async def find_gaps(self, key: SeriesKey, tf_ms: int, start: int, end: int) -> List[Gap]:
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT ts, next_ts FROM ("
+                "  SELECT ts, LEAD(ts) OVER (ORDER BY ts) AS next_ts FROM candles"
+                "  WHERE exchange = $1 AND symbol = $2 AND timeframe = $3 AND ts >= $4 AND ts <= $5"
+                ") AS s WHERE next_ts - ts > $6",
+                *key, start, end, tf_ms,
+            )
+        return [(row["ts"], row["next_ts"]) for row in rows]
+
+    async def count(self, key: SeriesKey, start: int, end: int) -> int:
+        async with self._pool.acquire() as conn:
+            return await conn.fetchval(
+                "SELECT COUNT(*) FROM candles "
+                "WHERE exchange = $1 AND symbol = $2 AND timeframe = $3 AND ts >= $4 AND ts < $5",
+                *key, start, end,
+            )
+
+    async def read_page(self, key: SeriesKey, start: int, end: int, limit: int) -> List[list]:
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE exchange = $1 AND symbol = $2 AND timeframe = $3 AND ts >= $4 AND ts < $5 "
+                "ORDER BY ts LIMIT $6",
+                *key, start, end, limit,
+            )
+        return [list(row) for row in rows]
+
+    async def mark_complete(self, key: SeriesKey, start: int, end: int):
+        async with self._pool.acquire() as conn:
+            await conn.execute(
+                "INSERT INTO complete_ranges VALUES ($1, $2, $3, $4, $5) ON CONFLICT DO NOTHING",
+                *key, start, end,
+            )
+
+    async def is_complete(self, key: SeriesKey, start: int, end: int) -> bool:
+        async with self._pool.acquire() as conn:
+            return await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM complete_ranges "
+                "WHERE exchange = $1 AND symbol = $2 AND timeframe = $3 AND start_ts <= $4 AND end_ts >= $5)",
+                *key, start, end,
+            )
+
+
+def create_candle_store() -> Optional[CandleStore]:
+    """Backend from settings.CANDLE_STORE: "sqlite" (default), "timescale" or "none"."""
+    if settings.CANDLE_STORE == "timescale":
+        return TimescaleCandleStore(settings.DATABASE_URL)
+    if settings.CANDLE_STORE == "sqlite":
+        return SQLiteCandleStore(settings.CANDLE_STORE_PATH)
+    return None
+
+
+class CandleRepository:
+    """
+    Store-first OHLCV access for the routers.
+
+    A series is synced by fetching only the candles from the last stored timestamp onwards
+    (the stored forming candle is re-fetched and overwritten). While the stored forming
+    candle is current and was synced less than ``freshness`` seconds ago, reads are purely
+    local. Missing older history and holes inside the requested window are backfilled;
+    holes the exchange cannot fill (maintenance, delistings) are remembered and not retried.
+    Without a store (CANDLE_STORE=none) every call goes to the exchange.
+    """
+
+    def __init__(self, store: Optional[CandleStore], freshness: float = 5.0):
+        self.store = store
+        self.freshness = freshness
+        self._synced: Dict[SeriesKey, float] = {}
+        self._known_gaps: Set[Tuple[SeriesKey, int]] = set()
+        self._history_floor: Dict[SeriesKey, int] = {}
+        self._stats = {"local_reads": 0, "syncs": 0, "full_fetches": 0, "backfills": 0, "gap_fills": 0, "upstream_candles": 0}
+
+    async def start(self):
+        if self.store is not None:
+            try:
+                await self.store.start()
+            except Exception as e:
+                # The API keeps working straight from the exchange without a store
+                logger.warning(f"Candle store unavailable ({type(self.store).__name__}): {e}")
+                self.store = None
+
+    async def close(self):
+        if self.store is not None:
+            await self.store.close()
+
+    async def _write(self, key: SeriesKey, candles: List[list]):
+        self._stats["upstream_candles"] += len(candles)
+        await self.store.write(key, candles)
+
+    async def sync(self, key: SeriesKey, exchange, count: int) -> int:
+        """
+        Brings the stored tail of the series up to date; returns the bar size in ms.
+        Concurrent syncs of one series share a single upstream call.
+        """
+        return await sync_flight.do(key, self._sync, key, exchange, count)
+
+    async def _sync(self, key: SeriesKey, exchange, count: int) -> int:
+        exchange_id, symbol, timeframe = key
+        tf_ms = ccxt_async.Exchange.parse_timeframe(timeframe) * 1000
+        now_ms = int(time.time() * 1000)
+        last = await self.store.latest_timestamp(key)
+
+        if last is not None and now_ms < last + tf_ms and time.monotonic() - self._synced.get(key, 0.0) < self.freshness:
+            self._stats["local_reads"] += 1
+            return tf_ms
+
+        if last is None or (now_ms - last) // tf_ms > count:
+            # Nothing stored, or the stored tail is older than the window asked for
+            self._stats["full_fetches"] += 1
+            await self._write(key, await fetch_ohlcv_history(exchange, symbol, timeframe, count))
+        else:
+            self._stats["syncs"] += 1
+            await self._write(key, await fetch_ohlcv_since(exchange, symbol, timeframe, since=last))
+        self._synced[key] = time.monotonic()
+        return tf_ms
+
+    async def latest(self, key: SeriesKey, exchange, count: int) -> List[list]:
+        """The latest ``count`` candles of the series (fewer if the exchange has less history)."""
+        _, symbol, timeframe = key
+        if self.store is None:
+            return await fetch_ohlcv_history(exchange, symbol, timeframe, count)
+
+        tf_ms = await self.sync(key, exchange, count)
+        candles = await self.store.read(key, limit=count)
+        if candles and await self._fill_gaps(key, exchange, tf_ms, candles[0][0], candles[-1][0]):
+            candles = await self.store.read(key, limit=count)
+
+        missing = count - len(candles)
+        floor = self._history_floor.get(key)
+        if candles and missing > 0 and (floor is None or candles[0][0] > floor):
+            # Older history than what is stored was asked for: fetch just the bars before the oldest one
+            oldest = candles[0][0]
+            older = await fetch_ohlcv_since(exchange, symbol, timeframe, since=oldest - missing * tf_ms, until=oldest)
+            self._stats["backfills"] += 1
+            await self._write(key, older)
+            if len(older) < missing:
+                self._history_floor[key] = older[0][0] if older else oldest
+            candles = await self.store.read(key, limit=count)
+        return candles
+
+    async def since(self, key: SeriesKey, exchange, since: int) -> List[list]:
+        """Candles with ts >= ``since`` (the feature cache's tail refresh)."""
+        _, symbol, timeframe = key
+        if self.store is None:
+            return await fetch_ohlcv_since(exchange, symbol, timeframe, since=since)
+        tf_ms = ccxt_async.Exchange.parse_timeframe(timeframe) * 1000
+        await self.sync(key, exchange, count=max(1, (int(time.time() * 1000) - since) // tf_ms + 2))
+        return await self.store.read(key, start=since)
+
+    async def _fill_gaps(self, key: SeriesKey, exchange, tf_ms: int, start: int, end: int) -> int:
+        _, symbol, timeframe = key
+        filled = 0
+        for before, after in await self.store.find_gaps(key, tf_ms, start, end):
+            if (key, before) in self._known_gaps:
+                continue
+            candles = await fetch_ohlcv_since(exchange, symbol, timeframe, since=before + tf_ms, until=after)
+            if not candles:
+                self._known_gaps.add((key, before))
+                continue
+            await self._write(key, candles)
+            self._stats["gap_fills"] += 1
+            filled += len(candles)
+        return filled
+
+    def metrics(self) -> Dict:
+        return {"backend": type(self.store).__name__ if self.store else None, **self._stats}
+
+
+# Global repository (store opened / closed by the app lifespan)
+candle_repository = CandleRepository(create_candle_store(), freshness=settings.CANDLE_STORE_FRESHNESS)
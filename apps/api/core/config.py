@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import computed_field
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Metron Trading Platform"
@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "metron"
     
     REDIS_URL: str = "redis://localhost:6379"
+    # docker-compose sets the Redis service host; takes precedence over REDIS_URL when set
+    REDIS_HOST: Optional[str] = None
 
     # AI & Trading Config
     GEMINI_API_KEY: Optional[str] = None
@@ -24,6 +26,77 @@ class Settings(BaseSettings):
     MAX_DRAWDOWN: float = 20.0
     STRATEGY_MODE: str = "hybrid"
 
+    # Feature Engineering
+    # Relative seed weight below which EMA / Wilder indicators count as converged (?converged=true)
+    FEATURE_CONVERGENCE_TOLERANCE: float = 1e-3
+    # Where CPU-bound feature jobs run: "process", "thread" or "inline"
+    FEATURE_EXECUTOR: str = "process"
+    FEATURE_WORKERS: Optional[int] = None
+    FEATURE_MAX_PENDING: int = 32
+    FEATURE_JOB_TIMEOUT: float = 30.0
+    # Processed feature frames kept per (exchange, symbol, timeframe); LRU bounded by bytes
+    FEATURE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Seconds a cached frame is served without asking the exchange for newer candles
+    FEATURE_CACHE_TTL: float = 5.0
+
+    # Exchange client pool (one long-lived ccxt client per exchange and market type)
+    EXCHANGE_MARKET_TYPES: List[str] = ["spot"]
+    EXCHANGE_HEALTH_INTERVAL: float = 60.0
+    EXCHANGE_WARMUP_TIMEOUT: float = 30.0
+    # Consecutive failed health checks before a client is recreated
+    EXCHANGE_MAX_FAILURES: int = 3
+    # Seconds between market-metadata index rebuilds (load_markets reload)
+    MARKET_INDEX_REFRESH_INTERVAL: float = 3600.0
+
+    # OHLCV candle store: "sqlite" (embedded, local runs), "timescale" (DATABASE_URL) or "none"
+    CANDLE_STORE: str = "sqlite"
+    CANDLE_STORE_PATH: str = "data/candles.sqlite"
+    # Seconds a stored forming candle is served without syncing from the exchange
+    CANDLE_STORE_FRESHNESS: float = 5.0
+
+    # Seconds a coalesced (single-flight) result is reused by identical requests; 0 = in-flight only
+    SINGLE_FLIGHT_FRESHNESS: float = 1.0
+
+    # Deep-history range jobs: bars per chunk (one exchange page), chunks in flight, retries per chunk
+    HISTORY_CHUNK_BARS: int = 1000
+    HISTORY_CONCURRENCY: int = 4
+    HISTORY_RETRIES: int = 3
+
+    # Multi-exchange fan-out: default / maximum wait for the slowest exchange (seconds)
+    FANOUT_DEADLINE: float = 2.0
+    FANOUT_MAX_DEADLINE: float = 10.0
+
+    # Streamed responses: rows per encoded batch (one store page / one chunk on the wire)
+    STREAM_BATCH_ROWS: int = 5000
+
+    # Two-tier response cache (in-process LRU bounded by bytes, then Redis)
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Per-call Redis deadline; on error or timeout Redis is skipped for a while
+    RESPONSE_CACHE_REDIS_TIMEOUT: float = 0.25
+
+    # WebSocket fan-out: outbound messages queued per client, what to do when that queue is full
+    # ("drop_oldest", "coalesce" or "disconnect"), and seconds a single send may take
+    WS_QUEUE_SIZE: int = 256
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"
+    WS_SEND_TIMEOUT: float = 10.0
+    # Per-channel flush window (seconds) for coalescing / batching high-frequency updates; 0 = send immediately
+    WS_BATCH_INTERVALS: Dict[str, float] = {"pnl": 0.25, "status": 1.0}
+    # Log records kept in memory for /ws/logs (live stream + resume by sequence number)
+    LOG_BUFFER_SIZE: int = 10000
+    LOG_BUFFER_LEVEL: str = "INFO"
+
+    # Live market-data hub: "exchange" (ccxt.pro websockets, REST polling fallback) or "simulator"
+    MARKET_HUB_SOURCE: str = "exchange"
+    MARKET_HUB_POLL_INTERVAL: float = 2.0
+    MARKET_HUB_SIMULATOR_INTERVAL: float = 0.5
+    # Seconds a topic without subscribers keeps its upstream feed; subscriptions per connection
+    MARKET_HUB_LINGER: float = 30.0
+    MARKET_HUB_MAX_SUBSCRIPTIONS: int = 50
+
+    # Crypto trading-day status: poll the exchanges in this worker (False = follow the Redis mirror
+    # written by a polling worker). Exchanges and interval: CALENDAR_STATUS_EXCHANGES / _INTERVAL.
+    EXCHANGE_STATUS_POLL: bool = True
+
     @computed_field
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import ccxt.async_support as ccxt_async
+from fastapi import HTTPException
+
+from apps.api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# আমাদের সাপোর্টেড এক্সচেঞ্জ লিস্ট (ডাইনামিক + মেইনটেইনেবল)
+SUPPORTED_EXCHANGES = [
+    {"id": "binance", "name": "Binance", "ccxt_id": "binance"},
+    {"id": "bybit", "name": "Bybit", "ccxt_id": "bybit"},
+    {"id": "hyperliquid", "name": "Hyperliquid", "ccxt_id": "hyperliquid"},
+    {"id": "okx", "name": "OKX", "ccxt_id": "okx"},
+    {"id": "kucoin", "name": "KuCoin", "ccxt_id": "kucoin"},
+    {"id": "gate", "name": "Gate.io", "ccxt_id": "gate"},
+    {"id": "mexc", "name": "MEXC", "ccxt_id": "mexc"},
+    {"id": "bitget", "name": "Bitget", "ccxt_id": "bitget"},
+]
+
+ClientKey = Tuple[str, str]  # (exchange_id, market_type)
+
+
+class ExchangeNotSupported(Exception):
+    """Unknown exchange id, or the installed ccxt has no class for it."""
+
+
+class _Client:
+    """One pooled ccxt client plus its health bookkeeping."""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.markets_loaded = False
+        self.healthy = True
+        self.failures = 0
+        self.reconnects = 0
+        self.last_check: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class ExchangeClientPool:
+    """
+    Application-scoped ccxt async clients: one long-lived client per SUPPORTED_EXCHANGES
+    entry and market type (ccxt ``defaultType``), shared by every router.
+
+    Keeping the client keeps its HTTP session (no TLS setup per request), its rate
+    limiter and its loaded markets. ``start()`` warms the clients in the background;
+    a health loop pings each client and reconnects it after ``max_failures`` failed
+    checks. Replaced clients are closed after a grace period so in-flight calls finish.
+    """
+
+    def __init__(self, exchanges: List[Dict] = SUPPORTED_EXCHANGES, market_types: List[str] = ("spot",),
+                 health_interval: float = 60.0, warmup_timeout: float = 30.0, max_failures: int = 3,
+                 close_grace: float = 30.0):
+        self.exchanges = {e["id"]: e for e in exchanges}
+        self.market_types = list(market_types)
+        self.health_interval = health_interval
+        self.warmup_timeout = warmup_timeout
+        self.max_failures = max_failures
+        self.close_grace = close_grace
+        self._clients: Dict[ClientKey, _Client] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._retired: List[asyncio.Task] = []
+
+    @classmethod
+    def from_settings(cls) -> "ExchangeClientPool":
+        return cls(
+            market_types=settings.EXCHANGE_MARKET_TYPES,
+            health_interval=settings.EXCHANGE_HEALTH_INTERVAL,
+            warmup_timeout=settings.EXCHANGE_WARMUP_TIMEOUT,
+            max_failures=settings.EXCHANGE_MAX_FAILURES,
+        )
+
+    def _create(self, exchange_id: str, market_type: str):
+        exch = self.exchanges.get(exchange_id)
+        if not exch:
+            raise ExchangeNotSupported(f"Exchange not supported: {exchange_id}")
+        ccxt_id = exch["ccxt_id"]
+        if not hasattr(ccxt_async, ccxt_id):
+            raise ExchangeNotSupported(f"CCXT does not support {ccxt_id}")
+
+        exchange_class = getattr(ccxt_async, ccxt_id)
+        return exchange_class({
+            'enableRateLimit': True,  # খুব জরুরি!
+            'options': {'defaultType': market_type}  # Hyperliquid-এর জন্য adjust হতে পারে
+        })
+
+    def get(self, exchange_id: str, market_type: str = "spot"):
+        """
+        Shared ccxt client for (exchange_id, market_type), created on first use.
+        Callers must not close it.
+
+        Raises:
+            ExchangeNotSupported: Unknown exchange id or ccxt class.
+        """
+        key = (exchange_id, market_type)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = _Client(self._create(exchange_id, market_type))
+        return client.exchange
+
+    async def start(self):
+        """Creates every configured client and warms them (load_markets) in the background."""
+        if self._tasks:
+            return
+        for exchange_id in self.exchanges:
+            for market_type in self.market_types:
+                try:
+                    self.get(exchange_id, market_type)
+                except ExchangeNotSupported as e:
+                    logger.warning(str(e))
+        self._tasks = [
+            asyncio.create_task(self._warm_all(), name="exchange-warmup"),
+            asyncio.create_task(self._health_loop(), name="exchange-health"),
+        ]
+
+    async def close(self):
+        for task in self._tasks + self._retired:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retired, return_exceptions=True)
+        self._tasks, self._retired = [], []
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(c.exchange.close() for c in clients), return_exceptions=True)
+
+    async def _warm(self, key: ClientKey):
+        client = self._clients[key]
+        try:
+            await asyncio.wait_for(client.exchange.load_markets(), timeout=self.warmup_timeout)
+            client.markets_loaded = True
+        except Exception as e:
+            client.failures += 1
+            client.last_error = f"load_markets: {e}"
+            logger.warning(f"Warm-up failed for {key}: {e}")
+
+    async def _warm_all(self):
+        await asyncio.gather(*(self._warm(key) for key in list(self._clients)))
+
+    async def _ping(self, exchange):
+        if exchange.has.get('fetchTime'):
+            await exchange.fetch_time()
+        elif exchange.has.get('fetchStatus'):
+            await exchange.fetch_status()
+        else:
+            await exchange.load_markets()
+
+    async def check(self, key: ClientKey) -> bool:
+        """One health check; reconnects the client once ``max_failures`` checks failed in a row."""
+        client = self._clients.get(key)
+        if client is None:
+            return False
+        try:
+            await asyncio.wait_for(self._ping(client.exchange), timeout=self.warmup_timeout)
+            if not client.markets_loaded:
+                await asyncio.wait_for(client.exchange.load_markets(), timeout=self.warmup_timeout)
+                client.markets_loaded = True
+            client.failures = 0
+            client.healthy = True
+        except Exception as e:
+            client.failures += 1
+            client.last_error = str(e)
+            client.healthy = client.failures < self.max_failures
+        client.last_check = time.time()
+
+        if not client.healthy:
+            await self.reconnect(key)
+        return self._clients[key].healthy
+
+    async def reconnect(self, key: ClientKey):
+        """
+        Swaps in a fresh client (new session, markets reloaded); the old one closes after a grace period.
+        The new entry is healthy with a clean failure count once its markets load, unhealthy otherwise.
+        """
+        old = self._clients[key]
+        new = _Client(self._create(*key))
+        new.reconnects = old.reconnects + 1
+        self._clients[key] = new
+        self._retired.append(asyncio.create_task(self._close_later(old.exchange)))
+        logger.warning(f"Reconnected exchange client {key} after: {old.last_error}")
+        await self._warm(key)
+        new.last_check = time.time()
+        new.healthy = new.markets_loaded
+        if new.markets_loaded:
+            new.failures = 0
+            new.last_error = None
+
+    async def _close_later(self, exchange):
+        try:
+            await asyncio.sleep(self.close_grace)
+        finally:
+            await exchange.close()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(*(self.check(key) for key in list(self._clients)), return_exceptions=True)
+            self._retired = [t for t in self._retired if not t.done()]
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {
+            f"{exchange_id}:{market_type}": {
+                "healthy": c.healthy,
+                "marketsLoaded": c.markets_loaded,
+                "failures": c.failures,
+                "reconnects": c.reconnects,
+                "lastCheck": c.last_check,
+                "lastError": c.last_error,
+            }
+            for (exchange_id, market_type), c in self._clients.items()
+        }
+
+
+def get_exchange_instance(exchange_id: str, market_type: str = "spot"):
+    """Pooled client for a router. Shared and long-lived: do not close it."""
+    if exchange_id not in exchange_pool.exchanges:
+        raise HTTPException(status_code=404, detail="Exchange not supported")
+    try:
+        return exchange_pool.get(exchange_id, market_type)
+    except ExchangeNotSupported as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Global pool instance (started / closed by the app lifespan)
+exchange_pool = ExchangeClientPool.from_settings()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from apps.api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusy(Exception):
+    """Raised when the executor already holds ``max_pending`` jobs."""
+
+
+class FeatureExecutor:
+    """
+    Runs CPU-bound feature jobs (pandas / pandas_ta + serialization) off the event loop.
+
+    - kind: "process" (default, sidesteps the GIL), "thread", or "inline" (debugging only).
+    - max_pending: bound on queued + running jobs; extra submissions fail fast with ExecutorBusy.
+    - timeout: per-job deadline in seconds. A timed-out process job keeps its worker until it
+      finishes, but the request is released immediately.
+
+    Jobs must be picklable top-level functions when kind="process", unless they are run with
+    ``thread=True`` (a thread of this process, for jobs holding state such as a StreamEncoder).
+    """
+
+    def __init__(self, kind: str = "process", max_workers: Optional[int] = None,
+                 max_pending: int = 32, timeout: float = 30.0):
+        if kind not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool: Optional[Executor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None  # thread=True jobs when kind="process"
+        self._pending = 0
+        self._stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0,
+            "total_ms": 0.0, "max_ms": 0.0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "FeatureExecutor":
+        return cls(
+            kind=settings.FEATURE_EXECUTOR,
+            max_workers=settings.FEATURE_WORKERS,
+            max_pending=settings.FEATURE_MAX_PENDING,
+            timeout=settings.FEATURE_JOB_TIMEOUT,
+        )
+
+    def start(self):
+        if self._pool is not None or self.kind == "inline":
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="feature-job")
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="feature-job")
+        logger.info(f"Feature executor started ({self.kind}, {self.max_workers} workers)")
+
+    def shutdown(self):
+        for pool in (self._pool, self._threads):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._threads = None
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, thread: bool = False) -> Any:
+        """
+        Runs ``fn(*args)`` in the pool and awaits the result. With ``thread=True`` it runs in a
+        worker thread even when kind="process" (nothing is pickled; ``fn`` may mutate its arguments).
+
+        Raises:
+            ExecutorBusy: max_pending jobs are already queued or running.
+            asyncio.TimeoutError: The job exceeded its timeout.
+        """
+        if self._pending >= self.max_pending:
+            self._stats["rejected"] += 1
+            raise ExecutorBusy(f"Feature executor is saturated ({self._pending} jobs pending)")
+
+        self.start()
+        self._pending += 1
+        self._stats["submitted"] += 1
+        started = time.perf_counter()
+        try:
+            if self.kind == "inline":
+                result = fn(*args)
+            else:
+                loop = asyncio.get_running_loop()
+                pool = self._threads if thread and self._threads is not None else self._pool
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(pool, fn, *args),
+                    timeout=timeout or self.timeout,
+                )
+        except asyncio.TimeoutError:
+            self._stats["timed_out"] += 1
+            raise
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._pending -= 1
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats["completed"] += 1
+        self._stats["total_ms"] += elapsed_ms
+        self._stats["max_ms"] = max(self._stats["max_ms"], elapsed_ms)
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        completed = self._stats["completed"]
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "submitted": self._stats["submitted"],
+            "completed": completed,
+            "failed": self._stats["failed"],
+            "rejected": self._stats["rejected"],
+            "timed_out": self._stats["timed_out"],
+            "avg_ms": round(self._stats["total_ms"] / completed, 2) if completed else 0.0,
+            "max_ms": round(self._stats["max_ms"], 2),
+        }
+
+
+# Global executor instance (started / stopped by the app lifespan)
+feature_executor = FeatureExecutor.from_settings()
@@ -0,0 +1,95 @@
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+async def fan_out(
+    exchange_ids: Iterable[str],
+    fetch: Callable[[str], Awaitable[Any]],
+    deadline: float,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs ``fetch(exchange_id)`` for every exchange concurrently and waits at most ``deadline``
+    seconds in total, so the response time is bounded by the deadline rather than the sum of
+    the exchanges' latencies.
+
+    Returns:
+        dict: exchange_id -> {"ok": True, "latencyMs": ..., "data": ...}
+              or {"ok": False, "latencyMs": ..., "error": ...} for failures / timeouts.
+    """
+    started = time.perf_counter()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    async def run(exchange_id: str):
+        try:
+            data = await fetch(exchange_id)
+            results[exchange_id] = {"ok": True, "latencyMs": _elapsed_ms(started), "data": data}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            results[exchange_id] = {"ok": False, "latencyMs": _elapsed_ms(started),
+                                    "error": f"{type(e).__name__}: {e}"}
+
+    tasks = {exchange_id: asyncio.ensure_future(run(exchange_id)) for exchange_id in exchange_ids}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+    for exchange_id, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            results[exchange_id] = {"ok": False, "latencyMs": _elapsed_ms(started),
+                                    "error": f"Timeout: no response within {deadline}s"}
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return {exchange_id: results[exchange_id] for exchange_id in tasks}
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def ticker_consensus(tickers: Dict[str, Dict]) -> Optional[Dict[str, Any]]:
+    """
+    Cross-exchange view of tickers: median mid price, each exchange's deviation from it (bps)
+    and the best bid / ask across venues (a positive ``crossSpreadBps`` means the book is crossed).
+    """
+    mids = {}
+    for exchange_id, ticker in tickers.items():
+        bid, ask = ticker.get("bid"), ticker.get("ask")
+        price = (bid + ask) / 2 if bid and ask else ticker.get("last")
+        if price:
+            mids[exchange_id] = price
+    if not mids:
+        return None
+
+    median = statistics.median(mids.values())
+    bids = {e: t["bid"] for e, t in tickers.items() if t.get("bid")}
+    asks = {e: t["ask"] for e, t in tickers.items() if t.get("ask")}
+    consensus: Dict[str, Any] = {
+        "sources": len(mids),
+        "medianPrice": median,
+        "deviationBps": {e: round((p / median - 1) * 1e4, 2) for e, p in mids.items()},
+        "rangeBps": round((max(mids.values()) - min(mids.values())) / median * 1e4, 2),
+    }
+    if bids and asks:
+        best_bid = max(bids, key=bids.get)
+        best_ask = min(asks, key=asks.get)
+        consensus.update({
+            "bestBid": {"exchange": best_bid, "price": bids[best_bid]},
+            "bestAsk": {"exchange": best_ask, "price": asks[best_ask]},
+            "crossSpreadBps": round((bids[best_bid] - asks[best_ask]) / median * 1e4, 2),
+        })
+    return consensus
+
+
+def close_consensus(candles: Dict[str, List[list]]) -> Optional[Dict[str, Any]]:
+    """Median of the latest close per exchange and each exchange's deviation from it (bps)."""
+    closes = {exchange_id: rows[-1][4] for exchange_id, rows in candles.items() if rows}
+    if not closes:
+        return None
+    median = statistics.median(closes.values())
+    return {
+        "sources": len(closes),
+        "medianClose": median,
+        "deviationBps": {e: round((c / median - 1) * 1e4, 2) for e, c in closes.items()},
+        "rangeBps": round((max(closes.values()) - min(closes.values())) / median * 1e4, 2),
+    }
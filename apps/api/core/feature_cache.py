@@ -0,0 +1,173 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from apps.api.core.config import settings
+from apps.api.utils.incremental_features import IncrementalFeatureEngine
+from apps.api.utils.technical_features import FEATURE_COLUMNS, MarketFeatureProcessor
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+CacheKey = Tuple[str, str, str]  # (exchange, symbol, timeframe)
+
+# Past this many missed candles a full rebuild is cheaper (and fits one exchange page)
+MAX_TAIL_BARS = 100
+
+
+def ohlcv_frame(ohlcv: List[list]) -> pd.DataFrame:
+    # CCXT OHLCV structure: [timestamp, open, high, low, close, volume]
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+    df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df.set_index('datetime')
+
+
+class FeatureState:
+    """
+    Processed feature frame for one (exchange, symbol, timeframe) plus the incremental
+    engine state after its last *closed* candle.
+
+    ``frame`` holds the OHLCV columns and ``features``, computed by MarketFeatureProcessor;
+    the engine only appends later candles. The last row is the still-forming candle (ccxt
+    returns it last); it is previewed, never committed, so a later refresh can replace it.
+    ``frame`` keeps every row (warm-up rows hold NaNs) so any subset of ``features`` can be
+    served from it.
+    """
+
+    def __init__(self, engine: IncrementalFeatureEngine, frame: pd.DataFrame, last_closed_ts: int,
+                 features: List[str] = FEATURE_COLUMNS):
+        self.engine = engine
+        self.frame = frame
+        self.last_closed_ts = last_closed_ts
+        self.features = list(features)
+        self.refreshed_at = time.monotonic()
+        self.nbytes = self._measure()
+
+    @classmethod
+    def build(cls, ohlcv: List[list], features: Optional[List[str]] = None) -> 'FeatureState':
+        """
+        Full computation from raw candles (CPU-bound: run it in the feature executor).
+
+        The frame is computed for ``features`` only (default: all 17) by MarketFeatureProcessor;
+        the engine replays the closed candles so later ones can be appended in O(1).
+        """
+        df = ohlcv_frame(ohlcv)
+        processor = MarketFeatureProcessor(features)
+        frame = processor.add_technical_features(df, dropna=False)
+        engine = IncrementalFeatureEngine.from_frame(df.iloc[:-1])
+        return cls(engine, frame, int(df['timestamp'].iloc[-2]) if len(df) > 1 else -1, processor.features)
+
+    @property
+    def bars(self) -> int:
+        return len(self.frame)
+
+    @property
+    def last_timestamp(self) -> int:
+        return int(self.frame['timestamp'].iloc[-1])
+
+    def age(self) -> float:
+        return time.monotonic() - self.refreshed_at
+
+    def bars_behind(self, tf_ms: int, now_ms: Optional[int] = None) -> int:
+        """Candles opened since the cached forming bar (0 while it is still the latest)."""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        return max(0, (now_ms - self.last_timestamp) // tf_ms)
+
+    def apply(self, ohlcv: List[list]) -> int:
+        """
+        Appends newer candles: closed ones are committed to the engine (O(1) each), the last
+        one is previewed as the forming bar. Returns the number of newly closed candles.
+        """
+        new = [c for c in ohlcv if c[0] > self.last_closed_ts]
+        if not new:
+            self.refreshed_at = time.monotonic()
+            return 0
+
+        df = ohlcv_frame(new)
+        records = df.to_dict(orient='records')
+        rows = [self.engine.append(ts, candle) for ts, candle in zip(df.index[:-1], records[:-1])]
+        rows.append(self.engine.preview(df.index[-1], records[-1]))
+        tail = df.join(pd.DataFrame(rows, index=df.index, columns=FEATURE_COLUMNS)[self.features])
+
+        # Drop the previous forming bar (and anything it overlaps), keep the history length constant
+        kept = self.frame[self.frame['timestamp'] <= self.last_closed_ts]
+        self.frame = pd.concat([kept, tail]).iloc[-max(self.bars, len(tail)):]
+        self.last_closed_ts = int(df['timestamp'].iloc[-2]) if len(df) > 1 else self.last_closed_ts
+        self.refreshed_at = time.monotonic()
+        self.nbytes = self._measure()
+        return len(new) - 1
+
+    def _measure(self) -> int:
+        # Engine state is a few KB of fixed-size windows; the frame dominates
+        return int(self.frame.memory_usage(deep=True).sum()) + 8192
+
+
+class FeatureFrameCache:
+    """
+    In-process LRU of FeatureState entries, bounded by total memory (bytes).
+
+    An entry is reusable while it still describes the latest candle: within ``ttl`` seconds
+    it is served as-is, after that the caller fetches only candles newer than the entry's
+    last closed candle and applies them (tail update instead of a full recompute).
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 5.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[CacheKey, FeatureState]' = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "refreshes": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def from_settings(cls) -> 'FeatureFrameCache':
+        return cls(max_bytes=settings.FEATURE_CACHE_MAX_BYTES, ttl=settings.FEATURE_CACHE_TTL)
+
+    def get(self, key: CacheKey, min_bars: int = 0, features: Iterable[str] = ()) -> Optional[FeatureState]:
+        """Entry for ``key`` if it holds at least ``min_bars`` candles of history and every one of ``features``."""
+        state = self._entries.get(key)
+        if state is None or state.bars < min_bars or not set(features).issubset(state.features):
+            return None
+        self._entries.move_to_end(key)
+        return state
+
+    def put(self, key: CacheKey, state: FeatureState):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._entries[key] = state
+        self._bytes += state.nbytes
+        self._evict()
+
+    def resize(self, key: CacheKey, old_nbytes: int):
+        """Re-accounts an entry whose frame changed in place (after FeatureState.apply)."""
+        state = self._entries.get(key)
+        if state is not None:
+            self._bytes += state.nbytes - old_nbytes
+            self._evict()
+
+    def clear(self):
+        """Drops every entry."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def expire(self):
+        """Marks every entry older than ``ttl`` so its next use is a refresh (tail update)."""
+        for state in self._entries.values():
+            state.refreshed_at = 0.0
+
+    def record(self, outcome: str):
+        self._stats[outcome] += 1
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, state = self._entries.popitem(last=False)
+            self._bytes -= state.nbytes
+            self._stats["evictions"] += 1
+
+    def metrics(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes, **self._stats}
+
+
+# Global cache instance
+feature_cache = FeatureFrameCache.from_settings()
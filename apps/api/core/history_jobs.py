@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import ccxt.async_support as ccxt_async
+
+from apps.api.core.candle_store import CandleStore, SeriesKey, candle_repository
+from apps.api.core.config import settings
+from apps.api.utils.ohlcv_history import fetch_ohlcv_since
+
+logger = logging.getLogger(__name__)
+
+Chunk = Tuple[int, int]  # [start, end) in epoch ms
+
+
+class HistoryJob:
+    """
+    One deep-history download: [start, end) split into page-sized chunks that are fetched
+    concurrently and upserted into the candle store as each chunk completes.
+
+    Progress is tracked per chunk, so a failed or interrupted job resumes with only the
+    chunks that are not done yet. Downloaded chunks are recorded in the store (mark_complete),
+    and those or chunks it already fully covers are skipped, which also makes re-submitting a
+    range after a restart cheap, even across exchange downtime (bars that will never exist).
+    """
+
+    def __init__(self, key: SeriesKey, start: int, end: int, tf_ms: int, chunk_bars: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.start = start
+        self.end = end
+        self.tf_ms = tf_ms
+        self.chunks: List[Chunk] = [
+            (chunk_start, min(chunk_start + chunk_bars * tf_ms, end))
+            for chunk_start in range(start, end, chunk_bars * tf_ms)
+        ]
+        self.done: Dict[Chunk, int] = {}  # chunk -> candles written
+        self.failed: Dict[Chunk, str] = {}
+        self.error: Optional[str] = None  # Unexpected failure of the job itself
+        self.status = "pending"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def remaining(self) -> List[Chunk]:
+        return [chunk for chunk in self.chunks if chunk not in self.done]
+
+    def progress(self) -> Dict:
+        written = sum(self.done.values())
+        done = len(self.done)
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        eta = None
+        if self.status == "running" and done and elapsed:
+            eta = round(elapsed / done * (len(self.chunks) - done), 1)
+        exchange_id, symbol, timeframe = self.key
+        return {
+            "id": self.id,
+            "exchange": exchange_id,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "start": self.start,
+            "end": self.end,
+            "status": self.status,
+            "chunks": len(self.chunks),
+            "chunksDone": done,
+            "chunksFailed": len(self.failed),
+            "percent": round(100.0 * done / len(self.chunks), 2) if self.chunks else 100.0,
+            "candlesWritten": written,
+            "candlesPerSecond": round(written / elapsed, 1) if elapsed else 0.0,
+            "etaSeconds": eta,
+            "errors": list(self.failed.values())[:5],
+            "error": self.error,
+        }
+
+
+class HistoryJobManager:
+    """
+    Runs HistoryJobs. Chunks of one job are fetched with up to ``concurrency`` calls in flight;
+    the pooled ccxt client's own rate limiter (enableRateLimit) spaces the actual requests, so
+    the concurrency only keeps that limiter's queue full. Each chunk is retried with
+    exponential backoff before it is marked failed.
+    """
+
+    def __init__(self, concurrency: int = 4, chunk_bars: int = 1000, retries: int = 3, backoff: float = 1.0):
+        self.concurrency = concurrency
+        self.chunk_bars = chunk_bars
+        self.retries = retries
+        self.backoff = backoff
+        self.jobs: Dict[str, HistoryJob] = {}
+
+    @classmethod
+    def from_settings(cls) -> "HistoryJobManager":
+        return cls(
+            concurrency=settings.HISTORY_CONCURRENCY,
+            chunk_bars=settings.HISTORY_CHUNK_BARS,
+            retries=settings.HISTORY_RETRIES,
+        )
+
+    @property
+    def store(self) -> Optional[CandleStore]:
+        return candle_repository.store
+
+    def submit(self, key: SeriesKey, exchange, start: int, end: int) -> HistoryJob:
+        """
+        Creates and starts a job for [start, end).
+
+        Raises:
+            ValueError: Empty range, or no candle store is configured.
+        """
+        if self.store is None:
+            raise ValueError("Deep-history jobs need a candle store (CANDLE_STORE=sqlite or timescale)")
+        tf_ms = ccxt_async.Exchange.parse_timeframe(key[2]) * 1000
+        start = start // tf_ms * tf_ms
+        if end <= start:
+            raise ValueError("end must be after start")
+
+        job = HistoryJob(key, start, end, tf_ms, self.chunk_bars)
+        self.jobs[job.id] = job
+        self._launch(job, exchange)
+        return job
+
+    def resume(self, job_id: str, exchange) -> HistoryJob:
+        """Restarts a failed / cancelled job with its remaining chunks."""
+        job = self.jobs[job_id]
+        if job.status == "running":
+            return job
+        job.failed.clear()
+        self._launch(job, exchange)
+        return job
+
+    def _launch(self, job: HistoryJob, exchange):
+        job.status = "running"
+        job.started_at = job.started_at or time.time()
+        job.finished_at = None
+        job.error = None
+        job.task = asyncio.create_task(self._run(job, exchange), name=f"history-{job.id}")
+
+    async def _run(self, job: HistoryJob, exchange):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_chunk(chunk: Chunk):
+            async with semaphore:
+                await self._fetch_chunk(job, exchange, chunk)
+
+        try:
+            # return_exceptions: one chunk's unexpected error must not orphan its siblings
+            results = await asyncio.gather(
+                *(run_chunk(chunk) for chunk in job.remaining()), return_exceptions=True
+            )
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                job.error = f"{type(errors[0]).__name__}: {errors[0]}"
+            job.status = "failed" if job.failed or errors else "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+            logger.exception(f"History job {job.id} crashed")
+        finally:
+            job.finished_at = time.time()
+            logger.info(f"History job {job.id} {job.status}: {job.progress()['candlesWritten']} candles")
+
+    async def _fetch_chunk(self, job: HistoryJob, exchange, chunk: Chunk):
+        chunk_start, chunk_end = chunk
+        expected = (chunk_end - chunk_start) // job.tf_ms
+        _, symbol, timeframe = job.key
+        for attempt in range(self.retries + 1):
+            try:
+                # Store errors (locked SQLite, dropped connection) are retried like fetch errors
+                if (await self.store.is_complete(job.key, chunk_start, chunk_end)
+                        or await self.store.count(job.key, chunk_start, chunk_end) >= expected):
+                    job.done[chunk] = 0  # Already stored (earlier run of this or an overlapping job)
+                    job.failed.pop(chunk, None)
+                    return
+                # fetch_ohlcv_since caps the page size at the exchange's limit and paginates
+                candles = await fetch_ohlcv_since(
+                    exchange, symbol, timeframe, since=chunk_start, until=chunk_end, limit=expected
+                )
+                # Pages can overlap at their edges; the store upserts, so only sort + dedupe here
+                candles = sorted({c[0]: c for c in candles}.values(), key=lambda c: c[0])
+                await self.store.write(job.key, candles)
+                if chunk_end <= time.time() * 1000:
+                    # Every bar of the chunk has closed: whatever is missing never will exist
+                    await self.store.mark_complete(job.key, chunk_start, chunk_end)
+                job.done[chunk] = len(candles)
+                job.failed.pop(chunk, None)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.failed[chunk] = f"{chunk_start}: {e}"
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    def get(self, job_id: str) -> HistoryJob:
+        return self.jobs[job_id]
+
+    def metrics(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"jobs": len(self.jobs), **counts}
+
+    async def close(self):
+        tasks = [job.task for job in self.jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global manager (running jobs are cancelled by the app lifespan; resubmitting resumes them)
+history_jobs = HistoryJobManager.from_settings()
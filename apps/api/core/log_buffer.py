@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from apps.api.core.config import settings
+
+
+class LogBuffer(logging.Handler):
+    """
+    Logging handler that keeps the latest ``capacity`` records in a ring buffer, each with a
+    sequence number, for /ws/logs live streaming and resume-after-reconnect.
+
+    ``emit`` only stores under a lock and, at most once per burst, schedules a wake-up on
+    the event loop, so logging never blocks (from any thread) and memory stays bounded:
+    readers that fall more than ``capacity`` records behind see a gap instead. Record ``seq``
+    lives in slot ``seq % capacity``, so reads index straight to their cursor.
+    """
+
+    def __init__(self, capacity: int = 10000, level: int = logging.INFO):
+        super().__init__(level=level)
+        self.capacity = capacity
+        self._ring: List[Optional[Dict]] = [None] * capacity
+        self._lock = threading.Lock()
+        self._next_seq = 1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._wake_pending = False
+        self._exc_formatter = logging.Formatter()
+
+    @classmethod
+    def from_settings(cls) -> "LogBuffer":
+        return cls(capacity=settings.LOG_BUFFER_SIZE, level=logging.getLevelName(settings.LOG_BUFFER_LEVEL))
+
+    def install(self, logger: Optional[logging.Logger] = None):
+        """Attaches to ``logger`` (root by default) and binds live notifications to the running loop."""
+        logger = logger or logging.getLogger()
+        self._loop = asyncio.get_running_loop()
+        if self not in logger.handlers:
+            logger.addHandler(self)
+        if logger.getEffectiveLevel() > self.level:
+            logger.setLevel(self.level)
+
+    def uninstall(self, logger: Optional[logging.Logger] = None):
+        (logger or logging.getLogger()).removeHandler(self)
+        self._loop = None
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        """Oldest seq still buffered (== next seq while empty)."""
+        return max(1, self._next_seq - self.capacity)
+
+    def _slice(self, lo: int, hi: int) -> List[Dict]:
+        """Records with lo <= seq < hi (all still buffered); caller holds the lock."""
+        if hi <= lo:
+            return []
+        a, b = lo % self.capacity, hi % self.capacity
+        if a < b:
+            return self._ring[a:b]
+        return self._ring[a:] + self._ring[:b]
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message = f"{message}\n{self._exc_formatter.formatException(record.exc_info)}"
+            with self._lock:
+                self._ring[self._next_seq % self.capacity] = {
+                    "seq": self._next_seq,
+                    "ts": record.created,
+                    "level": record.levelname,
+                    "levelno": record.levelno,
+                    "category": record.name,
+                    "message": message,
+                }
+                self._next_seq += 1
+                wake = not self._wake_pending
+                self._wake_pending = True
+            if wake:
+                self._schedule_wake()
+        except Exception:
+            self.handleError(record)
+
+    def _schedule_wake(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._wake_pending = False
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.call_soon(self._wake)
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        self._wake_pending = False
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def wait(self, after_seq: int, timeout: Optional[float] = None):
+        """Returns once a record newer than ``after_seq`` exists (or after ``timeout``)."""
+        if self.last_seq > after_seq:
+            return
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._waiter), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def since(
+        self,
+        after_seq: int,
+        min_level: int = logging.NOTSET,
+        categories: Sequence[str] = (),
+        limit: int = 1000,
+    ) -> Tuple[List[Dict], int, Optional[Tuple[int, int]]]:
+        """
+        Records after ``after_seq`` matching the filters (at most ``limit`` of them).
+
+        Args:
+            min_level: Minimum level number (logging.INFO, ...).
+            categories: Logger name prefixes; empty matches every logger.
+
+        Returns:
+            (records, cursor, gap): cursor is the last scanned seq to resume from; gap is
+            (first missing, last missing) when records after ``after_seq`` were already overwritten.
+            A cursor from before a restart (ahead of the newest record) replays the whole buffer.
+        """
+        with self._lock:
+            if self._next_seq == 1:
+                return [], after_seq, None
+            first = self.first_seq
+            if after_seq >= self._next_seq:
+                after_seq = first - 1
+            gap = (after_seq + 1, first - 1) if after_seq + 1 < first else None
+            lo = max(after_seq + 1, first)
+            window = self._slice(lo, min(lo + limit, self._next_seq))
+        cursor = window[-1]["seq"] if window else max(after_seq, first - 1)
+        matched = [
+            r for r in window
+            if r["levelno"] >= min_level and (not categories or r["category"].startswith(tuple(categories)))
+        ]
+        return matched, cursor, gap
+
+    def metrics(self) -> Dict:
+        return {
+            "capacity": self.capacity,
+            "records": min(self.capacity, self._next_seq - 1),
+            "firstSeq": self.first_seq,
+            "lastSeq": self.last_seq,
+            "level": logging.getLevelName(self.level),
+        }
+
+
+# Global buffer (installed on the root logger by the app lifespan)
+log_buffer = LogBuffer.from_settings()
@@ -0,0 +1,298 @@
+import asyncio
+import json
+import logging
+import time
+import zlib
+from typing import AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+import ccxt.async_support as ccxt_async
+import numpy as np
+
+from apps.api.core.config import settings
+from apps.api.core.exchanges import SUPPORTED_EXCHANGES, exchange_pool
+
+try:
+    import ccxt.pro as ccxt_pro
+except ImportError:
+    ccxt_pro = None
+
+logger = logging.getLogger(__name__)
+
+TopicKey = Tuple[str, str, str]  # (exchange, symbol, stream): stream is "ticker", "book" or "ohlcv:<timeframe>"
+
+# Subscriber callback: receives the already serialized update
+Subscriber = Callable[[str], None]
+
+BOOK_DEPTH = 20
+
+
+def parse_stream(stream: str) -> Tuple[str, Optional[str]]:
+    """
+    "ticker" / "book" / "ohlcv:1m" -> (kind, timeframe).
+
+    Raises:
+        ValueError: Unknown stream.
+    """
+    kind, _, timeframe = stream.partition(":")
+    if kind in ("ticker", "book") and not timeframe:
+        return kind, None
+    if kind == "ohlcv" and timeframe:
+        return kind, timeframe
+    raise ValueError(f"Unknown stream: {stream} (ticker, book or ohlcv:<timeframe>)")
+
+
+def normalize(kind: str, raw) -> Dict:
+    """ccxt ticker / order book / OHLCV rows -> the compact payload sent to clients."""
+    if kind == "ticker":
+        return {k: raw.get(k) for k in ("bid", "ask", "last", "baseVolume", "timestamp")}
+    if kind == "book":
+        return {"bids": raw["bids"][:BOOK_DEPTH], "asks": raw["asks"][:BOOK_DEPTH], "timestamp": raw.get("timestamp")}
+    return {"candle": list(raw[-1]) if raw else None}
+
+
+class SimulatorFeed:
+    """
+    Local, deterministic market data: a seeded random walk per topic (the seed is derived
+    from the topic key), so the same topic always replays the same price path. Used for
+    tests, demos and offline development (MARKET_HUB_SOURCE=simulator).
+    """
+
+    def __init__(self, interval: float = 0.5, seed: int = 0, start_price: float = 100.0, tf_ms: int = 60_000):
+        self.interval = interval
+        self.seed = seed
+        self.start_price = start_price
+        self.tf_ms = tf_ms
+
+    def updates(self, key: TopicKey) -> AsyncIterator[Dict]:
+        return self._walk(key)
+
+    async def _walk(self, key: TopicKey) -> AsyncIterator[Dict]:
+        kind, timeframe = parse_stream(key[2])
+        rng = np.random.default_rng([self.seed, zlib.crc32("/".join(key[:2]).encode())])
+        tf_ms = ccxt_async.Exchange.parse_timeframe(timeframe) * 1000 if timeframe else self.tf_ms
+        price = self.start_price
+        candle = None
+        while True:
+            now = int(time.time() * 1000)
+            price *= float(np.exp(rng.normal(0, 0.001)))
+            spread = price * 0.0002
+            volume = float(rng.uniform(0.1, 5.0))
+            if kind == "ticker":
+                yield {"bid": price - spread / 2, "ask": price + spread / 2, "last": price,
+                       "baseVolume": volume, "timestamp": now}
+            elif kind == "book":
+                steps = np.arange(1, BOOK_DEPTH + 1) * spread
+                sizes = rng.uniform(0.1, 10.0, size=(2, BOOK_DEPTH))
+                yield {"bids": [[price - s, float(a)] for s, a in zip(steps, sizes[0])],
+                       "asks": [[price + s, float(a)] for s, a in zip(steps, sizes[1])],
+                       "timestamp": now}
+            else:
+                bar_ts = now // tf_ms * tf_ms
+                if candle is None or candle[0] != bar_ts:
+                    candle = [bar_ts, price, price, price, price, 0.0]
+                candle = [bar_ts, candle[1], max(candle[2], price), min(candle[3], price), price, candle[5] + volume]
+                yield {"candle": list(candle)}
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        pass
+
+
+class ExchangeFeed:
+    """
+    Upstream exchange data: ccxt.pro websocket streams (watch_ticker / watch_order_book /
+    watch_ohlcv) on one shared pro client per exchange, or, when ccxt.pro is unavailable,
+    REST polling through the pooled clients every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, poll_interval: float = 2.0, use_pro: bool = True):
+        self.poll_interval = poll_interval
+        self.use_pro = use_pro and ccxt_pro is not None
+        self._pro_clients: Dict[str, object] = {}
+
+    def _pro(self, exchange_id: str):
+        """Shared ccxt.pro client (one websocket connection multiplexes all its topics), or None."""
+        client = self._pro_clients.get(exchange_id)
+        if client is None:
+            ccxt_id = next((e["ccxt_id"] for e in SUPPORTED_EXCHANGES if e["id"] == exchange_id), None)
+            if not self.use_pro or not hasattr(ccxt_pro, ccxt_id or ""):
+                return None
+            client = self._pro_clients[exchange_id] = getattr(ccxt_pro, ccxt_id)({'enableRateLimit': True})
+        return client
+
+    def updates(self, key: TopicKey) -> AsyncIterator[Dict]:
+        exchange_id, symbol, stream = key
+        kind, timeframe = parse_stream(stream)
+        pro = self._pro(exchange_id)
+        if pro is not None:
+            return self._watch(pro, kind, symbol, timeframe)
+        return self._poll(exchange_pool.get(exchange_id), kind, symbol, timeframe)
+
+    async def _watch(self, client, kind: str, symbol: str, timeframe: Optional[str]) -> AsyncIterator[Dict]:
+        while True:
+            if kind == "ticker":
+                raw = await client.watch_ticker(symbol)
+            elif kind == "book":
+                raw = await client.watch_order_book(symbol, BOOK_DEPTH)
+            else:
+                raw = await client.watch_ohlcv(symbol, timeframe)
+            yield normalize(kind, raw)
+
+    async def _poll(self, client, kind: str, symbol: str, timeframe: Optional[str]) -> AsyncIterator[Dict]:
+        while True:
+            if kind == "ticker":
+                raw = await client.fetch_ticker(symbol)
+            elif kind == "book":
+                raw = await client.fetch_order_book(symbol, BOOK_DEPTH)
+            else:
+                raw = await client.fetch_ohlcv(symbol, timeframe, limit=2)
+            yield normalize(kind, raw)
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self):
+        clients = list(self._pro_clients.values())
+        self._pro_clients.clear()
+        await asyncio.gather(*(c.close() for c in clients), return_exceptions=True)
+
+
+class Topic:
+    """One upstream stream: latest value, sequence number, subscribers and the feed task."""
+
+    def __init__(self, key: TopicKey):
+        self.key = key
+        self.seq = 0
+        self.latest: Optional[Dict] = None
+        self.subscribers: Set[Subscriber] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.idle_since: Optional[float] = None
+        self.updates = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def message(self, kind: str, data: Dict) -> str:
+        exchange_id, symbol, stream = self.key
+        return json.dumps({"type": kind, "exchange": exchange_id, "symbol": symbol, "stream": stream,
+                           "seq": self.seq, "data": data})
+
+
+class MarketDataHub:
+    """
+    Shares one upstream feed per (exchange, symbol, stream) between any number of subscribers.
+
+    The first subscriber starts the feed, later ones get the cached latest value as a snapshot
+    and then the same updates; each update is serialized once for all of them. A topic without
+    subscribers keeps its feed for ``linger`` seconds (viewers switching pages) before it stops,
+    so upstream connections scale with distinct topics, not with viewers.
+    """
+
+    def __init__(self, feed, linger: float = 30.0, retry_backoff: float = 1.0, max_backoff: float = 30.0):
+        self.feed = feed
+        self.linger = linger
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.topics: Dict[TopicKey, Topic] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "MarketDataHub":
+        if settings.MARKET_HUB_SOURCE == "simulator":
+            feed = SimulatorFeed(interval=settings.MARKET_HUB_SIMULATOR_INTERVAL)
+        else:
+            feed = ExchangeFeed(poll_interval=settings.MARKET_HUB_POLL_INTERVAL)
+        return cls(feed, linger=settings.MARKET_HUB_LINGER)
+
+    def subscribe(self, key: TopicKey, subscriber: Subscriber) -> Optional[str]:
+        """
+        Adds ``subscriber`` to the topic (starting its feed if needed).
+
+        Returns:
+            The serialized snapshot of the latest value, or None before the first update.
+
+        Raises:
+            ValueError: Unknown exchange or stream.
+        """
+        parse_stream(key[2])
+        if key[0] not in exchange_pool.exchanges:
+            raise ValueError(f"Exchange not supported: {key[0]}")
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = self.topics[key] = Topic(key)
+        topic.subscribers.add(subscriber)
+        topic.idle_since = None
+        if topic.task is None or topic.task.done():
+            topic.task = asyncio.create_task(self._run(topic), name=f"hub-{'/'.join(key)}")
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_loop(), name="hub-reaper")
+        return topic.message("snapshot", topic.latest) if topic.latest is not None else None
+
+    def unsubscribe(self, key: TopicKey, subscriber: Subscriber):
+        topic = self.topics.get(key)
+        if topic is None:
+            return
+        topic.subscribers.discard(subscriber)
+        if not topic.subscribers:
+            topic.idle_since = time.monotonic()
+
+    async def _run(self, topic: Topic):
+        backoff = self.retry_backoff
+        while True:
+            try:
+                async for data in self.feed.updates(topic.key):
+                    self.publish(topic, data)
+                    backoff = self.retry_backoff
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                topic.errors += 1
+                topic.last_error = str(e)
+                logger.warning(f"Market feed {topic.key} failed, retrying in {backoff:.0f}s: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def publish(self, topic: Topic, data: Dict):
+        topic.seq += 1
+        topic.updates += 1
+        topic.latest = data
+        text = topic.message("update", data)
+        for subscriber in list(topic.subscribers):
+            subscriber(text)
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(max(self.linger / 2, 1.0))
+            now = time.monotonic()
+            for key, topic in list(self.topics.items()):
+                if topic.idle_since is not None and now - topic.idle_since >= self.linger:
+                    await self._stop(key)
+
+    async def _stop(self, key: TopicKey):
+        topic = self.topics.pop(key, None)
+        if topic is not None and topic.task is not None:
+            topic.task.cancel()
+            await asyncio.gather(topic.task, return_exceptions=True)
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        for key in list(self.topics):
+            await self._stop(key)
+        await self.feed.close()
+
+    def metrics(self) -> Dict:
+        return {
+            "source": type(self.feed).__name__,
+            "topics": len(self.topics),
+            "upstreams": sum(1 for t in self.topics.values() if t.task is not None and not t.task.done()),
+            "subscribers": sum(len(t.subscribers) for t in self.topics.values()),
+            "byTopic": {
+                "/".join(key): {"subscribers": len(t.subscribers), "updates": t.updates, "errors": t.errors,
+                                "lastError": t.last_error}
+                for key, t in self.topics.items()
+            },
+        }
+
+
+# Global hub (closed by the app lifespan)
+market_hub = MarketDataHub.from_settings()
@@ -0,0 +1,202 @@
+import asyncio
+import base64
+import bisect
+import logging
+import time
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+from apps.api.core.config import settings
+from apps.api.core.exchanges import exchange_pool
+
+logger = logging.getLogger(__name__)
+
+# 'futures' is the UI-facing umbrella for every derivative contract type
+MARKET_TYPES = ("spot", "swap", "future", "option")
+DERIVATIVE_TYPES = ("swap", "future", "option")
+
+
+def encode_cursor(symbol: str) -> str:
+    return base64.urlsafe_b64encode(symbol.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded.encode()).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+class MarketIndex:
+    """
+    Immutable, query-ready snapshot of one exchange's markets.
+
+    Rows are sorted by symbol (that order is also the pagination order). Prefix search uses
+    bisect over sorted lowercase keys of symbol / base / quote; substring search runs
+    np.char.find over one precomputed lowercase string per row; filters are precomputed boolean masks.
+    """
+
+    def __init__(self, markets: Mapping[str, Dict]):
+        self.built_at = time.time()
+        self.rows: List[Dict] = []
+        for symbol in sorted(markets):
+            info = markets[symbol]
+            market_type = info.get("type") or ("spot" if info.get("spot", False) else "swap")
+            self.rows.append({
+                "symbol": symbol,
+                "base": info.get("base") or "",
+                "quote": info.get("quote") or "",
+                "type": market_type,
+                "active": info.get("active") is not False,  # ccxt uses None for "unknown"
+            })
+        self.symbols = [row["symbol"] for row in self.rows]
+
+        self._prefix_keys = {}
+        for field in ("symbol", "base", "quote"):
+            pairs = sorted((row[field].lower(), i) for i, row in enumerate(self.rows))
+            self._prefix_keys[field] = ([key for key, _ in pairs], np.array([i for _, i in pairs], dtype=np.int64))
+        self._haystack = np.array([f"{row['symbol']}\n{row['base']}\n{row['quote']}".lower() for row in self.rows],
+                                  dtype=str)
+
+        types = np.array([row["type"] for row in self.rows], dtype=object)
+        self._type_masks = {t: types == t for t in MARKET_TYPES}
+        self._type_masks["futures"] = np.isin(types, DERIVATIVE_TYPES)
+        self._active = np.array([row["active"] for row in self.rows], dtype=bool)
+        quotes = np.array([row["quote"].upper() for row in self.rows], dtype=object)
+        self._quote_masks = {q: quotes == q for q in set(quotes)}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _search_mask(self, q: str, match: str) -> np.ndarray:
+        q = q.lower()
+        if match == "substring":
+            return np.char.find(self._haystack, q) >= 0
+        mask = np.zeros(len(self.rows), dtype=bool)
+        for keys, order in self._prefix_keys.values():
+            lo = bisect.bisect_left(keys, q)
+            hi = bisect.bisect_left(keys, q + "\uffff")
+            mask[order[lo:hi]] = True
+        return mask
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        match: str = "prefix",
+        market_type: Optional[str] = None,
+        active: Optional[bool] = None,
+        quote: Optional[str] = None,
+        limit: int = 500,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """
+        Filters and paginates the index.
+
+        Args:
+            q: Search text, matched case-insensitively against symbol, base and quote.
+            match: "prefix" (default) or "substring".
+            market_type: spot / swap / future / option, or "futures" for any derivative.
+            active: Keep only active (True) or inactive (False) markets.
+            quote: Quote asset, e.g. "USDT".
+            limit: Page size.
+            cursor: ``next_cursor`` of the previous page.
+
+        Returns:
+            dict: {"markets": [...], "total": matches over all pages, "next_cursor": str | None}
+
+        Raises:
+            ValueError: Unknown market type / match mode, or a malformed cursor.
+        """
+        mask = np.ones(len(self.rows), dtype=bool)
+        if q:
+            if match not in ("prefix", "substring"):
+                raise ValueError(f"Unknown match mode: {match}")
+            mask &= self._search_mask(q, match)
+        if market_type:
+            if market_type not in self._type_masks:
+                raise ValueError(f"Unknown market type: {market_type}. Available: {sorted(self._type_masks)}")
+            mask &= self._type_masks[market_type]
+        if active is not None:
+            mask &= self._active if active else ~self._active
+        if quote:
+            quote_mask = self._quote_masks.get(quote.upper())
+            if quote_mask is None:
+                mask[:] = False
+            else:
+                mask &= quote_mask
+
+        matches = np.flatnonzero(mask)
+        start = 0
+        if cursor:
+            # Cursors are symbols, so they stay valid across index refreshes
+            position = bisect.bisect_right(self.symbols, decode_cursor(cursor))
+            start = int(np.searchsorted(matches, position))
+        page = matches[start:start + limit]
+        has_more = start + limit < len(matches)
+        return {
+            "markets": [self.rows[i] for i in page],
+            "total": int(len(matches)),
+            "next_cursor": encode_cursor(self.rows[page[-1]]["symbol"]) if has_more and len(page) else None,
+        }
+
+
+class MarketIndexService:
+    """
+    Per-exchange MarketIndex snapshots built from the pooled clients' markets.
+
+    An index is built on first use (from markets the pool has usually already loaded) and
+    then rebuilt every ``refresh_interval`` seconds with load_markets(reload=True).
+    Queries never wait on a refresh: the old snapshot is served until the new one is swapped in.
+    """
+
+    def __init__(self, refresh_interval: float = 3600.0):
+        self.refresh_interval = refresh_interval
+        self._indexes: Dict[str, MarketIndex] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self, exchange_id: str) -> MarketIndex:
+        index = self._indexes.get(exchange_id)
+        if index is not None:
+            return index
+        lock = self._locks.setdefault(exchange_id, asyncio.Lock())
+        async with lock:
+            if exchange_id not in self._indexes:
+                await self.refresh(exchange_id, reload=False)
+        return self._indexes[exchange_id]
+
+    async def refresh(self, exchange_id: str, reload: bool = True):
+        exchange = exchange_pool.get(exchange_id)
+        markets = await exchange.load_markets(reload=reload)
+        self._indexes[exchange_id] = MarketIndex(markets)
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            for exchange_id in list(self._indexes):
+                try:
+                    await self.refresh(exchange_id)
+                except Exception as e:
+                    logger.warning(f"Market index refresh failed for {exchange_id}: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop(), name="market-index-refresh")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {
+            exchange_id: {"markets": len(index), "builtAt": index.built_at}
+            for exchange_id, index in self._indexes.items()
+        }
+
+
+# Global service instance (started / closed by the app lifespan)
+market_index = MarketIndexService(refresh_interval=settings.MARKET_INDEX_REFRESH_INTERVAL)
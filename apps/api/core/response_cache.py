@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from apps.api.core.config import settings
+from apps.api.core.single_flight import SingleFlight
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[bytes]]
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value: bytes, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class ResponseCache:
+    """
+    Two-tier cache for encoded response bodies: an in-process LRU (bounded by bytes) in front
+    of Redis (redis.asyncio, shared by every worker).
+
+    Entries are fresh for ``ttl`` seconds and may then be served stale for ``stale_ttl`` more
+    while one background task reloads them (stale-while-revalidate). Misses are coalesced, so
+    N concurrent requests for a cold key run the loader once.
+
+    Redis is optional: it is skipped when the client is not installed, and for
+    ``redis_backoff`` seconds after any error or timeout, so a down Redis never adds
+    more than one ``redis_timeout`` to a request.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, redis_url: Optional[str] = None,
+                 redis_timeout: float = 0.25, redis_backoff: float = 30.0, prefix: str = "cache:"):
+        self.max_bytes = max_bytes
+        self.redis_timeout = redis_timeout
+        self.redis_backoff = redis_backoff
+        self.prefix = prefix
+        self._redis = aioredis.from_url(redis_url, socket_timeout=redis_timeout,
+                                        socket_connect_timeout=redis_timeout) \
+            if aioredis is not None and redis_url else None
+        self._redis_down_until = 0.0
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._flight = SingleFlight("response_cache")
+        self._stats = {"hits": 0, "redis_hits": 0, "stale": 0, "misses": 0, "refreshes": 0,
+                       "refresh_errors": 0, "redis_errors": 0, "evictions": 0}
+
+    @classmethod
+    def from_settings(cls) -> "ResponseCache":
+        redis_url = f"redis://{settings.REDIS_HOST}:6379/0" if settings.REDIS_HOST else settings.REDIS_URL
+        return cls(max_bytes=settings.RESPONSE_CACHE_MAX_BYTES, redis_url=redis_url,
+                   redis_timeout=settings.RESPONSE_CACHE_REDIS_TIMEOUT)
+
+    async def get(self, key: str, loader: Loader, ttl: float, stale_ttl: float = 0.0) -> Tuple[bytes, str]:
+        """
+        Cached value for ``key``, loading it with ``loader()`` on a miss.
+
+        Returns:
+            (value, state): state is "hit", "stale" (a refresh is running) or "miss".
+        """
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and now >= entry.stale_until:
+            self._drop(key)
+            entry = None
+        if entry is None:
+            entry = await self._redis_get(key)
+            if entry is not None and now < entry.stale_until:
+                self._put(key, entry)
+                self._stats["redis_hits"] += 1
+            else:
+                entry = None
+        else:
+            self._entries.move_to_end(key)
+
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._stats["hits"] += 1
+                return entry.value, "hit"
+            self._stats["stale"] += 1
+            self._revalidate(key, loader, ttl, stale_ttl)
+            return entry.value, "stale"
+
+        self._stats["misses"] += 1
+        value = await self._flight.do(key, self._load, key, loader, ttl, stale_ttl)
+        return value, "miss"
+
+    async def _load(self, key: str, loader: Loader, ttl: float, stale_ttl: float) -> bytes:
+        value = await loader()
+        now = time.time()
+        entry = _Entry(value, now + ttl, now + ttl + stale_ttl)
+        self._put(key, entry)
+        await self._redis_set(key, entry)
+        return value
+
+    def _revalidate(self, key: str, loader: Loader, ttl: float, stale_ttl: float):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._flight.do(key, self._load, key, loader, ttl, stale_ttl)
+                self._stats["refreshes"] += 1
+            except Exception as e:
+                # The stale entry keeps being served until it expires
+                self._stats["refresh_errors"] += 1
+                logger.warning(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh(), name=f"cache-refresh-{key}")
+
+    def _put(self, key: str, entry: _Entry):
+        self._drop(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.value)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats["evictions"] += 1
+
+    def _drop(self, key: str):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.value)
+
+    def _redis_ready(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception):
+        self._stats["redis_errors"] += 1
+        if not self._redis_ready():
+            return  # Concurrent calls failing on the same outage
+        self._redis_down_until = time.monotonic() + self.redis_backoff
+        logger.warning(f"Redis cache unavailable for {self.redis_backoff:.0f}s: {e}")
+
+    async def _redis_get(self, key: str) -> Optional[_Entry]:
+        if not self._redis_ready():
+            return None
+        try:
+            raw = await asyncio.wait_for(self._redis.get(self.prefix + key), self.redis_timeout)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        # "<fresh_until> <stale_until>\n<value>"
+        header, _, value = raw.partition(b"\n")
+        fresh_until, stale_until = map(float, header.split())
+        return _Entry(value, fresh_until, stale_until)
+
+    async def _redis_set(self, key: str, entry: _Entry):
+        if not self._redis_ready():
+            return
+        expire = max(1, int(entry.stale_until - time.time()))
+        raw = f"{entry.fresh_until} {entry.stale_until}\n".encode() + entry.value
+        try:
+            await asyncio.wait_for(self._redis.set(self.prefix + key, raw, ex=expire), self.redis_timeout)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def clear(self):
+        """Drops every in-process entry (Redis is left as is)."""
+        self._entries.clear()
+        self._bytes = 0
+
+    async def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+        if self._redis is not None:
+            await getattr(self._redis, "aclose", self._redis.close)()
+
+    def metrics(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "maxBytes": self.max_bytes,
+            "redis": self._redis is not None and self._redis_ready(),
+            "refreshing": len(self._refreshing),
+            **self._stats,
+        }
+
+
+# Global cache instance (closed by the app lifespan)
+response_cache = ResponseCache.from_settings()
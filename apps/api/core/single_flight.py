@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from apps.api.core.config import settings
+
+# Every group, for /status
+_groups: Dict[str, "SingleFlight"] = {}
+
+# Expired freshness entries are swept once the map grows past this
+_SWEEP_AT = 1024
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls with the same key share one in-flight task, so
+    N identical requests cause one upstream call. With ``freshness`` > 0 a completed result
+    is also served for that many seconds. Errors reach every waiter and are never cached.
+
+    Waiters are shielded: a caller that goes away does not cancel the shared call.
+    Results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, name: str, freshness: float = 0.0):
+        self.name = name
+        self.freshness = freshness
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self._stats = {"upstream": 0, "coalesced": 0, "fresh": 0, "errors": 0}
+        _groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        recent = self._recent.get(key)
+        if recent is not None and time.monotonic() - recent[0] < self.freshness:
+            self._stats["fresh"] += 1
+            return recent[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self._stats["upstream"] += 1
+            task = asyncio.ensure_future(self._run(key, fn, args, kwargs))
+            # Retrieve the exception even if every waiter was cancelled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        else:
+            self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, fn, args, kwargs) -> Any:
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if self.freshness > 0:
+            now = time.monotonic()
+            if len(self._recent) >= _SWEEP_AT:
+                self._recent = {k: v for k, v in self._recent.items() if now - v[0] < self.freshness}
+            self._recent[key] = (now, result)
+        return result
+
+    def forget(self, key: Hashable):
+        """Drops a fresh result so the next call goes upstream."""
+        self._recent.pop(key, None)
+
+    def clear(self):
+        """Drops every fresh result (in-flight calls are left to finish)."""
+        self._recent.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"inflight": len(self._inflight), "freshness": self.freshness, **self._stats}
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    return {name: group.metrics() for name, group in _groups.items()}
+
+
+# Shared groups: whole OHLCV reads / feature states per request shape, tickers, and upstream candle syncs
+ohlcv_flight = SingleFlight("ohlcv", freshness=settings.SINGLE_FLIGHT_FRESHNESS)
+ticker_flight = SingleFlight("ticker", freshness=settings.SINGLE_FLIGHT_FRESHNESS)
+feature_flight = SingleFlight("features", freshness=settings.SINGLE_FLIGHT_FRESHNESS)
+sync_flight = SingleFlight("candle_sync")
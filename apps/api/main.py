@@ -1,10 +1,45 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from apps.api.routers import config, bot, status
-from apps.api.ws import logs, control_center
+from apps.api.ws import logs, control_center, market_data
 from apps.api.core.config import settings
+from apps.api.core.executor import feature_executor
+from apps.api.core.exchanges import exchange_pool
+from apps.api.core.market_index import market_index
+from apps.api.core.candle_store import candle_repository
+from apps.api.core.history_jobs import history_jobs
+from apps.api.core.response_cache import response_cache
+from apps.api.ws.manager import manager
+from apps.api.core.log_buffer import log_buffer
+from apps.api.core.market_hub import market_hub
+from apps.api.utils.market_calendar import exchange_status
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # App-scoped services: start once per worker, stop on shutdown
+    log_buffer.install()
+    feature_executor.start()
+    await exchange_pool.start()
+    await candle_repository.start()
+    market_index.start()
+    # Status polls reuse the pooled clients instead of opening a second set
+    exchange_status.start(poll=settings.EXCHANGE_STATUS_POLL, client_factory=exchange_pool.get)
+    yield
+    await manager.close()
+    await market_hub.close()
+    await market_index.close()
+    await exchange_status.close()
+    await response_cache.close()
+    await history_jobs.close()
+    await candle_repository.close()
+    await exchange_pool.close()
+    feature_executor.shutdown()
+    log_buffer.uninstall()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +55,7 @@ app.include_router(bot.router)
 app.include_router(status.router)
 app.include_router(logs.router)
 app.include_router(control_center.router)
+app.include_router(market_data.router)
 from apps.api.routers import ccxt_data, analysis
 app.include_router(ccxt_data.router)
 app.include_router(analysis.router, prefix="/api/v1")
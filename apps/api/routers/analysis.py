@@ -1,105 +1,148 @@
-from fastapi import APIRouter, HTTPException, Query
-import pandas as pd
-from apps.api.utils.technical_features import MarketFeatureProcessor
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+import asyncio
+from typing import List, Optional
+from apps.api.utils.technical_features import MarketFeatureProcessor, resolve_features
+from apps.api.utils.feature_jobs import build_feature_state, encode_rows, feature_payload, feature_positions
+from apps.api.utils.serialization import negotiate, NotAcceptable, StreamEncoder
+from apps.api.core.config import settings
+from apps.api.core.executor import feature_executor, ExecutorBusy
+from apps.api.core.feature_cache import feature_cache, FeatureState, MAX_TAIL_BARS, OHLCV_COLUMNS
 import ccxt.async_support as ccxt_async
-from datetime import datetime
+from apps.api.core.exchanges import get_exchange_instance
+from apps.api.core.candle_store import candle_repository
+from apps.api.core.single_flight import feature_flight
 
 router = APIRouter(prefix="/analysis", tags=["Market Analysis"])
 
-# Reusing the supported exchanges logic or importing it would be better, but for now defining helper
-SUPPORTED_EXCHANGES = [
-    {"id": "binance", "name": "Binance", "ccxt_id": "binance"},
-    {"id": "bybit", "name": "Bybit", "ccxt_id": "bybit"},
-    {"id": "hyperliquid", "name": "Hyperliquid", "ccxt_id": "hyperliquid"},
-    {"id": "okx", "name": "OKX", "ccxt_id": "okx"},
-    {"id": "kucoin", "name": "KuCoin", "ccxt_id": "kucoin"},
-    {"id": "gate", "name": "Gate.io", "ccxt_id": "gate"},
-    {"id": "mexc", "name": "MEXC", "ccxt_id": "mexc"},
-    {"id": "bitget", "name": "Bitget", "ccxt_id": "bitget"},
-]
+async def get_feature_state(exchange_id: str, symbol: str, timeframe: str, min_bars: int,
+                            features: List[str]) -> FeatureState:
+    """
+    Cached feature frame for (exchange, symbol, timeframe) holding at least ``min_bars`` candles
+    and every one of ``features``.
 
-def get_exchange_instance(exchange_id: str):
-    exch = next((e for e in SUPPORTED_EXCHANGES if e["id"] == exchange_id), None)
-    if not exch:
-        raise HTTPException(status_code=404, detail="Exchange not supported")
-    
-    ccxt_id = exch["ccxt_id"]
-    if not hasattr(ccxt_async, ccxt_id):
-         raise HTTPException(status_code=400, detail=f"CCXT does not support {ccxt_id}")
-    
-    exchange_class = getattr(ccxt_async, ccxt_id)
-    exchange = exchange_class({
-        'enableRateLimit': True,
-        'options': {'defaultType': 'spot'}
-    })
-    return exchange
+    - hit: the cached forming candle is still the latest and younger than FEATURE_CACHE_TTL.
+    - refresh: only candles after the last closed one are read and appended (tail update).
+    - miss: full history read + MarketFeatureProcessor run in the feature executor, for the
+      requested features plus those the replaced entry already served.
+    Candles come from the candle store, which syncs only the missing tail from the exchange.
+    """
+    key = (exchange_id, symbol, timeframe)
+    state = feature_cache.get(key, min_bars=min_bars, features=features)
+    behind = 0
+    if state is not None:
+        behind = state.bars_behind(ccxt_async.Exchange.parse_timeframe(timeframe) * 1000)
+        if behind == 0 and state.age() < feature_cache.ttl:
+            feature_cache.record("hits")
+            return state
+
+    exchange_instance = get_exchange_instance(exchange_id)
+    if state is not None and behind <= MAX_TAIL_BARS:
+        candles = await candle_repository.since(key, exchange_instance, state.last_closed_ts)
+        old_nbytes = state.nbytes
+        state.apply(candles or [])
+        feature_cache.resize(key, old_nbytes)
+        feature_cache.record("refreshes")
+        return state
+
+    ohlcv = await candle_repository.latest(key, exchange_instance, min_bars)
+    if not ohlcv:
+        raise HTTPException(status_code=404, detail="Data not found")
+
+    previous = feature_cache.get(key)
+    if previous is not None:
+        # Other subsets are served from the same entry; keep its features in the rebuild
+        features = resolve_features(set(features).union(previous.features))
+    state = await feature_executor.run(build_feature_state, ohlcv, features)
+    feature_cache.put(key, state)
+    feature_cache.record("misses")
+    return state
 
 @router.get("/market-data/{exchange}/{symbol}")
 async def get_market_analysis(
+    request: Request,
     exchange: str, 
     symbol: str, 
     timeframe: str = "1h",
-    limit: int = 500
+    limit: int = Query(500, ge=1, le=5000),
+    features: Optional[str] = Query(None, description="Comma-separated feature subset (default: all 17)"),
+    converged: bool = Query(False, description="Fetch enough history for EMA/Wilder indicators to converge"),
+    layout: str = Query("records", pattern="^(records|columnar)$", description="records (ISO rows) or columnar (arrays, epoch ms)"),
+    float32: bool = Query(False, description="Round values to float32 (columnar layouts only)"),
+    stream: bool = Query(False, description="Stream row batches (NDJSON, MessagePack or Arrow by Accept header)"),
+    since: Optional[int] = Query(None, description="Delta mode: only rows with timestamp (ms) >= since; pass the previous response's cursor"),
 ):
-    exchange_instance = None
+    """
+    OHLCV + technical features for the latest ``limit`` bars.
+
+    Delta updates: the first request returns the snapshot and a ``cursor`` (timestamp of the
+    last, still-forming bar). Requests with ``since=<cursor>`` return only that bar with its
+    final / updated values plus any newer bars, computed incrementally from the feature cache.
+    """
     try:
-        # 1. Fetch Raw Data
+        # 1. Validate the feature subset and response format before touching the exchange
         formatted_symbol = symbol.replace("_", "/")
+        try:
+            media_type = negotiate(request.headers.get("accept"), streaming=stream)
+        except NotAcceptable as na:
+            raise HTTPException(status_code=406, detail=str(na))
+        try:
+            processor = MarketFeatureProcessor(features=features.split(",") if features else None)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
         
-        exchange_instance = get_exchange_instance(exchange)
-        
-        # Fetching slightly more data for indicators to warm up (e.g. EMA 200)
-        fetch_limit = limit + 200
-        ohlcv = await exchange_instance.fetch_ohlcv(formatted_symbol, timeframe=timeframe, limit=fetch_limit)
-        
-        if not ohlcv:
-             raise HTTPException(status_code=404, detail="Data not found")
+        # Exactly the warm-up the selected indicators need (paginating past the exchange page size)
+        tolerance = settings.FEATURE_CONVERGENCE_TOLERANCE if converged else None
+        fetch_limit = limit + processor.required_lookback(tolerance=tolerance)
 
-        # Convert to DataFrame
-        # CCXT OHLCV structure: [timestamp, open, high, low, close, volume]
-        df_raw = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df_raw['datetime'] = pd.to_datetime(df_raw['timestamp'], unit='ms')
-        df_raw.set_index('datetime', inplace=True)
+        # 2. Raw data + features: cache hit, tail update on new candles, or full fetch-and-compute
+        #    (identical concurrent requests share one computation)
+        state = await feature_flight.do(
+            (exchange, formatted_symbol, timeframe, fetch_limit, tuple(processor.features)),
+            get_feature_state, exchange, formatted_symbol, timeframe, fetch_limit, processor.features,
+        )
 
-        # 2. Feature Engineering
-        processor = MarketFeatureProcessor()
-        
-        # Handling missing columns that might be expected by the processor
-        if 'funding_rate' not in df_raw.columns:
-             df_raw['funding_rate'] = 0.0
-        if 'open_interest' not in df_raw.columns:
-             df_raw['open_interest'] = 0.0
+        frame = state.frame
+        if since is not None:
+            # Cut a delta here (binary search) so only its rows are pickled to the worker, not the frame
+            frame = frame.iloc[frame['timestamp'].searchsorted(since):]
 
-        df_processed = processor.add_technical_features(df_raw)
+        meta = {"exchange": exchange, "symbol": formatted_symbol}
+        if stream:
+            # Row selection and encoding share the cached frame, so they run in executor threads
+            positions = await feature_executor.run(
+                feature_positions, frame, limit, processor.features, since, thread=True,
+            )
+            meta["cursor"] = int(frame['timestamp'].iloc[positions[-1]]) if len(positions) else since
+            columns = OHLCV_COLUMNS + processor.features
+            encoder = StreamEncoder(media_type, layout, float32, meta=meta, columns=columns)
+            return StreamingResponse(stream_rows(frame, positions, columns, encoder), media_type=media_type)
 
-        # 3. Prepare JSON response
-        # Returning only the requested limit amount of latest data
-        result_df = df_processed.tail(limit).reset_index()
-        # Convert timestamp back to something JSON serializable if needed or keep string
-        # The frontend/recharts usually likes ISO strings or timestamps.
-        # Let's ensure it's friendly.
-        
-        # We need to make sure we don't return NaN values in JSON as they break things often,
-        # but the processor already does dropna().
-        
-        result = result_df.to_dict(orient="records")
-        
-        # Clean up timestamps for frontend if needed (simpler to just send isoformat)
-        for row in result:
-            if isinstance(row['datetime'], pd.Timestamp):
-                row['timestamp'] = row['datetime'].isoformat() # This overrides the msec timestamp with ISO string
-                del row['datetime']
-
-        return {
-            "exchange": exchange,
-            "symbol": formatted_symbol,
-            "data": result
-        }
+        # 3. Column selection + serialization run in the feature executor, off the event loop
+        body = await feature_executor.run(
+            feature_payload, frame, limit, processor.features, media_type, layout, float32, meta, since,
+        )
+        return Response(content=body, media_type=media_type)
 
+    except HTTPException:
+        raise
+    except ExecutorBusy as busy:
+        raise HTTPException(status_code=503, detail=str(busy))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Feature computation timed out")
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if exchange_instance:
-            await exchange_instance.close()
+
+
+async def stream_rows(frame, positions, columns, encoder: StreamEncoder):
+    """
+    Feature rows in STREAM_BATCH_ROWS batches. Each batch is selected from the cached frame and
+    encoded in a feature executor thread, so only one batch of rows exists at a time and
+    neither step runs on the event loop.
+    """
+    for offset in range(0, len(positions), settings.STREAM_BATCH_ROWS):
+        batch = positions[offset:offset + settings.STREAM_BATCH_ROWS]
+        yield await feature_executor.run(encode_rows, encoder, frame, batch, columns, thread=True)
+    yield encoder.close()
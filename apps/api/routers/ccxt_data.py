@@ -1,24 +1,25 @@
 # apps/api/routers/ccxt_data.py
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict
-import ccxt
-import ccxt.async_support as ccxt_async  # Use async support for async functions
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Optional
 from pydantic import BaseModel
 from datetime import datetime
+from apps.api.core.exchanges import SUPPORTED_EXCHANGES, exchange_pool, get_exchange_instance
+from apps.api.core.market_index import market_index
+from apps.api.core.candle_store import candle_repository
+from apps.api.core.single_flight import ohlcv_flight, ticker_flight
+from apps.api.core.fanout import fan_out, ticker_consensus, close_consensus
+from apps.api.core.config import settings
+from apps.api.core.executor import feature_executor
+from apps.api.core.feature_cache import OHLCV_COLUMNS, ohlcv_frame
+from apps.api.utils.serialization import StreamEncoder, NotAcceptable, negotiate
+from apps.api.core.history_jobs import history_jobs
+import ccxt.async_support as ccxt_async
 
 router = APIRouter(prefix="/ccxt", tags=["CCXT Dynamic"])
 
-# আমাদের সাপোর্টেড এক্সচেঞ্জ লিস্ট (ডাইনামিক + মেইনটেইনেবল)
-SUPPORTED_EXCHANGES = [
-    {"id": "binance", "name": "Binance", "ccxt_id": "binance"},
-    {"id": "bybit", "name": "Bybit", "ccxt_id": "bybit"},
-    {"id": "hyperliquid", "name": "Hyperliquid", "ccxt_id": "hyperliquid"},
-    {"id": "okx", "name": "OKX", "ccxt_id": "okx"},
-    {"id": "kucoin", "name": "KuCoin", "ccxt_id": "kucoin"},
-    {"id": "gate", "name": "Gate.io", "ccxt_id": "gate"},
-    {"id": "mexc", "name": "MEXC", "ccxt_id": "mexc"},
-    {"id": "bitget", "name": "Bitget", "ccxt_id": "bitget"},
-]
+# Largest non-streamed /history response
+MAX_HISTORY_ROWS = 100_000
 
 class ExchangeInfo(BaseModel):
     id: str
@@ -34,44 +35,28 @@ class MarketInfo(BaseModel):
 async def get_supported_exchanges():
     return SUPPORTED_EXCHANGES
 
-def get_exchange_instance(exchange_id: str):
-    exch = next((e for e in SUPPORTED_EXCHANGES if e["id"] == exchange_id), None)
-    if not exch:
-        raise HTTPException(status_code=404, detail="Exchange not supported")
-    
-    ccxt_id = exch["ccxt_id"]
-    if not hasattr(ccxt_async, ccxt_id):
-         raise HTTPException(status_code=400, detail=f"CCXT does not support {ccxt_id}")
-    
-    exchange_class = getattr(ccxt_async, ccxt_id)
-    exchange = exchange_class({
-        'enableRateLimit': True,  # খুব জরুরি!
-        'options': {'defaultType': 'spot'}  # Hyperliquid-এর জন্য adjust হতে পারে
-    })
-    return exchange
-
 @router.get("/markets/{exchange_id}")
-async def get_markets(exchange_id: str):
-    exchange = get_exchange_instance(exchange_id)
+async def get_markets(
+    exchange_id: str,
+    q: Optional[str] = Query(None, description="Search symbol / base / quote (case-insensitive)"),
+    match: str = Query("prefix", pattern="^(prefix|substring)$"),
+    type: Optional[str] = Query("spot", description="spot, swap, future, option or futures (any derivative)"),
+    active: Optional[bool] = Query(True),
+    quote: Optional[str] = Query(None, description="Quote asset, e.g. USDT"),
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    get_exchange_instance(exchange_id)  # 404 / 400 for unsupported exchanges
     try:
-        markets = await exchange.load_markets()
-        filtered = [
-            {
-                "symbol": symbol,
-                "base": info['base'],
-                "quote": info['quote'],
-                "active": info.get('active', True)
-            }
-            for symbol, info in markets.items()
-            if info.get('spot', False) and info.get('active', True)
-        ]
-        # সর্ট করে টপ পেয়ার আগে (optional)
-        filtered.sort(key=lambda x: x["symbol"])
-        return {"markets": filtered[:500]}  # খুব বেশি হলে লিমিট (frontend-এ search যোগ করব)
+        index = await market_index.get(exchange_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await exchange.close() 
+    try:
+        # সর্ট করা (symbol) ইনডেক্স থেকে সার্চ + ফিল্টার + পেজিনেশন
+        return index.search(q=q, match=match, market_type=type, active=active, quote=quote,
+                            limit=limit, cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
 
 @router.get("/ohlcv/{exchange_id}/{symbol}")
 async def get_ohlcv(
@@ -82,7 +67,12 @@ async def get_ohlcv(
 ):
     exchange = get_exchange_instance(exchange_id)
     try:
-        ohlcv = await exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+        # Served from the candle store; only candles newer than the stored tail (and gaps) hit the exchange
+        # Identical concurrent requests share one read (and at most one upstream call)
+        ohlcv = await ohlcv_flight.do(
+            (exchange_id, symbol, timeframe, limit),
+            candle_repository.latest, (exchange_id, symbol, timeframe), exchange, limit,
+        )
         data = [
             {
                 "timestamp": datetime.fromtimestamp(c[0] / 1000).isoformat(),
@@ -97,5 +87,172 @@ async def get_ohlcv(
         return {"symbol": symbol, "timeframe": timeframe, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await exchange.close()
+
+
+@router.get("/compare/{symbol}")
+async def compare_exchanges(
+    symbol: str,
+    exchanges: Optional[str] = Query(None, description="Comma-separated exchange ids (default: all supported)"),
+    kind: str = Query("ticker", pattern="^(ticker|ohlcv)$"),
+    timeframe: str = "1h",
+    limit: int = Query(100, ge=1, le=1000),
+    deadline: float = Query(settings.FANOUT_DEADLINE, gt=0, le=settings.FANOUT_MAX_DEADLINE),
+):
+    """
+    Fetches one symbol's ticker or OHLCV from several exchanges concurrently.
+    Exchanges that are unknown, fail or miss the deadline are reported per exchange; the rest
+    are returned together with a cross-exchange consensus (median price, deviations, best bid / ask).
+    """
+    formatted_symbol = symbol.replace("_", "/")
+    exchange_ids = [e.strip() for e in exchanges.split(",") if e.strip()] if exchanges \
+        else [e["id"] for e in SUPPORTED_EXCHANGES]
+    exchange_ids = list(dict.fromkeys(exchange_ids))
+
+    async def fetch(exchange_id: str):
+        # Resolved per exchange so an unknown id is one failed entry, not a failed request
+        if exchange_id not in exchange_pool.exchanges:
+            raise ValueError(f"Exchange not supported: {exchange_id}")
+        exchange = exchange_pool.get(exchange_id)
+        if exchange.markets and formatted_symbol not in exchange.markets:
+            raise ValueError(f"{formatted_symbol} is not listed on {exchange_id}")
+        if kind == "ticker":
+            return await ticker_flight.do((exchange_id, formatted_symbol), exchange.fetch_ticker, formatted_symbol)
+        return await ohlcv_flight.do(
+            (exchange_id, formatted_symbol, timeframe, limit),
+            candle_repository.latest, (exchange_id, formatted_symbol, timeframe), exchange, limit,
+        )
+
+    results = await fan_out(exchange_ids, fetch, deadline)
+    received = {exchange_id: r["data"] for exchange_id, r in results.items() if r["ok"]}
+    if kind == "ticker":
+        for r in results.values():
+            if r["ok"]:
+                t = r["data"]
+                r["data"] = {k: t.get(k) for k in ("bid", "ask", "last", "baseVolume", "quoteVolume", "timestamp")}
+        consensus = ticker_consensus(received)
+    else:
+        consensus = close_consensus(received)
+    return {
+        "symbol": formatted_symbol,
+        "kind": kind,
+        "deadline": deadline,
+        "received": len(received),
+        "requested": len(results),
+        "consensus": consensus,
+        "exchanges": results,
+    }
+
+
+def parse_time(value: str, name: str) -> int:
+    """Epoch milliseconds or an ISO 8601 string -> epoch ms."""
+    if value.lstrip("-").isdigit():
+        return int(value)
+    parsed = ccxt_async.Exchange.parse8601(value)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value} (epoch ms or ISO 8601)")
+    return parsed
+
+@router.get("/history/jobs")
+async def list_history_jobs():
+    return {"jobs": [job.progress() for job in history_jobs.jobs.values()]}
+
+@router.get("/history/jobs/{job_id}")
+async def get_history_job(job_id: str):
+    if job_id not in history_jobs.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return history_jobs.get(job_id).progress()
+
+@router.post("/history/jobs/{job_id}/resume")
+async def resume_history_job(job_id: str):
+    if job_id not in history_jobs.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = history_jobs.get(job_id)
+    return history_jobs.resume(job_id, get_exchange_instance(job.key[0])).progress()
+
+@router.delete("/history/jobs/{job_id}")
+async def cancel_history_job(job_id: str):
+    if job_id not in history_jobs.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = history_jobs.get(job_id)
+    if job.task and not job.task.done():
+        job.task.cancel()
+    return job.progress()
+
+@router.post("/history/{exchange_id}/{symbol}")
+async def start_history_job(
+    exchange_id: str,
+    symbol: str,
+    start: str = Query(..., description="Epoch ms or ISO 8601"),
+    end: Optional[str] = Query(None, description="Epoch ms or ISO 8601 (default: now)"),
+    timeframe: str = "1m",
+):
+    """
+    Downloads [start, end) into the candle store in concurrent, page-sized chunks.
+    Poll /ccxt/history/jobs/{id} for progress; resume failed jobs with POST .../resume.
+    """
+    exchange = get_exchange_instance(exchange_id)
+    formatted_symbol = symbol.replace("_", "/")
+    end_ms = parse_time(end, "end") if end else ccxt_async.Exchange.milliseconds()
+    try:
+        job = history_jobs.submit((exchange_id, formatted_symbol, timeframe), exchange, parse_time(start, "start"), end_ms)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return job.progress()
+
+@router.get("/history/{exchange_id}/{symbol}")
+async def get_history(
+    request: Request,
+    exchange_id: str,
+    symbol: str,
+    start: str = Query(..., description="Epoch ms or ISO 8601"),
+    end: Optional[str] = Query(None, description="Epoch ms or ISO 8601 (default: now)"),
+    timeframe: str = "1m",
+    limit: Optional[int] = Query(None, ge=1, description=f"Max candles (default / max {MAX_HISTORY_ROWS} unless streamed)"),
+    stream: bool = Query(False, description="Stream row batches (NDJSON, MessagePack or Arrow by Accept header)"),
+    layout: str = Query("records", pattern="^(records|columnar)$"),
+    float32: bool = Query(False),
+):
+    """
+    Stored candles in [start, end), oldest first.
+
+    Without ``stream`` the response is one JSON document of [timestamp(ms), open, high, low, close, volume]
+    rows, capped at MAX_HISTORY_ROWS. With ``stream`` the store is read page by page and every page is
+    sent as soon as it is encoded, so memory stays flat for any range size.
+    """
+    get_exchange_instance(exchange_id)
+    store = candle_repository.store
+    if store is None:
+        raise HTTPException(status_code=400, detail="No candle store configured")
+    key = (exchange_id, symbol.replace("_", "/"), timeframe)
+    start_ms = parse_time(start, "start")
+    end_ms = parse_time(end, "end") if end else ccxt_async.Exchange.milliseconds()
+
+    if stream:
+        try:
+            encoder = StreamEncoder(negotiate(request.headers.get("accept"), streaming=True), layout, float32,
+                                    meta={"exchange": exchange_id, "symbol": key[1], "timeframe": timeframe},
+                                    columns=OHLCV_COLUMNS)
+        except NotAcceptable as na:
+            raise HTTPException(status_code=406, detail=str(na))
+        return StreamingResponse(stream_candles(store, key, start_ms, end_ms, limit, encoder),
+                                 media_type=encoder.media_type)
+
+    if limit is not None and limit > MAX_HISTORY_ROWS:
+        raise HTTPException(status_code=400, detail=f"limit > {MAX_HISTORY_ROWS} needs stream=true")
+    candles = await store.read_page(key, start_ms, end_ms, limit or MAX_HISTORY_ROWS)
+    return {"symbol": key[1], "timeframe": timeframe, "count": len(candles), "data": candles}
+
+def _encode_page(encoder: StreamEncoder, page: List[list]) -> bytes:
+    return encoder.encode(ohlcv_frame(page))
+
+async def stream_candles(store, key, start: int, end: int, limit: Optional[int], encoder: StreamEncoder):
+    remaining = limit
+    async for page in store.iter_range(key, start, end, batch=settings.STREAM_BATCH_ROWS):
+        if remaining is not None:
+            page = page[:remaining]
+            remaining -= len(page)
+        # Framing + encoding a page is CPU-bound; keep it off the event loop
+        yield await feature_executor.run(_encode_page, encoder, page, thread=True)
+        if remaining == 0:
+            break
+    yield encoder.close()
@@ -1,120 +1,107 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 import yfinance as yf
-from apps.api.utils.technical_features import MarketFeatureProcessor  # Direct import
-import sys, os
-from datetime import datetime
-import json
+from apps.api.utils.feature_jobs import analyze_price_history
+from apps.api.utils.serialization import JSON, negotiate, json_envelope, NotAcceptable
+from apps.api.core.executor import feature_executor, ExecutorBusy
+from apps.api.core.response_cache import response_cache
+import asyncio
 import pandas as pd
-# from redis import Redis # Commented out until Redis server is confirmed running in production or docker
-# redis = Redis(host='localhost', port=6379, db=0)
 
 router = APIRouter(prefix="/market", tags=["Market"])
 
-# In-memory cache as fallback if Redis is not active in this specific dev environment without full setup
-# Ideally use Redis as per instructions, but for safety in dev I'll use a dict if redis fails or import fails
-# User requested Redis, so I will prioritize that logic but wrap in try-except for safety.
-
-try:
-    from redis import Redis
-    # Use 'redis' hostname for docker, 'localhost' for local. 
-    # Since we are in docker-compose, 'redis' (service name) or 'localhost' (mapped port).
-    # Inside docker container 'redis' is the host. Localhost is for host machine.
-    # The api runs in docker, so 'redis' is better, but local dev runs uvicorn.
-    # We'll try env var or default to localhost.
-    redis_host = os.getenv("REDIS_HOST", "localhost")
-    redis = Redis(host=redis_host, port=6379, db=0, decode_responses=True)
-except ImportError:
-    redis = None
-    print("Redis not installed or connection failed. Using in-memory cache.")
-
-in_memory_cache = {}
+# Seconds an analysis stays fresh, by yfinance period (short periods change faster);
+# after that it is served stale for as long again while one background task refreshes it
+PERIOD_TTLS = {
+    "1d": 60, "5d": 300,
+    "1mo": 900, "3mo": 1800,
+    "6mo": 3600, "1y": 3600, "ytd": 3600,
+    "2y": 6 * 3600, "5y": 12 * 3600, "10y": 24 * 3600, "max": 24 * 3600,
+}
+DEFAULT_TTL = 3600
 
-@router.get("/analysis/{ticker}")
-async def get_market_analysis(ticker: str, period: str = "1y"):
+
+def analysis_ttl(period: str) -> int:
+    return PERIOD_TTLS.get(period, DEFAULT_TTL)
+
+
+async def load_analysis(ticker: str, period: str, encode_args: tuple) -> bytes:
     """
-    Get market analysis using yfinance with CCXT fallback.
-    Includes Technical Indicators generated by MarketFeatureProcessor.
-    WARNING: yfinance may have delays/missing data. For production, switch to Polygon.io or Binance WS.
+    yfinance history (CCXT fallback) -> encoded analysis document, prefixed with its source
+    ("yfinance\\n..." / "ccxt_fallback\\n...") so cached entries keep it.
+    The blocking yfinance download runs in a worker thread, feature engineering in the feature executor.
     """
-    cache_key = f"market:{ticker}:{period}"
-    
-    # Check Cache
-    if redis:
-        try:
-            cached = redis.get(cache_key)
-            if cached:
-                return {"from_cache": True, "data": json.loads(cached)}
-        except Exception:
-            pass # Redis failed, proceed
-    else:
-        if cache_key in in_memory_cache:
-             return {"from_cache": True, "data": in_memory_cache[cache_key]}
-
     try:
-        # yfinance data
         # yfinance download returns a MultiIndex dataframe if not handled, or just dataframe
-        data = yf.download(ticker, period=period, progress=False)
-        
+        data = await asyncio.to_thread(yf.download, ticker, period=period, progress=False)
+
         if data.empty:
             raise ValueError("No data from yfinance")
-        
-        # Ensure data is flat (handle multi-index columns if any)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
-
-        # Direct function call to MarketFeatureProcessor
-        processor = MarketFeatureProcessor(data)
-        features = processor.add_technical_features() # The method name in class is add_technical_features
-        
-        # Convert NaN to None for JSON compatibility
-        features = features.replace({float('nan'): None})
-        
-        # Sort by date descending to get latest first
-        features = features.sort_index(ascending=False)
-        
-        # Take latest 200 records to keep payload light but history sufficient
-        result_data = json.loads(features.head(200).to_json(orient="index", date_format="iso"))
-        
-        # Cache for consistency
-        if redis:
-            try:
-                redis.set(cache_key, json.dumps(result_data), ex=3600)  # 1 hour
-            except Exception:
-                pass
-        else:
-             in_memory_cache[cache_key] = result_data
-        
-        return {"data": result_data, "source": "yfinance"}
-        
+
+        result_data = await feature_executor.run(analyze_price_history, data, 200, *encode_args)
+        return b"yfinance\n" + result_data
+
+    except (ExecutorBusy, asyncio.TimeoutError):
+        raise
     except Exception as e:
         print(f"Primary Source Failed: {str(e)}")
         # Fallback to CCXT (e.g., if ticker is crypto)
         try:
-            from .ccxt_data import get_exchange_instance
-            # Attempt to guess exchange, default to binance for fallback
-            exchange = await get_exchange_instance("binance") 
+            from apps.api.core.exchanges import get_exchange_instance
+            # Attempt to guess exchange, default to binance for fallback (pooled client, not closed here)
+            exchange = get_exchange_instance("binance")
             # CCXT expects symbols like BTC/USDT. yfinance uses BTC-USD.
             ccxt_symbol = ticker.replace("-", "/")
             if "USD" in ccxt_symbol and "USDT" not in ccxt_symbol:
                  ccxt_symbol = ccxt_symbol.replace("USD", "USDT")
-            
+
             ohlcv = await exchange.fetch_ohlcv(ccxt_symbol, '1d', limit=365)
-            await exchange.close()
-            
+
             # Convert to DataFrame
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
-            
+
             # Process
-            processor = MarketFeatureProcessor(df)
-            features = processor.add_technical_features()
-            features = features.replace({float('nan'): None})
-            features = features.sort_index(ascending=False)
-            
-            result_data = json.loads(features.head(200).to_json(orient="index", date_format="iso"))
-            
-            return {"data": result_data, "source": "ccxt_fallback"}
-            
+            result_data = await feature_executor.run(analyze_price_history, df, 200, *encode_args)
+            return b"ccxt_fallback\n" + result_data
+
         except Exception as fallback_error:
             raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}. Fallback failed: {str(fallback_error)}")
+
+
+@router.get("/analysis/{ticker}")
+async def get_market_analysis(
+    request: Request,
+    ticker: str,
+    period: str = "1y",
+    layout: str = Query("records", pattern="^(records|columnar)$", description="records (keyed by ISO date) or columnar"),
+    float32: bool = Query(False, description="Round values to float32 (columnar layouts only)"),
+):
+    """
+    Get market analysis using yfinance with CCXT fallback.
+    Includes Technical Indicators generated by MarketFeatureProcessor.
+    WARNING: yfinance may have delays/missing data. For production, switch to Polygon.io or Binance WS.
+
+    JSON by default; MessagePack / Arrow IPC (columnar) via the Accept header.
+    Served from the two-tier response cache (in-process LRU + Redis) with stale-while-revalidate.
+    """
+    try:
+        media_type = negotiate(request.headers.get("accept"))
+    except NotAcceptable as na:
+        raise HTTPException(status_code=406, detail=str(na))
+    encode_args = (media_type, layout, float32)
+
+    cache_key = f"market:{ticker}:{period}:{media_type}:{layout}:{'f32' if float32 else 'f64'}"
+    ttl = analysis_ttl(period)
+    try:
+        cached, state = await response_cache.get(
+            cache_key, lambda: load_analysis(ticker, period, encode_args), ttl=ttl, stale_ttl=ttl,
+        )
+    except (ExecutorBusy, asyncio.TimeoutError) as e:
+        raise HTTPException(status_code=503, detail=f"Analysis unavailable: {str(e) or 'timed out'}")
+
+    source, _, payload = cached.partition(b"\n")
+    # JSON payloads are spliced into the envelope as-is; binary documents are sent bare
+    if media_type == JSON:
+        payload = json_envelope(payload, source=source.decode(), from_cache=state != "miss", cache=state)
+    return Response(content=payload, media_type=media_type, headers={"X-Cache": state})
@@ -1,5 +1,16 @@
 from fastapi import APIRouter
-from apps.api.utils.market_calendar import is_trading_day
+from apps.api.utils.market_calendar import calendar_service, is_trading_day
+from apps.api.core.executor import feature_executor
+from apps.api.core.feature_cache import feature_cache
+from apps.api.core.exchanges import exchange_pool
+from apps.api.core.market_index import market_index
+from apps.api.core.candle_store import candle_repository
+from apps.api.core.history_jobs import history_jobs
+from apps.api.core.response_cache import response_cache
+from apps.api.core import single_flight
+from apps.api.ws.manager import manager
+from apps.api.core.log_buffer import log_buffer
+from apps.api.core.market_hub import market_hub
 import psutil
 
 router = APIRouter(prefix="/status", tags=["status"])
@@ -14,4 +25,16 @@ async def get_status():
         "pnL": 1240.50,  # Mock, from DB
         "marketOpen": is_trading_day(),
         "systemHealth": {"cpu": cpu_usage, "ram": ram_usage}, 
+        "featureExecutor": feature_executor.metrics(),
+        "featureCache": feature_cache.metrics(),
+        "exchanges": exchange_pool.metrics(),
+        "marketIndex": market_index.metrics(),
+        "candleStore": candle_repository.metrics(),
+        "singleFlight": single_flight.metrics(),
+        "historyJobs": history_jobs.metrics(),
+        "responseCache": response_cache.metrics(),
+        "websockets": manager.metrics(),
+        "logBuffer": log_buffer.metrics(),
+        "marketHub": market_hub.metrics(),
+        "marketCalendar": calendar_service.metrics(),
     }
@@ -0,0 +1,113 @@
+"""
+CPU-bound feature jobs executed by FeatureExecutor.
+They are top-level functions with plain inputs / encoded (bytes) outputs so they can run in a
+process pool; the frame building, indicators and serialization all happen in the worker.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from apps.api.utils import serialization
+from apps.api.core.feature_cache import OHLCV_COLUMNS, FeatureState
+from apps.api.utils.technical_features import MarketFeatureProcessor, resolve_features
+
+
+def build_feature_state(ohlcv: List[list], features: Optional[List[str]] = None) -> FeatureState:
+    """ccxt OHLCV rows -> FeatureState (feature frame + incremental engine) for the feature cache."""
+    # Spot OHLCV has no funding / open interest columns; the processor falls back to 0.0 features.
+    # (A zero-filled 'open_interest' column would make pct_change 0/0 = NaN and drop every row.)
+    return FeatureState.build(ohlcv, features)
+
+
+def feature_positions(frame: pd.DataFrame, limit: int, features: Optional[List[str]] = None,
+                      since: Optional[int] = None) -> np.ndarray:
+    """
+    Row positions in ``frame`` of the latest ``limit`` served rows: rows where every one of
+    ``features`` (default: all 17) is defined, i.e. warm-up rows dropped the same way
+    MarketFeatureProcessor does.
+
+    With ``since`` (epoch ms) only rows with timestamp >= since count; the frame is cut by
+    binary search first, so a delta costs O(rows returned), not O(frame).
+    """
+    features = resolve_features(features)
+    start = int(frame['timestamp'].searchsorted(since)) if since is not None else 0
+    complete = frame.iloc[start:][features].notna().all(axis=1).to_numpy()
+    return start + np.flatnonzero(complete)[-limit:]
+
+
+def feature_rows(frame: pd.DataFrame, limit: int, features: Optional[List[str]] = None,
+                 since: Optional[int] = None) -> pd.DataFrame:
+    """
+    The served rows (see feature_positions) of a cached feature frame: OHLCV columns plus
+    ``features`` (default: all 17).
+    """
+    features = resolve_features(features)
+    return frame.iloc[feature_positions(frame, limit, features, since)][OHLCV_COLUMNS + features]
+
+
+def encode_rows(encoder: serialization.StreamEncoder, frame: pd.DataFrame, positions: np.ndarray,
+                columns: List[str]) -> bytes:
+    """One streamed batch: selects ``positions`` x ``columns`` of ``frame`` and encodes it."""
+    return encoder.encode(frame.iloc[positions][columns])
+
+
+def feature_payload(
+    frame: pd.DataFrame,
+    limit: int,
+    features: Optional[List[str]] = None,
+    media_type: str = serialization.JSON,
+    layout: str = "records",
+    float32: bool = False,
+    meta: Optional[Dict] = None,
+    since: Optional[int] = None,
+) -> bytes:
+    """
+    Cached feature frame -> encoded /analysis/market-data response body.
+
+    Encodes feature_rows(frame, limit, features, since). JSON bodies are {**meta, "data": ...};
+    binary media types always use the columnar layout. ``meta`` gains ``cursor``, the
+    timestamp (ms) of the last row, to pass back as ``since`` for the next delta.
+    """
+    df_processed = feature_rows(frame, limit, features, since)
+    cursor = int(df_processed['timestamp'].iloc[-1]) if len(df_processed) else since
+    meta = {**(meta or {}), "cursor": cursor}
+
+    if media_type != serialization.JSON:
+        return serialization.encode_columns(df_processed, media_type, meta={**(meta or {}), "layout": "columnar"},
+                                            float32=float32)
+    if layout == "columnar":
+        data = serialization.encode_columns(df_processed, float32=float32)
+    else:
+        data = serialization.encode_records(df_processed)
+    return serialization.json_envelope(data, **(meta or {}), layout=layout)
+
+
+def analyze_price_history(
+    data: pd.DataFrame,
+    rows: int = 200,
+    media_type: str = serialization.JSON,
+    layout: str = "records",
+    float32: bool = False,
+) -> bytes:
+    """
+    Vendor price history (yfinance / ccxt frame) -> encoded ``data`` document for /market/analysis.
+
+    records: latest ``rows`` feature rows keyed by ISO date, newest first (legacy layout).
+    columnar: the same rows oldest first, one array per column (see serialization.encode_columns).
+    """
+    # Ensure data is flat (handle multi-index columns if any) with the lowercase names the processor expects
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    data.columns = data.columns.astype(str).str.lower()
+
+    features = MarketFeatureProcessor().add_technical_features(data)
+
+    if layout == "columnar" or media_type != serialization.JSON:
+        return serialization.encode_columns(features.tail(rows), media_type, float32=float32)
+
+    # Sort by date descending to get latest first; to_json writes NaN as null
+    features = features.sort_index(ascending=False)
+
+    # Take latest records to keep payload light but history sufficient
+    return features.head(rows).to_json(orient="index", date_format="iso").encode()
@@ -0,0 +1,379 @@
+import math
+from collections import deque
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Union
+
+import pandas as pd
+
+from apps.api.utils.technical_features import FEATURE_COLUMNS
+
+NAN = float('nan')
+EPSILON = 2.220446049250313e-16  # sys.float_info.epsilon, pandas_ta's zero() threshold
+
+Timestamp = Union[pd.Timestamp, datetime, int]
+
+
+def _div(a: float, b: float) -> float:
+    """IEEE division (x/0 -> +/-inf, 0/0 -> nan) so results match the pandas batch path."""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _log(value: float) -> float:
+    if value > 0:
+        return math.log(value)
+    return -math.inf if value == 0 else NAN
+
+
+def _hour(timestamp: Timestamp) -> int:
+    # ccxt timestamps are epoch milliseconds in UTC
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp // 3_600_000) % 24
+    return timestamp.hour
+
+
+class _EWM:
+    """
+    Running exponentially weighted mean.
+    Mirrors the recursion of pandas' ``Series.ewm(...).mean()`` (ignore_na=False),
+    including its NaN handling, so values are identical to the batch computation.
+    """
+    __slots__ = ('_decay', '_new_wt', '_adjust', '_min_periods', '_weighted', '_old_wt', '_nobs')
+
+    def __init__(self, alpha: float, adjust: bool, min_periods: int = 0):
+        self._decay = 1.0 - alpha
+        self._new_wt = 1.0 if adjust else alpha
+        self._adjust = adjust
+        self._min_periods = max(min_periods, 1)
+        self._weighted = NAN
+        self._old_wt = 1.0
+        self._nobs = 0
+
+    def update(self, value: float) -> float:
+        is_observation = value == value
+        self._nobs += is_observation
+        if self._weighted == self._weighted:
+            self._old_wt *= self._decay
+            if is_observation:
+                if self._weighted != value:
+                    self._weighted = (self._old_wt * self._weighted + self._new_wt * value) / (self._old_wt + self._new_wt)
+                if self._adjust:
+                    self._old_wt += self._new_wt
+                else:
+                    self._old_wt = 1.0
+        elif is_observation:
+            self._weighted = value
+        return self._weighted if self._nobs >= self._min_periods else NAN
+
+    def copy(self) -> '_EWM':
+        clone = object.__new__(type(self))
+        for slot in _EWM.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
+
+
+class _RMA(_EWM):
+    """Wilder's smoothing as pandas_ta.rma: ewm(alpha=1/length, adjust=False)."""
+    __slots__ = ()
+
+    def __init__(self, length: int):
+        super().__init__(alpha=1.0 / length, adjust=False)
+
+
+class _EMA:
+    """
+    pandas_ta.ema: seeded with the SMA of the first ``length`` values, then ewm(span=length, adjust=False).
+    With ``alpha=1/length`` this is pandas_ta.atr's SMA-seeded Wilder smoothing.
+    """
+    __slots__ = ('_length', '_seed', '_ewm')
+
+    def __init__(self, length: int, alpha: Optional[float] = None):
+        self._length = length
+        self._seed = []
+        self._ewm = _EWM(alpha=2.0 / (length + 1) if alpha is None else alpha, adjust=False)
+
+    def update(self, value: float) -> float:
+        if self._seed is not None:
+            self._seed.append(value)
+            if len(self._seed) < self._length:
+                return NAN
+            values = [v for v in self._seed if v == v]
+            value = sum(values) / len(values) if values else NAN
+            self._seed = None
+        return self._ewm.update(value)
+
+    def copy(self) -> '_EMA':
+        clone = object.__new__(_EMA)
+        clone._length = self._length
+        clone._seed = list(self._seed) if self._seed is not None else None
+        clone._ewm = self._ewm.copy()
+        return clone
+
+
+class _Window:
+    """Fixed-length rolling window; statistics are NaN until full or while it holds a NaN."""
+    __slots__ = ('_values', '_length')
+
+    def __init__(self, length: int):
+        self._values = deque(maxlen=length)
+        self._length = length
+
+    def push(self, value: float) -> bool:
+        self._values.append(value)
+        return len(self._values) == self._length and all(v == v for v in self._values)
+
+    def copy(self) -> '_Window':
+        clone = object.__new__(_Window)
+        clone._values = self._values.copy()
+        clone._length = self._length
+        return clone
+
+    def sum(self) -> float:
+        return math.fsum(self._values)
+
+    def mean(self) -> float:
+        return self.sum() / self._length
+
+    def std(self, ddof: int = 1) -> float:
+        mean = self.mean()
+        var = math.fsum((v - mean) ** 2 for v in self._values) / (self._length - ddof)
+        return math.sqrt(var)
+
+    def min(self) -> float:
+        return min(self._values)
+
+    def max(self) -> float:
+        return max(self._values)
+
+
+class IncrementalFeatureEngine:
+    """
+    Stateful, streaming counterpart of MarketFeatureProcessor.add_technical_features.
+
+    Keeps the running state of every indicator (EMA / Wilder smoothing, rolling windows,
+    the OBV accumulator) so each appended candle updates all 17 features in O(1)
+    instead of recomputing the whole history. Values follow the pandas_ta formulas used
+    by the batch path, so a replayed history matches the batch output numerically.
+
+    Usage:
+        engine = IncrementalFeatureEngine.from_frame(history_df)
+        features = engine.append(candle_ts, {'open': ..., 'high': ..., 'low': ..., 'close': ..., 'volume': ...})
+    """
+
+    def __init__(self):
+        self.bars = 0
+        self.last_timestamp: Optional[Timestamp] = None
+        self.last_features: Optional[Dict[str, float]] = None
+
+        self._prev_close = NAN
+        self._prev_high = NAN
+        self._prev_low = NAN
+        self._prev_tp = NAN
+        self._prev_oi = NAN
+
+        # Trend
+        self._ema200 = _EMA(200)
+        self._ema50 = _EMA(50)
+        self._ema50_hist = deque([NAN] * 3, maxlen=3)
+        self._atr = _EMA(14, alpha=1 / 14)
+        self._dm_pos = _RMA(14)
+        self._dm_neg = _RMA(14)
+        self._adx = _RMA(14)
+
+        # Momentum
+        self._rsi_gain = _RMA(14)
+        self._rsi_loss = _RMA(14)
+        self._ema12 = _EMA(12)
+        self._ema26 = _EMA(26)
+        self._macd_signal = _EMA(9)
+        self._rsi_window = _Window(14)
+        self._stoch_window = _Window(3)
+
+        # Volatility
+        self._bb_window = _Window(20)
+        self._log_return_window = _Window(20)
+
+        # Volume
+        self._volume_window = _Window(20)
+        self._obv = 0.0
+        self._mf_pos_window = _Window(14)
+        self._mf_neg_window = _Window(14)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'IncrementalFeatureEngine':
+        """Builds an engine whose state reflects every candle in ``df`` (replayed in index order)."""
+        engine = cls()
+        engine.extend(df)
+        return engine
+
+    @property
+    def is_warm(self) -> bool:
+        """True once every feature is defined (i.e. the batch path would no longer drop the row)."""
+        return self.last_features is not None and all(v == v for v in self.last_features.values())
+
+    def extend(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Appends every row of ``df`` and returns the feature values per row.
+
+        Args:
+            df (pd.DataFrame): Same layout as MarketFeatureProcessor input (Datetime index,
+                               OHLCV columns and optionally 'open_interest' / 'funding_rate').
+
+        Returns:
+            pd.DataFrame: FEATURE_COLUMNS indexed like ``df``. Warm-up rows hold NaNs,
+                          so ``df.join(result).dropna()`` equals the batch output.
+        """
+        df = df.sort_index()
+        rows = [self.append(ts, candle) for ts, candle in zip(df.index, df.to_dict(orient='records'))]
+        return pd.DataFrame(rows, index=df.index, columns=FEATURE_COLUMNS)
+
+    def preview(self, timestamp: Timestamp, candle: Mapping[str, float]) -> Dict[str, float]:
+        """Features for a still-forming candle without committing it to the running state."""
+        return self.copy().append(timestamp, candle)
+
+    def copy(self) -> 'IncrementalFeatureEngine':
+        """Independent snapshot of the running state (cheaper than copy.deepcopy)."""
+        clone = object.__new__(IncrementalFeatureEngine)
+        clone.__dict__ = {
+            name: value.copy() if isinstance(value, (_EWM, _EMA, _Window, deque)) else value
+            for name, value in self.__dict__.items()
+        }
+        return clone
+
+    def append(self, timestamp: Timestamp, candle: Mapping[str, float]) -> Dict[str, float]:
+        """
+        Commits one closed candle and returns its 17 feature values.
+
+        Args:
+            timestamp: Candle open time (pd.Timestamp / datetime, or epoch ms as returned by ccxt).
+            candle: Mapping with 'open', 'high', 'low', 'close', 'volume' and optionally
+                    'open_interest' / 'funding_rate'.
+        """
+        high = float(candle['high'])
+        low = float(candle['low'])
+        close = float(candle['close'])
+        volume = float(candle['volume'])
+        prev_close = self._prev_close
+
+        # ---------------------------------------------------------
+        # Group 1: Trend & Price Action
+        # ---------------------------------------------------------
+        log_return = _log(_div(close, prev_close)) if prev_close == prev_close else NAN
+
+        ema_200 = self._ema200.update(close)
+        dist_ema200 = _div(close - ema_200, ema_200)
+
+        ema_50 = self._ema50.update(close)
+        slope_ema50 = (ema_50 - self._ema50_hist[0]) / 3
+        self._ema50_hist.append(ema_50)
+
+        candle_range = high - low
+
+        # True range feeds both ADX and ATR (the first bar has no previous close: its range)
+        if prev_close == prev_close:
+            true_range = max(abs(high - low), abs(high - prev_close), abs(prev_close - low))
+        else:
+            true_range = abs(high - low)
+        atr = self._atr.update(true_range)
+
+        if self.bars:
+            up = high - self._prev_high
+            dn = self._prev_low - low
+            dm_pos = up if (up > dn and up > 0) else 0.0
+            dm_neg = dn if (dn > up and dn > 0) else 0.0
+            dm_pos = 0.0 if abs(dm_pos) < EPSILON else dm_pos
+            dm_neg = 0.0 if abs(dm_neg) < EPSILON else dm_neg
+        else:
+            dm_pos = dm_neg = NAN
+        k = _div(100.0, atr)
+        dmp = k * self._dm_pos.update(dm_pos)
+        dmn = k * self._dm_neg.update(dm_neg)
+        dx = _div(100.0 * abs(dmp - dmn), dmp + dmn)
+        adx = self._adx.update(dx)
+
+        # ---------------------------------------------------------
+        # Group 2: Momentum
+        # ---------------------------------------------------------
+        change = close - prev_close
+        gain = self._rsi_gain.update(change if not change < 0 else 0.0)
+        loss = self._rsi_loss.update(change if not change > 0 else 0.0)
+        rsi = _div(100.0 * gain, gain + abs(loss))
+
+        macd = self._ema12.update(close) - self._ema26.update(close)
+        macd_hist = macd - self._macd_signal.update(macd) if macd == macd else NAN
+
+        stoch_k = NAN
+        if self._rsi_window.push(rsi):
+            lowest, highest = self._rsi_window.min(), self._rsi_window.max()
+            rsi_range = highest - lowest
+            stoch = 100.0 * (rsi - lowest) / rsi_range if rsi_range else 0.0
+        else:
+            stoch = NAN
+        if self._stoch_window.push(stoch):
+            stoch_k = self._stoch_window.mean()
+
+        # ---------------------------------------------------------
+        # Group 3: Volatility
+        # ---------------------------------------------------------
+        bb_width = NAN
+        if self._bb_window.push(close):
+            mid = self._bb_window.mean()
+            deviation = 2.0 * self._bb_window.std(ddof=1)
+            bb_width = _div(100.0 * ((mid + deviation) - (mid - deviation)), mid)
+
+        hist_volatility = self._log_return_window.std() if self._log_return_window.push(log_return) else NAN
+
+        # ---------------------------------------------------------
+        # Group 4: Volume Analysis
+        # ---------------------------------------------------------
+        rvol = _div(volume, self._volume_window.mean()) if self._volume_window.push(volume) else NAN
+
+        # pandas_ta.obv leaves the first bar NaN (no previous close to sign its volume)
+        if close > prev_close:
+            self._obv += volume
+        elif close < prev_close:
+            self._obv -= volume
+        obv = self._obv if self.bars else NAN
+
+        typical_price = (high + low + close) / 3.0
+        money_flow = typical_price * volume
+        tp_change = typical_price - self._prev_tp
+        pos_ready = self._mf_pos_window.push(money_flow if tp_change > 0 else 0.0)
+        neg_ready = self._mf_neg_window.push(money_flow if tp_change < 0 else 0.0)
+        if pos_ready and neg_ready:
+            pos_sum, neg_sum = self._mf_pos_window.sum(), self._mf_neg_window.sum()
+            mfi = _div(100.0 * pos_sum, pos_sum + neg_sum)
+        else:
+            mfi = NAN
+
+        # ---------------------------------------------------------
+        # Group 5 & 6: Time, Futures & Sentiment
+        # ---------------------------------------------------------
+        if 'open_interest' in candle:
+            open_interest = float(candle['open_interest'])
+            oi_change = _div(open_interest, self._prev_oi) - 1.0 if self._prev_oi == self._prev_oi else NAN
+            self._prev_oi = open_interest
+        else:
+            oi_change = 0.0
+        funding_rate = float(candle['funding_rate']) if 'funding_rate' in candle else 0.0
+
+        self._prev_close = close
+        self._prev_high = high
+        self._prev_low = low
+        self._prev_tp = typical_price
+        self.bars += 1
+        self.last_timestamp = timestamp
+
+        values = (
+            log_return, dist_ema200, slope_ema50, candle_range, adx,
+            rsi, macd_hist, stoch_k,
+            atr, bb_width, hist_volatility,
+            rvol, obv, mfi,
+            float(_hour(timestamp)),
+            oi_change, funding_rate,
+        )
+        self.last_features = dict(zip(FEATURE_COLUMNS, values))
+        return self.last_features
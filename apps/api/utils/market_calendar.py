@@ -1,10 +1,10 @@
-from datetime import datetime
+from src.python.utils.market_calendar import calendar_service, exchange_status
 
-def is_trading_day():
+
+def is_trading_day() -> bool:
     """
-    Checks if today is a trading day.
-    This is a mock implementation. In minimal viable product, crypto is 24/7.
-    If stocks, we would check weekends/holidays.
+    Checks if today is a trading day for the configured exchange (EXCHANGE_TYPE / EXCHANGE_NAME).
+    Sync and I/O free, so it is safe inside request handlers; crypto reports the exchange
+    status polled in the background by ``exchange_status``.
     """
-    # Crypto markets are always open
-    return True
+    return calendar_service.is_open()
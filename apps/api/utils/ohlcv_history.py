@@ -0,0 +1,101 @@
+import time
+from typing import List, Optional
+
+# Safety cap on pages per request so a misbehaving exchange cannot loop forever
+MAX_PAGES = 50
+
+# Candles per call when ccxt does not publish the exchange's fetchOHLCV limit
+DEFAULT_PAGE_SIZE = 500
+
+
+def ohlcv_page_size(exchange) -> int:
+    """
+    Maximum candles per fetch_ohlcv call for the client's market type, from ccxt's
+    ``exchange.features`` (e.g. Binance spot: 1000), or DEFAULT_PAGE_SIZE when unknown.
+    """
+    features = getattr(exchange, 'features', None) or {}
+    market_type = (getattr(exchange, 'options', None) or {}).get('defaultType') or 'spot'
+    section = features.get(market_type) or features.get('spot') or {}
+    if 'fetchOHLCV' not in section:
+        # Derivatives are split by settlement: {'linear': {...}, 'inverse': {...}}
+        section = next((v for v in section.values() if isinstance(v, dict) and v.get('fetchOHLCV')), {})
+    limit = (section.get('fetchOHLCV') or {}).get('limit')
+    return int(limit) if limit else DEFAULT_PAGE_SIZE
+
+
+async def fetch_ohlcv_history(exchange, symbol: str, timeframe: str, count: int) -> List[list]:
+    """
+    Fetches the latest ``count`` candles, paginating backwards when one call returns fewer.
+
+    Every call asks for at most the exchange's page size (ohlcv_page_size): some exchanges
+    reject an over-sized ``limit`` instead of truncating it. If a page comes back shorter,
+    the size actually returned is used as the page length; older pages are requested with
+    ``since`` until ``count`` bars are collected or the exchange has no older history.
+
+    Args:
+        exchange: ccxt async exchange instance.
+        symbol (str): Unified ccxt symbol, e.g. 'BTC/USDT'.
+        timeframe (str): ccxt timeframe, e.g. '1h'.
+        count (int): Number of candles wanted.
+
+    Returns:
+        List[list]: ccxt OHLCV rows [timestamp, open, high, low, close, volume], oldest first.
+    """
+    candles = await exchange.fetch_ohlcv(
+        symbol, timeframe=timeframe, limit=min(count, ohlcv_page_size(exchange))
+    )
+    if not candles or len(candles) >= count:
+        return candles[-count:] if candles else []
+
+    page = len(candles)
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    for _ in range(MAX_PAGES):
+        if len(candles) >= count:
+            break
+        oldest = candles[0][0]
+        batch = await exchange.fetch_ohlcv(
+            symbol, timeframe=timeframe, since=oldest - page * tf_ms, limit=page
+        )
+        older = [c for c in batch or [] if c[0] < oldest]
+        if not older:
+            break  # No earlier history on the exchange
+        candles = older + candles
+
+    return candles[-count:]
+
+
+async def fetch_ohlcv_since(exchange, symbol: str, timeframe: str, since: int,
+                            until: Optional[int] = None, limit: Optional[int] = None) -> List[list]:
+    """
+    Fetches candles with ``since <= timestamp < until``, paginating forward.
+
+    Without ``until`` it stops at the still-forming candle (the one whose bar has not
+    closed yet) or when the exchange returns nothing newer.
+
+    Args:
+        exchange: ccxt async exchange instance.
+        symbol (str): Unified ccxt symbol, e.g. 'BTC/USDT'.
+        timeframe (str): ccxt timeframe, e.g. '1h'.
+        since (int): First candle open time (epoch ms, inclusive).
+        until (int, optional): Stop before this open time (epoch ms, exclusive).
+        limit (int, optional): Page size per call (exchange default if omitted), capped at
+            ohlcv_page_size: some exchanges reject an over-sized ``limit``.
+
+    Returns:
+        List[list]: ccxt OHLCV rows, oldest first.
+    """
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    if limit is not None:
+        limit = min(limit, ohlcv_page_size(exchange))
+    candles = []
+    cursor = since
+    for _ in range(MAX_PAGES):
+        batch = await exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=cursor, limit=limit)
+        batch = [c for c in batch or [] if c[0] >= cursor and (until is None or c[0] < until)]
+        if not batch:
+            break
+        candles += batch
+        cursor = batch[-1][0] + tf_ms
+        if (until is not None and cursor >= until) or cursor > time.time() * 1000:
+            break
+    return candles
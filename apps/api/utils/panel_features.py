@@ -0,0 +1,273 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from apps.api.utils.technical_features import FEATURE_COLUMNS
+
+# ---------------------------------------------------------
+# Vectorized kernels over a (symbols x bars) panel.
+# Every kernel works along axis=1 (time) and is vectorized across axis=0 (symbols).
+# They reproduce the pandas / pandas_ta formulas used by MarketFeatureProcessor.
+# ---------------------------------------------------------
+
+
+def _shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[:, periods:] = x[:, :-periods]
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, adjust: bool, min_periods: int = 0) -> np.ndarray:
+    """pandas Series.ewm(alpha=..., adjust=..., min_periods=...).mean() (ignore_na=False), row-wise."""
+    decay = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    x = np.ascontiguousarray(x.T)  # time-major so each step reads a contiguous row
+    bars, rows = x.shape
+    out = np.empty_like(x)
+    weighted = np.full(rows, np.nan)
+    old_wt = np.ones(rows)
+    nobs = np.zeros(rows, dtype=np.int64)
+    for t in range(bars):
+        cur = x[t]
+        is_obs = ~np.isnan(cur)
+        nobs += is_obs
+        started = ~np.isnan(weighted)
+
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        update = started & is_obs
+        blended = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+        weighted = np.where(update & (weighted != cur), blended, weighted)
+        if adjust:
+            old_wt = np.where(update, old_wt + new_wt, old_wt)
+        else:
+            old_wt = np.where(update, 1.0, old_wt)
+        weighted = np.where(~started & is_obs, cur, weighted)
+
+        out[t] = np.where(nobs >= max(min_periods, 1), weighted, np.nan)
+    return out.T
+
+
+def _rma(x: np.ndarray, length: int) -> np.ndarray:
+    """pandas_ta.rma: ewm(alpha=1/length, adjust=False)."""
+    return _ewm(x, alpha=1.0 / length, adjust=False)
+
+
+def _ema(x: np.ndarray, length: int, alpha: Optional[float] = None) -> np.ndarray:
+    """
+    pandas_ta.ema with the SMA seed; ``x`` must start at column 0 for every row.
+    With ``alpha=1/length`` this is pandas_ta.atr's SMA-seeded Wilder smoothing.
+    """
+    if x.shape[1] < length:
+        return np.full_like(x, np.nan)
+    seeded = x.copy()
+    seeded[:, :length - 1] = np.nan
+    with np.errstate(invalid='ignore'):
+        seeded[:, length - 1] = np.nanmean(x[:, :length], axis=1)
+    return _ewm(seeded, alpha=2.0 / (length + 1) if alpha is None else alpha, adjust=False)
+
+
+def _rolling(x: np.ndarray, window: int, reducer, **kwargs) -> np.ndarray:
+    """Trailing rolling reduction; NaN until the window is full or while it contains a NaN."""
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = reducer(sliding_window_view(x, window, axis=1), axis=-1, **kwargs)
+    return out
+
+
+def _align_left(x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Rolls each row left so its first valid bar sits at column 0 (kernels are causal)."""
+    cols = (np.arange(x.shape[1])[None, :] + starts[:, None]) % x.shape[1]
+    return np.take_along_axis(x, cols, axis=1)
+
+
+def _align_right(x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    cols = (np.arange(x.shape[1])[None, :] - starts[:, None]) % x.shape[1]
+    out = np.take_along_axis(x, cols, axis=1)
+    out[np.arange(x.shape[1])[None, :] < starts[:, None]] = np.nan
+    return out
+
+
+def _hours(timestamps: Sequence) -> np.ndarray:
+    timestamps = np.asarray(timestamps)
+    if np.issubdtype(timestamps.dtype, np.number):
+        # ccxt epoch milliseconds
+        return ((timestamps // 3_600_000) % 24).astype(np.float64)
+    return pd.DatetimeIndex(timestamps).hour.to_numpy(dtype=np.float64)
+
+
+def compute_panel_features(
+    timestamps: Sequence,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    open_interest: Optional[np.ndarray] = None,
+    funding_rate: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Computes the 17 MarketFeatureProcessor features for many symbols in one vectorized pass.
+
+    Args:
+        timestamps: Bar open times shared by all symbols (length = bars).
+        open_, high, low, close, volume (np.ndarray): Aligned arrays of shape (symbols, bars).
+            Symbols listed later than others may be NaN-padded at the start; bars after
+            the first valid one are expected to be contiguous.
+        open_interest, funding_rate (np.ndarray, optional): Same shape. Missing -> features are 0.0.
+
+    Returns:
+        np.ndarray: Feature tensor of shape (symbols, bars, 17), columns ordered as FEATURE_COLUMNS.
+                    Warm-up bars hold NaNs (MarketFeatureProcessor drops those rows).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim != 2:
+        raise ValueError("Panel arrays must have shape (symbols, bars)")
+    n_symbols, n_bars = close.shape
+    valid = ~np.isnan(close)
+    starts = np.where(valid.any(axis=1), valid.argmax(axis=1), 0)
+
+    def prep(arr):
+        arr = np.asarray(arr, dtype=np.float64)
+        if arr.shape != close.shape:
+            raise ValueError(f"Panel arrays must share shape {close.shape}, got {arr.shape}")
+        return _align_left(arr, starts)
+
+    c, h, l, v = prep(close), prep(high), prep(low), prep(volume)
+    prev_c = _shift(c)
+    features = np.empty((len(FEATURE_COLUMNS), n_symbols, n_bars))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Group 1: Trend & Price Action
+        log_return = np.log(c / prev_c)
+        ema_200 = _ema(c, 200)
+        ema_50 = _ema(c, 50)
+
+        # The first bar has no previous close, so its true range is its high-low range
+        true_range = np.fmax(np.fmax(np.abs(h - l), np.abs(h - prev_c)), np.abs(prev_c - l))
+        atr = _ema(true_range, 14, alpha=1 / 14)
+
+        up = h - _shift(h)
+        dn = _shift(l) - l
+        dm_pos = np.where((up > dn) & (up > 0), up, 0.0)
+        dm_neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+        dm_pos[np.abs(dm_pos) < np.finfo(np.float64).eps] = 0.0
+        dm_neg[np.abs(dm_neg) < np.finfo(np.float64).eps] = 0.0
+        dm_pos[:, 0] = dm_neg[:, 0] = np.nan
+        k = 100.0 / atr
+        dmp = k * _rma(dm_pos, 14)
+        dmn = k * _rma(dm_neg, 14)
+        dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+
+        features[0] = log_return
+        features[1] = (c - ema_200) / ema_200
+        features[2] = (ema_50 - _shift(ema_50, 3)) / 3
+        features[3] = h - l
+        features[4] = _rma(dx, 14)
+
+        # Group 2: Momentum
+        change = c - prev_c
+        gain = _rma(np.where(change < 0, 0.0, change), 14)
+        loss = _rma(np.where(change > 0, 0.0, change), 14)
+        rsi = 100.0 * gain / (gain + np.abs(loss))
+
+        macd = _ema(c, 12) - _ema(c, 26)
+        signal = np.full_like(macd, np.nan)
+        if n_bars >= 26:
+            signal[:, 25:] = _ema(macd[:, 25:], 9)
+
+        lowest = _rolling(rsi, 14, np.min)
+        highest = _rolling(rsi, 14, np.max)
+        rsi_range = highest - lowest
+        stoch = np.where(rsi_range == 0, 0.0, 100.0 * (rsi - lowest) / rsi_range)
+        stoch[np.isnan(rsi_range)] = np.nan
+
+        features[5] = rsi
+        features[6] = macd - signal
+        features[7] = _rolling(stoch, 3, np.mean)
+
+        # Group 3: Volatility
+        mid = _rolling(c, 20, np.mean)
+        deviation = 2.0 * _rolling(c, 20, np.std, ddof=1)
+        features[8] = atr
+        features[9] = 100.0 * ((mid + deviation) - (mid - deviation)) / mid
+        features[10] = _rolling(log_return, 20, np.std, ddof=1)
+
+        # Group 4: Volume Analysis
+        features[11] = v / _rolling(v, 20, np.mean)
+        # pandas_ta.obv leaves the first bar NaN (no previous close to sign its volume)
+        direction = np.sign(change)
+        direction[:, 0] = 0.0
+        features[12] = np.cumsum(direction * v, axis=1)
+        features[12][:, 0] = np.nan
+
+        typical_price = (h + l + c) / 3.0
+        money_flow = typical_price * v
+        tp_change = typical_price - _shift(typical_price)
+        pos_sum = _rolling(np.where(tp_change > 0, money_flow, 0.0), 14, np.sum)
+        neg_sum = _rolling(np.where(tp_change < 0, money_flow, 0.0), 14, np.sum)
+        features[13] = 100.0 * pos_sum / (pos_sum + neg_sum)
+
+        # Group 5: Time (same clock for every symbol)
+        features[14] = _hours(timestamps)[None, :]
+
+        # Group 6: Futures & Sentiment
+        if open_interest is not None:
+            oi = prep(open_interest)
+            features[15] = oi / _shift(oi) - 1.0
+        else:
+            features[15] = 0.0
+        features[16] = prep(funding_rate) if funding_rate is not None else 0.0
+
+    # The clock was never shifted, so time_hour only needs its pre-listing bars masked
+    for i, name in enumerate(FEATURE_COLUMNS):
+        if name == 'time_hour':
+            features[i][np.arange(n_bars)[None, :] < starts[:, None]] = np.nan
+        else:
+            features[i] = _align_right(features[i], starts)
+    return np.moveaxis(features, 0, -1)
+
+
+def panel_from_frames(frames: Mapping[str, pd.DataFrame]) -> Tuple[List[str], pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    """
+    Aligns per-symbol OHLCV frames (MarketFeatureProcessor layout) on the union of their timestamps.
+
+    Returns:
+        (symbols, timestamps, arrays) where arrays maps column name -> (symbols, bars) ndarray.
+    """
+    symbols = list(frames)
+    wide = pd.concat(frames, axis=1).sort_index()
+    arrays = {}
+    for col in ('open', 'high', 'low', 'close', 'volume', 'open_interest', 'funding_rate'):
+        if not all(col in frames[s].columns for s in symbols):
+            continue
+        arrays[col] = wide.xs(col, axis=1, level=1)[symbols].to_numpy(dtype=np.float64).T
+    return symbols, pd.DatetimeIndex(wide.index), arrays
+
+
+def panel_features_frame(
+    symbols: Sequence[str],
+    timestamps: Sequence,
+    features: np.ndarray,
+    dropna: bool = True,
+) -> pd.DataFrame:
+    """
+    Converts a (symbols, bars, features) tensor into a long-format frame indexed by (symbol, datetime).
+    With dropna=True, rows match what MarketFeatureProcessor.add_technical_features keeps per symbol.
+    """
+    n_symbols, n_bars, _ = features.shape
+    index = pd.MultiIndex.from_product([list(symbols), pd.DatetimeIndex(timestamps)], names=['symbol', 'datetime'])
+    df = pd.DataFrame(features.reshape(n_symbols * n_bars, -1), index=index, columns=FEATURE_COLUMNS)
+    return df.dropna() if dropna else df
+
+
+def compute_universe_features(frames: Mapping[str, pd.DataFrame], dropna: bool = True) -> pd.DataFrame:
+    """Full-universe feature refresh: per-symbol frames in, one vectorized pass, long-format frame out."""
+    symbols, timestamps, arrays = panel_from_frames(frames)
+    features = compute_panel_features(
+        timestamps,
+        arrays['open'], arrays['high'], arrays['low'], arrays['close'], arrays['volume'],
+        open_interest=arrays.get('open_interest'),
+        funding_rate=arrays.get('funding_rate'),
+    )
+    return panel_features_frame(symbols, timestamps, features, dropna=dropna)
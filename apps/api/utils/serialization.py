@@ -0,0 +1,264 @@
+"""
+Compact encodings for market-data responses.
+
+Layouts:
+- records (legacy): one JSON object per row with an ISO 'timestamp'.
+- columnar: one array per column, epoch-ms 'timestamp', optional float32 values.
+
+Columnar payloads can be sent as JSON (orjson), MessagePack or an Arrow IPC stream,
+selected with the Accept header. msgpack and pyarrow are optional; orjson falls back
+to the stdlib json module when it is not installed.
+
+Streamed responses (StreamEncoder) send the same layouts in row batches: NDJSON lines,
+concatenated MessagePack maps (both after a leading {"meta": ...} record), or one Arrow
+record batch per chunk.
+"""
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+NDJSON = "application/x-ndjson"
+
+# Accepted media type aliases -> canonical media type
+MEDIA_TYPES = {
+    JSON: JSON,
+    "application/*": JSON,
+    "*/*": JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    ARROW: ARROW,
+    "application/vnd.apache.arrow.file": ARROW,
+}
+
+
+# Streamed responses: JSON is sent as newline-delimited JSON
+STREAM_MEDIA_TYPES = {
+    **{alias: NDJSON if media == JSON else media for alias, media in MEDIA_TYPES.items()},
+    NDJSON: NDJSON,
+    "application/jsonl": NDJSON,
+}
+
+
+class NotAcceptable(Exception):
+    """None of the media types in the Accept header can be produced."""
+
+
+def available(media_type: str) -> bool:
+    if media_type == MSGPACK:
+        return msgpack is not None
+    if media_type == ARROW:
+        return pa is not None
+    return media_type in (JSON, NDJSON)
+
+
+def negotiate(accept: Optional[str], streaming: bool = False) -> str:
+    """
+    Picks the response media type from an Accept header (highest q first, JSON by default).
+    With ``streaming`` the JSON choices resolve to NDJSON.
+
+    Raises:
+        NotAcceptable: Only unknown or uninstalled media types were requested.
+    """
+    media_types = STREAM_MEDIA_TYPES if streaming else MEDIA_TYPES
+    if not accept:
+        return NDJSON if streaming else JSON
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        candidates.append((-quality, position, media.strip().lower()))
+
+    for neg_quality, _, media in sorted(candidates):
+        canonical = media_types.get(media)
+        if neg_quality < 0 and canonical and available(canonical):
+            return canonical
+    raise NotAcceptable(f"Supported media types: {NDJSON if streaming else JSON}, {MSGPACK}, {ARROW}")
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_json_default, allow_nan=False).encode()
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return [None if isinstance(v, float) and v != v else v for v in value.tolist()]
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_envelope(data: bytes, **meta) -> bytes:
+    """Wraps an already encoded JSON ``data`` document as {**meta, "data": data} without re-parsing it."""
+    head = dumps(meta)
+    separator = b"," if len(head) > 2 else b""
+    return head[:-1] + separator + b'"data":' + data + b"}"
+
+
+def epoch_ms(index: pd.Index) -> np.ndarray:
+    """Datetime index -> int64 epoch milliseconds (tz-aware indexes are taken as UTC)."""
+    return pd.DatetimeIndex(index).as_unit("ms").asi8
+
+
+def frame_columns(df: pd.DataFrame, float32: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Column arrays for a frame with a Datetime index: 'timestamp' (epoch ms, from the index)
+    followed by every other column as float64, or float32 when ``float32`` is set.
+    """
+    dtype = np.float32 if float32 else np.float64
+    columns = {"timestamp": epoch_ms(df.index)}
+    for name in df.columns:
+        if name != "timestamp":
+            columns[str(name)] = df[name].to_numpy(dtype=dtype, na_value=np.nan)
+    return columns
+
+
+def encode_records(df: pd.DataFrame) -> bytes:
+    """Legacy records layout: [{'timestamp': ISO string, 'open': ..., ...}, ...] oldest first."""
+    records = df.drop(columns="timestamp", errors="ignore")
+    records.insert(0, "timestamp", pd.DatetimeIndex(df.index).map(pd.Timestamp.isoformat))
+    return dumps(records.to_dict(orient="records"))
+
+
+def encode_columns(df: pd.DataFrame, media_type: str = JSON, meta: Optional[Dict[str, Any]] = None,
+                   float32: bool = False) -> bytes:
+    """
+    Encodes ``df`` in the columnar layout.
+
+    - JSON: ``data`` document {"rows": n, "columns": [...], "timestamp": [...], <col>: [...]};
+      wrap it with json_envelope to add ``meta``.
+    - MessagePack: the same document plus ``meta`` keys in one map (NaN stays NaN).
+    - Arrow IPC stream: one record batch, ``meta`` stored as schema metadata.
+    """
+    columns = frame_columns(df, float32=float32)
+    meta = meta or {}
+
+    if media_type == ARROW:
+        if pa is None:
+            raise NotAcceptable("pyarrow is not installed")
+        table = pa.table(columns).replace_schema_metadata({k: str(v) for k, v in meta.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    document = {"rows": len(df), "columns": list(columns), **columns}
+    if media_type == MSGPACK:
+        if msgpack is None:
+            raise NotAcceptable("msgpack is not installed")
+        packed = {**meta, **{k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in document.items()}}
+        return msgpack.packb(packed, use_single_float=float32)
+    return dumps(document)
+
+
+class StreamEncoder:
+    """
+    Encodes a response as a sequence of row batches, so nothing but the current batch is held.
+
+    - NDJSON, records layout: one JSON object per row ('timestamp' as ISO string).
+    - NDJSON, columnar layout: one columnar document (see encode_columns) per line and batch.
+    - MessagePack: one columnar map per batch, concatenated (read with msgpack.Unpacker).
+    - Arrow: a single IPC stream, one record batch per chunk; ``meta`` is schema metadata.
+
+    NDJSON and MessagePack streams start with a {"meta": {...}} record. ``columns`` (the value
+    columns) gives an empty Arrow stream its schema.
+
+    Call ``encode(df)`` for each batch and ``close()`` once at the end.
+    """
+
+    def __init__(self, media_type: str = NDJSON, layout: str = "records", float32: bool = False,
+                 meta: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None):
+        if not available(media_type):
+            raise NotAcceptable(f"{media_type} is not available")
+        self.media_type = media_type
+        self.layout = layout
+        self.float32 = float32
+        self.meta = meta or {}
+        self.columns = columns or []
+        self.rows = 0
+        self._header_sent = False
+        self._sink: Optional[io.BytesIO] = None
+        self._writer = None
+
+    def _header(self) -> bytes:
+        """The leading meta record (NDJSON / MessagePack), once."""
+        if self._header_sent or self.media_type == ARROW:
+            return b""
+        self._header_sent = True
+        if self.media_type == MSGPACK:
+            return msgpack.packb({"meta": self.meta})
+        return dumps({"meta": self.meta}) + b"\n"
+
+    def encode(self, df: pd.DataFrame) -> bytes:
+        self.rows += len(df)
+        if self.media_type == ARROW:
+            return self._encode_arrow(df)
+        if self.media_type == MSGPACK:
+            return self._header() + encode_columns(df, MSGPACK, float32=self.float32)
+        if self.layout == "columnar":
+            return self._header() + encode_columns(df, float32=self.float32) + b"\n"
+        records = df.drop(columns="timestamp", errors="ignore")
+        records.insert(0, "timestamp", pd.DatetimeIndex(df.index).map(pd.Timestamp.isoformat))
+        return self._header() + b"".join(dumps(row) + b"\n" for row in records.to_dict(orient="records"))
+
+    def _encode_arrow(self, df: pd.DataFrame) -> bytes:
+        batch = pa.record_batch(frame_columns(df, float32=self.float32))
+        self._open_arrow(batch.schema)
+        self._writer.write_batch(batch)
+        return self._drain()
+
+    def _open_arrow(self, schema):
+        if self._writer is None:
+            self._sink = io.BytesIO()
+            schema = schema.with_metadata({k: str(v) for k, v in self.meta.items()})
+            self._writer = pa.ipc.new_stream(self._sink, schema)
+
+    def _drain(self) -> bytes:
+        chunk = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return chunk
+
+    def close(self) -> bytes:
+        """
+        Trailing bytes: the Arrow end-of-stream marker (preceded by the schema when no batch
+        was written, so an empty result is still a valid IPC stream), or the meta record of an
+        empty NDJSON / MessagePack stream.
+        """
+        if self.media_type != ARROW:
+            return self._header()
+        if self._writer is None:
+            empty = pd.DataFrame(columns=self.columns, index=pd.DatetimeIndex([]))
+            self._open_arrow(pa.record_batch(frame_columns(empty, float32=self.float32)).schema)
+        self._writer.close()
+        return self._drain()
@@ -1,143 +1,293 @@
+import math
 import pandas as pd
 import numpy as np
 import pandas_ta as ta
+from pandas_ta.utils import non_zero_range, zero
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# The 17 feature columns appended by MarketFeatureProcessor, in output order.
+FEATURE_COLUMNS = [
+    'trend_log_return', 'trend_dist_ema200', 'trend_slope_ema50', 'trend_candle_range', 'trend_adx',
+    'mom_rsi', 'mom_macd_hist', 'mom_stoch_rsi_k',
+    'vol_atr', 'vol_bb_width', 'vol_hist_volatility',
+    'volume_rvol', 'volume_obv', 'volume_mfi',
+    'time_hour',
+    'fut_oi_change', 'fut_funding_rate',
+]
+
+
+class FeatureNode(NamedTuple):
+    """
+    One node of the feature graph.
+
+    deps:    Names of the nodes this one is computed from.
+    warmup:  Leading bars that stay NaN on top of the deepest dependency's warm-up.
+    compute: fn(df, values) -> pd.Series, where ``values`` holds the already computed deps.
+    alpha:   Smoothing factor of the slowest recursive (EMA / Wilder) filter in the node, if any.
+             Its value keeps a memory of the start of the window that decays as (1 - alpha) ** n.
+    """
+    deps: Tuple[str, ...]
+    warmup: int
+    compute: Callable[[pd.DataFrame, Dict[str, pd.Series]], pd.Series]
+    alpha: Optional[float] = None
+
+
+def _empty(df):
+    # pandas_ta returns None when the frame is shorter than the indicator length
+    return pd.Series(np.nan, index=df.index)
+
+# ---------------------------------------------------------
+# Shared intermediates (computed once, reused by several features)
+# ---------------------------------------------------------
+
+def _log_return(df, v):
+    # ln(Close / Prev Close) - Normalizes price changes
+    return np.log(df['close'] / df['close'].shift(1))
+
+def _atr(df, v):
+    # Average True Range (Wilder smoothing), also the normaliser of ADX
+    return ta.atr(df['high'], df['low'], df['close'], length=14)
+
+def _rsi(df, v):
+    return ta.rsi(df['close'], length=14)
+
+# ---------------------------------------------------------
+# Group 1: Trend & Price Action
+# ---------------------------------------------------------
+
+def _dist_ema200(df, v):
+    # 2. Distance from 200 EMA: Percentage distance
+    ema_200 = ta.ema(df['close'], length=200)
+    return (df['close'] - ema_200) / ema_200
+
+def _slope_ema50(df, v):
+    # 3. Slope of EMA 50: 3-period difference of the 50 EMA (trend angle/velocity)
+    ema_50 = ta.ema(df['close'], length=50)
+    return ta.slope(ema_50, length=3)
+
+def _candle_range(df, v):
+    # 4. High-Low Distance: Candle Range (Volatility within the bar)
+    return df['high'] - df['low']
+
+def _adx(df, v):
+    # 5. ADX (14): Trend Strength. Same steps as ta.adx, but normalised by the shared ATR.
+    up = df['high'] - df['high'].shift(1)
+    dn = df['low'].shift(1) - df['low']
+    pos = (((up > dn) & (up > 0)) * up).apply(zero)
+    neg = (((dn > up) & (dn > 0)) * dn).apply(zero)
+    k = 100 / v['atr']
+    dmp = k * ta.rma(pos, length=14)
+    dmn = k * ta.rma(neg, length=14)
+    dx = 100 * (dmp - dmn).abs() / (dmp + dmn)
+    return ta.rma(dx, length=14)
+
+# ---------------------------------------------------------
+# Group 2: Momentum
+# ---------------------------------------------------------
+
+def _macd_hist(df, v):
+    # 7. MACD Histogram: (MACD Line - Signal Line)
+    macd_df = ta.macd(df['close'], fast=12, slow=26, signal=9)
+    if macd_df is None:
+        return _empty(df)
+    # Usually named 'MACDh_12_26_9' for histogram
+    return macd_df['MACDh_12_26_9']
+
+def _stoch_rsi_k(df, v):
+    # 8. StochRSI Fast K. Same steps as ta.stochrsi(length=14, rsi_length=14, k=3), on the shared RSI.
+    rsi = v['rsi']
+    lowest_rsi = rsi.rolling(14).min()
+    highest_rsi = rsi.rolling(14).max()
+    stoch = 100 * (rsi - lowest_rsi) / non_zero_range(highest_rsi, lowest_rsi)
+    return ta.sma(stoch, length=3)
+
+# ---------------------------------------------------------
+# Group 3: Volatility
+# ---------------------------------------------------------
+
+def _bb_width(df, v):
+    # 10. Bollinger Band Width: (Upper - Lower) / Middle
+    # pandas_ta calculates bandwidth directly as 'BBB_20_2.0' ('BBB_20_2.0_2.0' in newer releases)
+    # ddof=1 (sample std) is pandas_ta 0.4's default; passed explicitly so the streaming and
+    # panel paths (incremental_features / panel_features) have one definition to match
+    bbands = ta.bbands(df['close'], length=20, std=2, ddof=1)
+    if bbands is None:
+        return _empty(df)
+    return bbands[next(c for c in bbands.columns if c.startswith('BBB_'))]
+
+def _hist_volatility(df, v):
+    # 11. Historical Volatility: 20-period rolling Std Dev of Log Returns
+    return v['log_return'].rolling(window=20).std()
+
+# ---------------------------------------------------------
+# Group 4: Volume Analysis
+# ---------------------------------------------------------
+
+def _rvol(df, v):
+    # 12. Relative Volume (RVOL): Current Vol / SMA(Vol, 20)
+    return df['volume'] / df['volume'].rolling(window=20).mean()
+
+def _obv(df, v):
+    # 13. OBV: On-Balance Volume
+    return ta.obv(df['close'], df['volume'])
+
+def _mfi(df, v):
+    # 14. MFI (14): Money Flow Index
+    return ta.mfi(df['high'], df['low'], df['close'], df['volume'], length=14)
+
+# ---------------------------------------------------------
+# Group 5: Time / Group 6: Futures & Sentiment
+# ---------------------------------------------------------
+
+def _hour(df, v):
+    # 15. Hour of the Day (0-23) - Cyclical feature
+    return pd.Series(df.index.hour, index=df.index)
+
+def _oi_change(df, v):
+    # 16. Open Interest Change: % Change from previous candle
+    if 'open_interest' in df.columns:
+        return df['open_interest'].pct_change()
+    return pd.Series(0.0, index=df.index)
+
+def _funding_rate(df, v):
+    # 17. Funding Rate: Raw value
+    if 'funding_rate' in df.columns:
+        return df['funding_rate']
+    return pd.Series(0.0, index=df.index)
+
+
+FEATURE_GRAPH: Dict[str, FeatureNode] = {
+    # Intermediates
+    'log_return': FeatureNode((), 1, _log_return),
+    'atr': FeatureNode((), 14, _atr, alpha=1 / 14),
+    'rsi': FeatureNode((), 14, _rsi, alpha=1 / 14),
+    # Output features
+    'trend_log_return': FeatureNode(('log_return',), 0, lambda df, v: v['log_return']),
+    'trend_dist_ema200': FeatureNode((), 199, _dist_ema200, alpha=2 / 201),
+    'trend_slope_ema50': FeatureNode((), 52, _slope_ema50, alpha=2 / 51),
+    'trend_candle_range': FeatureNode((), 0, _candle_range),
+    'trend_adx': FeatureNode(('atr',), 13, _adx, alpha=1 / 14),
+    'mom_rsi': FeatureNode(('rsi',), 0, lambda df, v: v['rsi']),
+    'mom_macd_hist': FeatureNode((), 33, _macd_hist, alpha=2 / 27),
+    'mom_stoch_rsi_k': FeatureNode(('rsi',), 15, _stoch_rsi_k),
+    'vol_atr': FeatureNode(('atr',), 0, lambda df, v: v['atr']),
+    'vol_bb_width': FeatureNode((), 19, _bb_width),
+    'vol_hist_volatility': FeatureNode(('log_return',), 19, _hist_volatility),
+    'volume_rvol': FeatureNode((), 19, _rvol),
+    'volume_obv': FeatureNode((), 0, _obv),
+    'volume_mfi': FeatureNode((), 13, _mfi),
+    'time_hour': FeatureNode((), 0, _hour),
+    'fut_oi_change': FeatureNode((), 1, _oi_change),
+    'fut_funding_rate': FeatureNode((), 0, _funding_rate),
+}
+
+
+def resolve_features(features: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Validates a feature subset and returns it in FEATURE_COLUMNS order (all features if None).
+    """
+    if features is None:
+        return list(FEATURE_COLUMNS)
+    requested = set(features)
+    unknown = requested.difference(FEATURE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown features: {sorted(unknown)}. Available: {FEATURE_COLUMNS}")
+    return [name for name in FEATURE_COLUMNS if name in requested]
+
+
+def _execution_order(features: Iterable[str]) -> List[str]:
+    """Topological order of every node needed for ``features`` (dependencies first)."""
+    order: List[str] = []
+
+    def visit(name):
+        if name in order:
+            return
+        for dep in FEATURE_GRAPH[name].deps:
+            visit(dep)
+        order.append(name)
+
+    for name in features:
+        visit(name)
+    return order
+
+
+def feature_lookback(name: str, tolerance: Optional[float] = None) -> int:
+    """
+    Number of leading bars for which the feature ``name`` is still NaN.
+
+    With ``tolerance``, recursive filters also get enough extra bars for the weight of their
+    seed (the unseen history before the window) to decay below ``tolerance``, i.e. the values
+    have converged to what a longer history would give.
+    """
+    node = FEATURE_GRAPH[name]
+    bars = max((feature_lookback(dep, tolerance) for dep in node.deps), default=0) + node.warmup
+    if tolerance and node.alpha:
+        bars += math.ceil(math.log(tolerance) / math.log(1 - node.alpha))
+    return bars
+
 
 class MarketFeatureProcessor:
     """
     A production-ready class for Financial Feature Engineering.
     It takes raw OHLCV + Futures Data and appends 17 specific technical 
     and quantitative features for AI/ML models.
+
+    Pass ``features`` to compute only a subset: the feature graph then runs just
+    the indicators (and shared intermediates) those features need.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, features: Optional[Iterable[str]] = None):
+        self.features = resolve_features(features)
+
+    def required_lookback(self, features: Optional[Iterable[str]] = None, tolerance: Optional[float] = None) -> int:
+        """
+        Minimum number of warm-up bars dropped before the first complete row.
+
+        Args:
+            features: Subset to check. Defaults to the processor's features.
+            tolerance: If set, also cover EMA / Wilder convergence to this relative seed weight
+                       (see feature_lookback).
 
-    def add_technical_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        Returns:
+            int: Bars of history needed in front of the first row that should be returned.
         """
-        Generates 17 technical indicators and features based on the master requirement list.
+        selected = resolve_features(features) if features is not None else self.features
+        return max((feature_lookback(name, tolerance) for name in selected), default=0)
+
+    def add_technical_features(self, df: pd.DataFrame, features: Optional[Iterable[str]] = None,
+                               dropna: bool = True) -> pd.DataFrame:
+        """
+        Generates technical indicators and features based on the master requirement list
+        (all 17 unless a subset is selected).
         
         Args:
             df (pd.DataFrame): Input DataFrame with index as Datetime and columns:
                                ['open', 'high', 'low', 'close', 'volume', 'open_interest', 'funding_rate']
+            features: Optional subset of FEATURE_COLUMNS. Defaults to the processor's features.
+            dropna: Drop rows with NaNs (default). False keeps the warm-up rows with NaN features.
         
         Returns:
             pd.DataFrame: DataFrame with added feature columns and NaNs removed.
         """
-        
+        selected = resolve_features(features) if features is not None else self.features
+
         # Ensure the dataframe is sorted by date just in case
         df = df.sort_index()
         
         # Copy to avoid SettingWithCopy warnings on the original df
         df = df.copy()
 
-        # ---------------------------------------------------------
-        # Group 1: Trend & Price Action
-        # ---------------------------------------------------------
-        
-        # 1. Log Returns: ln(Close / Prev Close) - Normalizes price changes
-        df['trend_log_return'] = np.log(df['close'] / df['close'].shift(1))
-
-        # 2. Distance from 200 EMA: Percentage distance
-        # Calculate EMA 200 first
-        ema_200 = ta.ema(df['close'], length=200)
-        df['trend_dist_ema200'] = (df['close'] - ema_200) / ema_200
-
-        # 3. Slope of EMA 50: Measures trend angle/velocity
-        # Using a 3-period difference of the 50 EMA to determine slope
-        ema_50 = ta.ema(df['close'], length=50)
-        df['trend_slope_ema50'] = ta.slope(ema_50, length=3)
-
-        # 4. High-Low Distance: Candle Range (Volatility within the bar)
-        df['trend_candle_range'] = df['high'] - df['low']
-
-        # 5. ADX (14): Trend Strength (Average Directional Index)
-        # pandas_ta returns a DF with ADX, DMP, DMN. We only need ADX (index 0)
-        adx_df = ta.adx(df['high'], df['low'], df['close'], length=14)
-        # Handle case where adx calculation returns None or specific column name
-        if adx_df is not None:
-             df['trend_adx'] = adx_df['ADX_14']
-
-        # ---------------------------------------------------------
-        # Group 2: Momentum
-        # ---------------------------------------------------------
-
-        # 6. RSI (14): Relative Strength Index
-        df['mom_rsi'] = ta.rsi(df['close'], length=14)
-
-        # 7. MACD Histogram: (MACD Line - Signal Line)
-        # ta.macd returns MACD, Histogram, and Signal columns
-        macd_df = ta.macd(df['close'], fast=12, slow=26, signal=9)
-        if macd_df is not None:
-            # Usually named 'MACDh_12_26_9' for histogram
-            df['mom_macd_hist'] = macd_df['MACDh_12_26_9']
-
-        # 8. StochRSI: Stochastic RSI (Fast K)
-        stoch_rsi_df = ta.stochrsi(df['close'], length=14, rsi_length=14, k=3, d=3)
-        if stoch_rsi_df is not None:
-            # We take the K line as the primary oscillator value
-            df['mom_stoch_rsi_k'] = stoch_rsi_df['STOCHRSIk_14_14_3_3']
-
-        # ---------------------------------------------------------
-        # Group 3: Volatility
-        # ---------------------------------------------------------
-
-        # 9. ATR (14): Average True Range
-        df['vol_atr'] = ta.atr(df['high'], df['low'], df['close'], length=14)
-
-        # 10. Bollinger Band Width: (Upper - Lower) / Middle
-        bbands = ta.bbands(df['close'], length=20, std=2)
-        if bbands is not None:
-            # Columns: BBL (Lower), BBM (Middle), BBU (Upper), BBB (Bandwidth), BBP (%B)
-            # pandas_ta calculates bandwidth directly as 'BBB_20_2.0'
-            df['vol_bb_width'] = bbands['BBB_20_2.0']
-
-        # 11. Historical Volatility: Rolling Std Dev of Log Returns
-        # Using a 20-period window
-        df['vol_hist_volatility'] = df['trend_log_return'].rolling(window=20).std()
-
-        # ---------------------------------------------------------
-        # Group 4: Volume Analysis
-        # ---------------------------------------------------------
-
-        # 12. Relative Volume (RVOL): Current Vol / SMA(Vol, 20)
-        vol_sma = df['volume'].rolling(window=20).mean()
-        df['volume_rvol'] = df['volume'] / vol_sma
-
-        # 13. OBV: On-Balance Volume
-        df['volume_obv'] = ta.obv(df['close'], df['volume'])
-
-        # 14. MFI (14): Money Flow Index
-        df['volume_mfi'] = ta.mfi(df['high'], df['low'], df['close'], df['volume'], length=14)
-
-        # ---------------------------------------------------------
-        # Group 5: Time
-        # ---------------------------------------------------------
-
-        # 15. Hour of the Day (0-23) - Cyclical feature
-        df['time_hour'] = df.index.hour
-
-        # ---------------------------------------------------------
-        # Group 6: Futures & Sentiment
-        # ---------------------------------------------------------
-
-        # 16. Open Interest Change: % Change from previous candle
-        # Assuming 'open_interest' column exists as per prompt
-        if 'open_interest' in df.columns:
-            df['fut_oi_change'] = df['open_interest'].pct_change()
-        else:
-            # Fallback if data is missing, though prompt guarantees it
-            df['fut_oi_change'] = 0.0
-
-        # 17. Funding Rate: Raw value
-        # Assuming 'funding_rate' column exists as per prompt
-        if 'funding_rate' in df.columns:
-            df['fut_funding_rate'] = df['funding_rate']
-        else:
-            df['fut_funding_rate'] = 0.0
-
-        # ---------------------------------------------------------
-        # Final Cleanup
-        # ---------------------------------------------------------
+        # Walk the graph once; shared intermediates are computed a single time
+        values: Dict[str, pd.Series] = {}
+        for name in _execution_order(selected):
+            node = FEATURE_GRAPH[name]
+            values[name] = node.compute(df, {dep: values[dep] for dep in node.deps})
+
+        for name in selected:
+            df[name] = values[name]
+
+        if not dropna:
+            return df
 
         # Drop rows with NaN values generated by lookback periods (e.g., EMA 200 needs 200 initial bars)
         df_clean = df.dropna()
@@ -182,8 +332,8 @@ if __name__ == "__main__":
             sys.exit(1)
 
         # 3. Apply Your Existing Indicators (Call your functions here)
-        # Using the class we defined above
-        processor = MarketFeatureProcessor()
+        # Using the class we defined above, limited to the indicators reported below
+        processor = MarketFeatureProcessor(features=['mom_rsi', 'mom_macd_hist', 'vol_bb_width'])
         # yfinance columns might be capitalized differently, or contain MultiIndex if not handled.
         # Check standard yfinance output: Open, High, Low, Close, Volume.
         # Our class expects lowercase columns.
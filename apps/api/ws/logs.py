@@ -1,17 +1,66 @@
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from typing import Optional
 import asyncio
+import json
+import logging
+
+from apps.api.core.log_buffer import log_buffer
 
 router = APIRouter(prefix="/ws", tags=["websocket"])
 
+# Records sent per read from the buffer
+BATCH = 500
+# Seconds an idle stream waits for new records before re-checking the connection
+IDLE_TIMEOUT = 15.0
+
+
+async def _until_disconnect(websocket: WebSocket):
+    """Reads (and ignores) client frames until the client goes away."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
 @router.websocket("/logs")
-async def websocket_logs(websocket: WebSocket):
+async def websocket_logs(
+    websocket: WebSocket,
+    level: str = Query("INFO", description="Minimum level: DEBUG, INFO, WARNING, ERROR, CRITICAL"),
+    category: Optional[str] = Query(None, description="Comma-separated logger name prefixes, e.g. apps.api.core"),
+    since: Optional[int] = Query(None, description="Last sequence number received; replays everything after it"),
+):
+    """
+    Live application logs from the in-process ring buffer.
+
+    Messages: {"type": "log", "seq", "ts", "level", "category", "message"} and, when records
+    after ``since`` were already overwritten, {"type": "gap", "from", "to"}. Reconnect with
+    ``since`` = the last seq received to resume without losing or repeating records.
+    Without ``since`` only new records are streamed.
+    """
+    min_level = logging.getLevelName(level.upper())
     await websocket.accept()
+    if not isinstance(min_level, int):
+        await websocket.close(code=1008, reason=f"Unknown level: {level}")
+        return
+    categories = [c.strip() for c in category.split(",") if c.strip()] if category else []
+    cursor = since if since is not None else log_buffer.last_seq
+
+    # The stream only sends, so a reader task notices disconnects while we wait for records
+    receiver = asyncio.create_task(_until_disconnect(websocket))
     try:
-        while True:
-            # Simulate log stream (from queue or file tail)
-            # In a real scenario, this would subscribe to a log queue
-            await websocket.send_text("Log: New trade executed")
-            await asyncio.sleep(1)
-    except Exception:
-        # Client likely disconnected
-        await websocket.close()
+        while not receiver.done():
+            records, cursor_next, gap = log_buffer.since(cursor, min_level, categories, limit=BATCH)
+            if gap:
+                await websocket.send_text(json.dumps({"type": "gap", "from": gap[0], "to": gap[1]}))
+            for record in records:
+                await websocket.send_text(json.dumps({"type": "log", **{k: v for k, v in record.items() if k != "levelno"}}))
+            if cursor_next == cursor:
+                waiter = asyncio.ensure_future(log_buffer.wait(cursor, timeout=IDLE_TIMEOUT))
+                await asyncio.wait({waiter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+            cursor = cursor_next
+    except (WebSocketDisconnect, RuntimeError):
+        # Client disconnected
+        pass
+    finally:
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
@@ -1,13 +1,205 @@
 import json
+from collections import OrderedDict
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+import itertools
 import logging
 import asyncio
+import time
+
+from apps.api.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# What happens when a client's outbound queue is full
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Close code for clients dropped by the "disconnect" policy (RFC 6455: try again later)
+WS_TRY_AGAIN_LATER = 1013
+
+
+class Client:
+    """
+    One WebSocket connection with its own bounded outbound queue and writer task.
+
+    Producers only enqueue (O(1)); the writer task sends, so a slow client only ever
+    delays itself. Queued messages are (enqueued_at, text) entries in an OrderedDict keyed
+    by a coalesce key: under the "coalesce" policy a newer message with the same key
+    replaces the queued one (latest snapshot wins), otherwise keys are unique.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, websocket: WebSocket, max_queue: int = 256, policy: str = "drop_oldest",
+                 send_timeout: float = 10.0):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow-consumer policy: {policy}. Available: {SLOW_CONSUMER_POLICIES}")
+        self.id = next(self._ids)
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.connected_at = time.time()
+        self.closed = False
+        self._queue: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._ready = asyncio.Event()
+        self._seq = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0, "max_lag_ms": 0.0, "last_lag_ms": 0.0}
+
+    def start(self, on_close):
+        self._task = asyncio.create_task(self._writer(on_close), name=f"ws-writer-{self.id}")
+
+    def enqueue(self, text: str, coalesce_key: Optional[Hashable] = None) -> bool:
+        """Queues ``text``; False if the client must be disconnected (full queue, "disconnect" policy)."""
+        if self.closed:
+            return True
+        now = time.monotonic()
+        if self.policy == "coalesce" and coalesce_key is not None:
+            key = ("c", coalesce_key)
+            if key in self._queue:
+                # Keep the original enqueue time so lag still reflects the oldest unsent update
+                self._queue[key] = (self._queue[key][0], text)
+                self.stats["coalesced"] += 1
+                return True
+        else:
+            key = next(self._seq)
+
+        if len(self._queue) >= self.max_queue:
+            if self.policy == "disconnect":
+                return False
+            self._queue.popitem(last=False)
+            self.stats["dropped"] += 1
+        self._queue[key] = (now, text)
+        self._ready.set()
+        return True
+
+    async def _writer(self, on_close):
+        try:
+            while True:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                _, (enqueued_at, text) = self._queue.popitem(last=False)
+                await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+                lag_ms = (time.monotonic() - enqueued_at) * 1000
+                self.stats["sent"] += 1
+                self.stats["last_lag_ms"] = lag_ms
+                self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag_ms)
+        except asyncio.CancelledError:
+            raise
+        except (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError) as e:
+            logger.info(f"WebSocket client {self.id} dropped: {type(e).__name__}")
+        except Exception as e:
+            logger.error(f"Error sending message to client {self.id}: {e}")
+        on_close(self.websocket)
+
+    def stop(self):
+        """Stops the writer (pending messages are discarded)."""
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    async def close(self, code: int = 1000):
+        self.stop()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # Already closed by the peer
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def lag_ms(self) -> float:
+        """Age of the oldest unsent message (0 when the queue is empty)."""
+        if not self._queue:
+            return 0.0
+        enqueued_at = next(iter(self._queue.values()))[0]
+        return (time.monotonic() - enqueued_at) * 1000
+
+    def metrics(self) -> Dict:
+        return {
+            "id": self.id,
+            "queued": len(self._queue),
+            "lagMs": round(self.lag_ms(), 1),
+            "maxLagMs": round(self.stats["max_lag_ms"], 1),
+            "lastLagMs": round(self.stats["last_lag_ms"], 1),
+            "sent": self.stats["sent"],
+            "dropped": self.stats["dropped"],
+            "coalesced": self.stats["coalesced"],
+            "policy": self.policy,
+        }
+
+
+class ChannelBatcher:
+    """
+    Collects one channel's messages for ``interval`` seconds and sends them as one frame.
+
+    Within a window only the latest message per key is kept (a newer PnL / status snapshot
+    replaces the pending one); messages without a key are all kept. A window with a single
+    message sends it unchanged, otherwise the frame is
+    {"type": "batch", "channel": ..., "messages": [...]}. The frame is serialized once and
+    the same text is queued to every subscriber.
+    """
+
+    def __init__(self, channel: str, interval: float, send: Callable[[str], Awaitable[Any]]):
+        self.channel = channel
+        self.interval = interval
+        self._send = send
+        self._pending: 'OrderedDict[Hashable, dict]' = OrderedDict()
+        self._seq = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"received": 0, "coalesced": 0, "frames": 0}
+
+    def add(self, message: dict, key: Optional[Hashable] = None):
+        self.stats["received"] += 1
+        if key is None:
+            key = ("seq", next(self._seq))
+        elif key in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[key] = message
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_later(), name=f"ws-batch-{self.channel}")
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        self._task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        messages = list(self._pending.values())
+        self._pending.clear()
+        frame = messages[0] if len(messages) == 1 else \
+            {"type": "batch", "channel": self.channel, "messages": messages}
+        self.stats["frames"] += 1
+        await self._send(json.dumps(frame))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._pending.clear()
+
+
 class ConnectionManager:
-    def __init__(self):
+    """
+    Channel-based WebSocket fan-out. Each connection gets a Client (bounded queue + writer
+    task), so ``broadcast`` serializes the message once and enqueues it per subscriber
+    without awaiting any send. Channels listed in ``batch_intervals`` are coalesced and
+    batched per window by a ChannelBatcher before they are fanned out.
+    """
+
+    def __init__(self, max_queue: int = 256, policy: str = "drop_oldest", send_timeout: float = 10.0,
+                 batch_intervals: Optional[Dict[str, float]] = None):
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.clients: Dict[WebSocket, Client] = {}
         self.active_connections: Set[WebSocket] = set()  # All clients
         self.channels: Dict[str, Set[WebSocket]] = {
             "logs": set(),
@@ -15,9 +207,26 @@ class ConnectionManager:
             "status": set(),
             # Future: "alerts": set(), "trades": set() – add easily
         }
+        self.batchers: Dict[str, ChannelBatcher] = {
+            ch: ChannelBatcher(ch, interval, lambda data, ch=ch: self._publish(ch, data))
+            for ch, interval in (batch_intervals or {}).items() if interval > 0
+        }
+        self._stats = {"broadcasts": 0, "frames": 0, "slow_disconnects": 0}
+
+    @classmethod
+    def from_settings(cls) -> "ConnectionManager":
+        return cls(
+            max_queue=settings.WS_QUEUE_SIZE,
+            policy=settings.WS_SLOW_CONSUMER_POLICY,
+            send_timeout=settings.WS_SEND_TIMEOUT,
+            batch_intervals=settings.WS_BATCH_INTERVALS,
+        )
 
-    async def connect(self, websocket: WebSocket, channel: str = "all"):
+    async def connect(self, websocket: WebSocket, channel: str = "all", policy: Optional[str] = None):
         await websocket.accept()
+        client = Client(websocket, self.max_queue, policy or self.policy, self.send_timeout)
+        self.clients[websocket] = client
+        client.start(on_close=self._drop)
         self.active_connections.add(websocket)
         if channel == "all":
             for ch in self.channels:
@@ -32,31 +241,85 @@ class ConnectionManager:
                 self.channels[ch].discard(websocket)
         elif channel in self.channels:
             self.channels[channel].discard(websocket)
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            client.stop()
+
+    def _drop(self, websocket: WebSocket):
+        """Writer task ended (send failed / timed out): forget the connection everywhere."""
+        self.disconnect(websocket, channel="all")
+
+    async def broadcast(self, message: dict, channel: str = "logs", coalesce_key: Optional[Hashable] = None):
+        """
+        Broadcast to specific channel or all.
+
+        ``coalesce_key`` marks snapshot-style messages (e.g. the latest PnL) that may be
+        replaced by a newer one with the same key. On batched channels a message carrying an
+        explicit "key" field defaults to its (type, key) pair; messages without either are
+        never coalesced, only batched. Elsewhere only clients using the "coalesce" policy skip
+        to the newest message, and only when a key is given.
+        """
+        self._stats["broadcasts"] += 1
+        batcher = self.batchers.get(channel)
+        if batcher is not None:
+            if coalesce_key is None and message.get("key") is not None:
+                coalesce_key = (message.get("type"), message["key"])
+            batcher.add(message, coalesce_key)
+            return
+        await self._publish(channel, json.dumps(message), coalesce_key)
 
-    async def broadcast(self, message: dict, channel: str = "logs"):
-        """Broadcast to specific channel or all"""
-        data = json.dumps(message)
-        disconnected = set()
+    async def _publish(self, channel: str, data: str, coalesce_key: Optional[Hashable] = None):
+        """Queues one serialized frame to every subscriber of ``channel``."""
         targets = self.channels.get(channel, self.active_connections)
-        for connection in targets:
-            try:
-                await connection.send_text(data)
-            except WebSocketDisconnect:
-                disconnected.add(connection)
-            except Exception as e:
-                logger.error(f"Error sending message to {connection}: {e}")
-                disconnected.add(connection)
-        
-        # Clean up disconnected
-        for conn in disconnected:
-            self.disconnect(conn, channel if channel in self.channels else "all")
+        self._stats["frames"] += 1
+        slow: List[Client] = []
+        for websocket in targets:
+            client = self.clients.get(websocket)
+            if client is not None and not client.enqueue(data, coalesce_key):
+                slow.append(client)
+
+        # "disconnect" policy: drop clients whose queue is full
+        for client in slow:
+            self._stats["slow_disconnects"] += 1
+            self.disconnect(client.websocket, channel="all")
+            await client.close(code=WS_TRY_AGAIN_LATER)
 
     async def send_personal(self, message: dict, websocket: WebSocket):
+        # Queued behind pending broadcasts so a connection only ever has one sender
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.enqueue(json.dumps(message))
+            return
         try:
             await websocket.send_text(json.dumps(message))
         except RuntimeError:
             # WebSocket might be closed already
             pass
 
+    async def close(self):
+        await asyncio.gather(*(batcher.close() for batcher in self.batchers.values()))
+        clients = list(self.clients.values())
+        for client in clients:
+            self.disconnect(client.websocket, channel="all")
+        await asyncio.gather(*(client.close(code=1001) for client in clients), return_exceptions=True)
+
+    def metrics(self, top: int = 10) -> Dict:
+        clients = list(self.clients.values())
+        lags = [client.lag_ms() for client in clients]
+        return {
+            "clients": len(clients),
+            "channels": {ch: len(members) for ch, members in self.channels.items()},
+            "policy": self.policy,
+            "queued": sum(client.queued for client in clients),
+            "maxLagMs": round(max(lags), 1) if lags else 0.0,
+            "dropped": sum(client.stats["dropped"] for client in clients),
+            "coalesced": sum(client.stats["coalesced"] for client in clients),
+            **self._stats,
+            "batching": {ch: {"interval": b.interval, **b.stats} for ch, b in self.batchers.items()},
+            # The most lagging clients
+            "slowest": [client.metrics() for client in
+                        sorted(clients, key=lambda c: c.lag_ms(), reverse=True)[:top]],
+        }
+
 # Global manager instance
-manager = ConnectionManager()
+manager = ConnectionManager.from_settings()
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import json
+import logging
+
+from apps.api.core.config import settings
+from apps.api.core.market_hub import market_hub, TopicKey
+from .manager import Client
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/ws", tags=["websocket"])
+
+@router.websocket("/market-data")
+async def websocket_market_data(websocket: WebSocket):
+    """
+    Live ticker / order book / candle updates from the shared market-data hub.
+
+    Client messages:
+        {"op": "subscribe", "exchange": "binance", "symbol": "BTC/USDT", "stream": "ticker"}
+        {"op": "unsubscribe", ...same keys}
+        {"op": "ping"}
+    Streams: "ticker", "book", "ohlcv:<timeframe>". Server messages are "snapshot" (latest
+    cached value on subscribe), "update", "subscribed" / "unsubscribed", "pong" and "error".
+
+    Each connection has its own bounded queue; a slow client only skips to the newest
+    update per topic (coalesce policy) and never delays the feed or other viewers.
+    """
+    await websocket.accept()
+    client = Client(websocket, max_queue=settings.WS_QUEUE_SIZE, policy="coalesce",
+                    send_timeout=settings.WS_SEND_TIMEOUT)
+    subscriptions = {}
+
+    def reply(message: dict):
+        client.enqueue(json.dumps(message))
+
+    def subscriber(key: TopicKey):
+        # Updates of one topic replace each other in the queue when the client lags
+        return lambda text: client.enqueue(text, coalesce_key=key)
+
+    client.start(on_close=lambda _: None)
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                op = message.get("op")
+                if op == "ping":
+                    reply({"type": "pong"})
+                    continue
+                key = (message["exchange"], message["symbol"].replace("_", "/"), message.get("stream", "ticker"))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                reply({"type": "error", "message": "Expected {op, exchange, symbol, stream}"})
+                continue
+
+            if op == "subscribe":
+                if key in subscriptions:
+                    continue
+                if len(subscriptions) >= settings.MARKET_HUB_MAX_SUBSCRIPTIONS:
+                    reply({"type": "error", "message": f"At most {settings.MARKET_HUB_MAX_SUBSCRIPTIONS} subscriptions"})
+                    continue
+                callback = subscriber(key)
+                try:
+                    snapshot = market_hub.subscribe(key, callback)
+                except ValueError as ve:
+                    reply({"type": "error", "message": str(ve)})
+                    continue
+                subscriptions[key] = callback
+                reply({"type": "subscribed", "exchange": key[0], "symbol": key[1], "stream": key[2]})
+                if snapshot is not None:
+                    client.enqueue(snapshot, coalesce_key=key)
+            elif op == "unsubscribe":
+                callback = subscriptions.pop(key, None)
+                if callback is not None:
+                    market_hub.unsubscribe(key, callback)
+                reply({"type": "unsubscribed", "exchange": key[0], "symbol": key[1], "stream": key[2]})
+            else:
+                reply({"type": "error", "message": f"Unknown op: {op}"})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        for key, callback in subscriptions.items():
+            market_hub.unsubscribe(key, callback)
+        client.stop()
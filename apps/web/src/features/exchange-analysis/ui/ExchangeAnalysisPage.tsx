@@ -11,6 +11,22 @@ const ExchangeAnalysisPage = () => {
     const [symbol, setSymbol] = useState('BTC/USDT');
     const [timeframe, setTimeframe] = useState('1h');
     const [marketData, setMarketData] = useState<any[]>([]);
+    const [lastPrice, setLastPrice] = useState<number | null>(null);
+    const [cursor, setCursor] = useState<number | null>(null);
+
+    // Live ticker from the shared market-data hub (one upstream feed per symbol, however many viewers)
+    useEffect(() => {
+        setLastPrice(null);
+        const ws = new WebSocket('ws://localhost:8000/ws/market-data');
+        ws.onopen = () => ws.send(JSON.stringify({ op: 'subscribe', exchange, symbol, stream: 'ticker' }));
+        ws.onmessage = (event) => {
+            const msg = JSON.parse(event.data);
+            if ((msg.type === 'snapshot' || msg.type === 'update') && msg.data?.last != null) {
+                setLastPrice(msg.data.last);
+            }
+        };
+        return () => ws.close();
+    }, [exchange, symbol]);
 
     // API কলের জন্য (মক উদাহরণ, বাস্তবে আপনার হুক ব্যবহার হবে)
     const fetchData = async () => {
@@ -23,11 +39,35 @@ const ExchangeAnalysisPage = () => {
             if (!response.ok) throw new Error('Network response was not ok');
             const json = await response.json();
             setMarketData(json.data);
+            setCursor(json.cursor);
         } catch (error) {
             console.error("Failed to fetch data:", error);
         }
     };
 
+    // After the snapshot only deltas are requested: the still-forming bar plus newly closed bars
+    useEffect(() => {
+        if (cursor == null) return;
+        const safeSymbol = symbol.replace('/', '_');
+        const timer = setInterval(async () => {
+            try {
+                const response = await fetch(`http://localhost:8000/api/v1/analysis/market-data/${exchange}/${safeSymbol}?timeframe=${timeframe}&since=${cursor}`);
+                if (!response.ok) return;
+                const json = await response.json();
+                if (!json.data.length) return;
+                const first = json.data[0].timestamp;
+                setMarketData(prev => [...prev.filter(row => row.timestamp < first), ...json.data].slice(-500));
+                setCursor(json.cursor);
+            } catch (error) {
+                console.error("Failed to fetch update:", error);
+            }
+        }, 5000);
+        return () => clearInterval(timer);
+    }, [cursor, exchange, symbol, timeframe]);
+
+    // A new selection needs a new snapshot
+    useEffect(() => setCursor(null), [exchange, symbol, timeframe]);
+
     return (
         <div className="space-y-6 p-6">
             {/* 1. Control Panel */}
@@ -66,6 +106,10 @@ const ExchangeAnalysisPage = () => {
                     <Button onClick={fetchData} className="bg-blue-600 hover:bg-blue-700">
                         Analyze Market
                     </Button>
+
+                    <span className="self-center font-mono text-slate-300">
+                        {lastPrice != null ? `Last: ${lastPrice}` : 'Last: —'}
+                    </span>
                 </CardContent>
             </Card>
 
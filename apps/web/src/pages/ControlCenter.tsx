@@ -51,14 +51,18 @@ const ControlCenter: React.FC = () => {
 
         ws.current.onmessage = (event) => {
             try {
-                const msg = JSON.parse(event.data);
-                if (msg.type === 'log') {
-                    setLogs(prev => [...prev.slice(-100), `${msg.level}: ${msg.message}`]);
-                } else if (msg.type === 'pnl') {
-                    setPnLChartData(prev => [...prev.slice(-20), { time: new Date().toLocaleTimeString(), pnL: msg.value }]);
-                    useBotStore.setState({ pnL: msg.value }); // Update global store PnL if needed
-                } else if (msg.type === 'status') {
-                    // Update status if provided
+                const frame = JSON.parse(event.data);
+                // High-frequency channels (pnl, status) arrive batched: { type: 'batch', messages: [...] }
+                const messages = frame.type === 'batch' ? frame.messages : [frame];
+                for (const msg of messages) {
+                    if (msg.type === 'log') {
+                        setLogs(prev => [...prev.slice(-100), `${msg.level}: ${msg.message}`]);
+                    } else if (msg.type === 'pnl') {
+                        setPnLChartData(prev => [...prev.slice(-20), { time: new Date().toLocaleTimeString(), pnL: msg.value }]);
+                        useBotStore.setState({ pnL: msg.value }); // Update global store PnL if needed
+                    } else if (msg.type === 'status') {
+                        // Update status if provided
+                    }
                 }
             } catch (e) {
                 console.error("WS Parse Error", e);
@@ -0,0 +1,224 @@
+"""
+Benchmark suite for feature engineering and the analysis routes.
+
+Run from the repo root:
+
+    python -m scripts.benchmarks.run                          # 1k / 10k / 100k / 1M bars
+    python -m scripts.benchmarks.run --sizes 1000 10000 --output bench.json
+    python -m scripts.benchmarks.run --compare baseline.json  # exit 1 on regressions
+
+Results are written as JSON: one record per measurement with the best wall time over
+``--repeat`` runs (seconds) and the peak traced allocation of one run (bytes).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from apps.api.utils.technical_features import FEATURE_COLUMNS, MarketFeatureProcessor
+from apps.api.utils.incremental_features import IncrementalFeatureEngine
+from scripts.benchmarks.fake_exchange import FakeExchange
+from scripts.benchmarks.synthetic import make_ohlcv, to_ccxt_rows
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Feature groups as laid out in FEATURE_COLUMNS: trend_, mom_, vol_, volume_, time_, fut_
+FEATURE_GROUPS: Dict[str, List[str]] = {}
+for _name in FEATURE_COLUMNS:
+    FEATURE_GROUPS.setdefault(_name.split('_')[0], []).append(_name)
+FEATURE_GROUPS['all'] = list(FEATURE_COLUMNS)
+
+# The per-bar Python engine is only timed on a bounded slice
+INCREMENTAL_MAX_BARS = 20_000
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` wall time plus the peak traced memory of one extra run."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "median_seconds": float(np.median(timings)), "peak_bytes": peak}
+
+
+def bench_features(sizes: List[int], repeat: int) -> List[Dict]:
+    results = []
+    incremental_done = set()
+    for bars in sizes:
+        df = make_ohlcv(bars)
+        runs = repeat if bars < 1_000_000 else 1
+        for group, features in FEATURE_GROUPS.items():
+            processor = MarketFeatureProcessor(features=features)
+            stats = measure(lambda: processor.add_technical_features(df), runs)
+            results.append({"suite": "features", "name": group, "bars": bars, **stats,
+                            "bars_per_second": bars / stats["seconds"]})
+            print(f"features  {group:<8} {bars:>9} bars  {stats['seconds'] * 1000:>10.1f} ms"
+                  f"  peak {stats['peak_bytes'] / 2 ** 20:>8.1f} MiB")
+
+        sample = df.iloc[:min(bars, INCREMENTAL_MAX_BARS)]
+        if len(sample) in incremental_done:
+            continue
+        incremental_done.add(len(sample))
+        stats = measure(lambda: IncrementalFeatureEngine().extend(sample), 1)
+        results.append({"suite": "features", "name": "incremental", "bars": len(sample), **stats,
+                        "us_per_bar": stats["seconds"] / len(sample) * 1e6})
+        print(f"features  {'incr':<8} {len(sample):>9} bars  {stats['seconds'] / len(sample) * 1e6:>10.1f} us/bar")
+    return results
+
+
+def bench_api(limits: List[int], repeat: int, executor: str) -> List[Dict]:
+    """
+    Drives /api/v1/analysis/market-data and /market/analysis in-process against FakeExchange
+    (and a synthetic daily frame in place of yfinance). Cold = full fetch + compute,
+    warm = feature cache hit, refresh = one new candle appended.
+    """
+    from fastapi.testclient import TestClient
+
+    import apps.api.routers.analysis as analysis
+    import apps.api.routers.market as market
+    from apps.api.core.candle_store import SQLiteCandleStore, candle_repository
+    from apps.api.core.executor import feature_executor
+    from apps.api.core.feature_cache import feature_cache
+    from apps.api.core.response_cache import ResponseCache
+    from apps.api.core.single_flight import feature_flight
+    from apps.api.main import app
+
+    feature_executor.kind = executor
+    # Throwaway candle store so runs never touch (or reuse) the local data/ store
+    candle_repository.store = SQLiteCandleStore(os.path.join(tempfile.mkdtemp(prefix="bench-candles-"), "candles.sqlite"))
+    # The held-back last row opens next hour, so rows[:-1] ends with the currently forming candle
+    next_hour = pd.Timestamp.now(tz="UTC").tz_localize(None) + pd.Timedelta(hours=1)
+    rows = to_ccxt_rows(make_ohlcv(max(limits) + 2_000, end=next_hour))
+    exchange = FakeExchange(rows[:-1])
+    analysis.get_exchange_instance = lambda exchange_id: exchange
+    daily = make_ohlcv(400, freq="1D").rename(columns=str.capitalize)
+    market.yf.download = lambda *args, **kwargs: daily.copy()
+    # In-process tier only: runs never depend on (or warm) a local Redis
+    market.response_cache = ResponseCache(redis_url=None)
+
+    results = []
+    with TestClient(app) as client:
+        def timed(name: str, limit: int, url: str, headers: Optional[Dict] = None, before=None):
+            timings, size = [], 0
+            for _ in range(repeat):
+                if before:
+                    before()
+                started = time.perf_counter()
+                response = client.get(url, headers=headers or {})
+                timings.append(time.perf_counter() - started)
+                response.raise_for_status()
+                size = len(response.content)
+            results.append({"suite": "api", "name": name, "limit": limit, "seconds": min(timings),
+                            "median_seconds": float(np.median(timings)), "bytes": size})
+            print(f"api       {name:<26} {limit:>6} rows  {min(timings) * 1000:>10.1f} ms  {size / 1024:>9.1f} KiB")
+
+        for limit in limits:
+            url = f"/api/v1/analysis/market-data/fake/BTC_USDT?limit={limit}"
+            def cold():
+                feature_cache.clear()
+                # Fresh flight results would otherwise answer without touching the cache
+                feature_flight.clear()
+            timed("analysis_cold", limit, url, before=cold)
+            timed("analysis_warm", limit, url)
+            timed("analysis_warm_columnar", limit, url + "&layout=columnar")
+            timed("analysis_warm_columnar_f32", limit, url + "&layout=columnar&float32=true")
+
+            def new_candle():
+                exchange.rows = rows
+                feature_cache.expire()
+                feature_flight.clear()
+            timed("analysis_refresh", limit, url, before=new_candle)
+            exchange.rows = rows[:-1]
+
+        timed("market_cold", 200, "/market/analysis/BENCH", before=market.response_cache.clear)
+        timed("market_warm", 200, "/market/analysis/BENCH")
+    return results
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> List[str]:
+    """Measurements more than ``threshold`` (relative) slower than in the baseline file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(r):
+        return r["suite"], r["name"], r.get("bars", r.get("limit"))
+
+    previous = {key(r): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        before = previous.get(key(r))
+        if before and r["seconds"] > before * (1 + threshold):
+            regressions.append(f"{'/'.join(map(str, key(r)))}: {before * 1000:.1f} ms -> {r['seconds'] * 1000:.1f} ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Bar counts for the feature suite")
+    parser.add_argument("--limits", type=int, nargs="+", default=[500, 5000], help="Row limits for the API suite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--suite", choices=["all", "features", "api"], default="all")
+    parser.add_argument("--executor", choices=["inline", "thread", "process"], default="inline",
+                        help="FeatureExecutor kind for the API suite")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="Previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    results = []
+    if args.suite in ("all", "features"):
+        results += bench_features(args.sizes, args.repeat)
+    if args.suite in ("all", "api"):
+        results += bench_api(args.limits, args.repeat, args.executor)
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
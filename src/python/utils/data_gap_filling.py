@@ -0,0 +1,96 @@
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.python.utils.market_calendar import expected_bars, session_mask
+
+logger = logging.getLogger(__name__)
+
+# Session-aware gap detection and filling for OHLCV bars indexed by bar open time.
+# Everything is vectorized over the calendar's session grid (see market_calendar.session_mask),
+# so overnight, weekend, holiday and early-close breaks are never reported as gaps.
+
+PRICE_COLUMNS = ('open', 'high', 'low')
+
+
+def find_gaps(
+    index,
+    timeframe: str,
+    exchange: Optional[str] = None,
+    asset_type: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Runs of missing bars inside trading sessions.
+
+    Args:
+        index: Bar open times (ascending; naive means UTC).
+
+    Returns:
+        One row per gap: ``after`` (last bar before it), ``before`` (first bar after it) and
+        ``missing`` (number of expected bars absent in between).
+    """
+    index = pd.DatetimeIndex(index)
+    mask, bar_index = session_mask(index, timeframe, exchange, asset_type)
+    bars = index[mask]
+    positions = bar_index[mask]
+    steps = np.diff(positions)
+    at = np.flatnonzero(steps > 1)
+    return pd.DataFrame({
+        'after': bars[at],
+        'before': bars[at + 1],
+        'missing': steps[at] - 1,
+    })
+
+
+def fill_gaps(
+    df: pd.DataFrame,
+    timeframe: str,
+    exchange: Optional[str] = None,
+    asset_type: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Reindexes OHLCV bars onto every bar the calendar expects between the first and last bar.
+
+    Off-session and off-grid bars are dropped (duplicates keep the last), missing bars are
+    inserted flat at the previous close with zero volume, and a boolean ``filled`` column marks them.
+
+    Args:
+        df: Bars indexed by bar open time (ascending) with open/high/low/close[/volume] columns.
+    """
+    if df.empty:
+        return df.assign(filled=pd.Series(dtype=bool))
+
+    expected = expected_bars(df.index[0], df.index[-1], timeframe, exchange, asset_type)
+    if df.index.tz is None:
+        expected = expected.tz_convert(None) if expected.tz is not None else expected
+    else:
+        expected = expected.tz_convert(df.index.tz) if expected.tz is not None else expected.tz_localize(df.index.tz)
+
+    bars = df[~df.index.duplicated(keep='last')].reindex(expected)
+    have = bars['close'].notna().to_numpy()
+    if not have.any():
+        logger.warning(f"No {timeframe} bars on the {exchange or 'default'} session grid")
+        return bars.iloc[:0].assign(filled=pd.Series(dtype=bool))
+
+    # Position of the latest real bar at or before each row (forward fill without pandas)
+    positions = np.arange(len(bars))
+    last = np.maximum.accumulate(np.where(have, positions, -1))
+    start = np.flatnonzero(have)[0]
+    bars = bars.iloc[start:]
+    have, last = have[start:], last[start:]
+
+    close = bars['close'].to_numpy()[last - start]
+    out = {'close': close}
+    for column in PRICE_COLUMNS:
+        if column in bars:
+            out[column] = np.where(have, bars[column].to_numpy(), close)
+    if 'volume' in bars:
+        out['volume'] = np.where(have, bars['volume'].to_numpy(), 0.0)
+    for column in bars.columns.difference(list(out)):
+        out[column] = bars[column].to_numpy()[last - start]
+
+    filled = pd.DataFrame(out, index=bars.index)[list(df.columns)]
+    filled['filled'] = ~have
+    return filled
@@ -0,0 +1,45 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.python.utils.market_calendar import get_trading_day_index, session_mask, trading_sessions
+
+# Holiday and half-day lookups over date ranges and bar indexes, from the precomputed
+# trading-day index (exchange calendars plus the custom holidays / early closes in
+# config/custom_holidays.json). All lookups are array operations.
+
+# Sessions shorter than the calendar's regular one by more than this are early closes
+# (the slack absorbs DST shifts of whole-day sessions)
+EARLY_CLOSE_SLACK_MS = 3_600_000
+
+
+def holidays(start, end, exchange: Optional[str] = None, asset_type: Optional[str] = None) -> pd.DatetimeIndex:
+    """Weekdays in [start, end] without a session."""
+    start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+    open_days = get_trading_day_index(exchange, asset_type, start, end).mask(start, end)
+    dates = pd.date_range(start, end, freq='D')
+    return dates[~open_days & (dates.weekday < 5)]
+
+
+def early_closes(start, end, exchange: Optional[str] = None, asset_type: Optional[str] = None) -> pd.DataFrame:
+    """
+    Half-days in [start, end]: sessions shorter than the calendar's regular (most common)
+    session length, with their UTC ``open`` and ``close``.
+    """
+    start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+    opens, closes = trading_sessions(start, end, exchange, asset_type)
+    lengths = closes - opens
+    if len(lengths) == 0:
+        return pd.DataFrame({'open': pd.DatetimeIndex([], tz='UTC'), 'close': pd.DatetimeIndex([], tz='UTC')})
+    values, counts = np.unique(lengths, return_counts=True)
+    early = lengths < values[np.argmax(counts)] - EARLY_CLOSE_SLACK_MS
+    return pd.DataFrame({
+        'open': pd.to_datetime(opens[early], unit='ms', utc=True),
+        'close': pd.to_datetime(closes[early], unit='ms', utc=True),
+    })
+
+
+def holiday_mask(index, exchange: Optional[str] = None, asset_type: Optional[str] = None) -> np.ndarray:
+    """True for timestamps whose (wall clock) date is not a trading day; weekends included."""
+    return ~session_mask(index, '1d', exchange, asset_type)[0]
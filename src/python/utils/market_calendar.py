@@ -3,6 +3,9 @@ import json
 import datetime
 import logging
 import asyncio
+import threading
+import time
+import numpy as np
 import pandas as pd
 import ccxt
 import ccxt.async_support as ccxt_async  # Explicit async import
@@ -10,10 +13,9 @@ import pytz
 from dotenv import load_dotenv
 from pandas_market_calendars import get_calendar
 import redis
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 
-# Point 6: Logging setup
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Point 6: Logging setup (basicConfig only when run as a script: importers own the root logger)
 logger = logging.getLogger(__name__)
 
 def send_alert(message: str):
@@ -31,11 +33,15 @@ try:
         ASSET_TYPE_HANDLERS = custom_config.get('asset_handlers', {})
         raw_holidays = custom_config.get('holidays', {})
         CUSTOM_HOLIDAYS = {k: [tuple(d) for d in v] for k, v in raw_holidays.items()}
+        # Half-days for the weekday calendars: [month, day, "HH:MM" local close]
+        raw_early_closes = custom_config.get('early_closes', {})
+        EARLY_CLOSES = {k: [tuple(d) for d in v] for k, v in raw_early_closes.items()}
 except FileNotFoundError:
     logger.error(f"{CUSTOM_HOLIDAYS_FILE} not found. Using defaults.")
     CUSTOM_HOLIDAYS = {
         'forex': [(1, 1), (12, 25), (12, 26)]
     }
+    EARLY_CLOSES = {}
     ASSET_TYPE_HANDLERS = {
         'crypto': 'always_open_with_status',
         'forex': 'weekday_with_holidays',
@@ -47,14 +53,26 @@ except FileNotFoundError:
 # Dynamic env vars (No longer global constants for logic)
 TIMEZONE = os.getenv('TIMEZONE', 'UTC')
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
+REDIS_TIMEOUT = float(os.getenv('REDIS_TIMEOUT', '1.0'))  # seconds per connect / call
 CCXT_API_KEY = os.getenv('CCXT_API_KEY')
 CCXT_API_SECRET = os.getenv('CCXT_API_SECRET')
 
-try:
-    cache = redis.from_url(REDIS_URL)
-except Exception as e:
-    logger.error(f"Redis connection failed: {e}. Disabling cache.")
-    cache = None
+_cache = None
+_cache_disabled = False
+
+
+def get_cache() -> Optional[redis.Redis]:
+    """Redis client, created on first use (importing this module opens nothing). None if disabled."""
+    global _cache, _cache_disabled
+    if _cache is None and not _cache_disabled:
+        try:
+            # Bounded timeouts: an unreachable Redis must not stall callers for the OS connect timeout
+            _cache = redis.from_url(REDIS_URL, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Redis connection failed: {e}. Disabling cache.")
+            _cache_disabled = True
+    return _cache
+
 
 def get_config():
     """Helper to get current config, supporting runtime env changes."""
@@ -71,11 +89,12 @@ def validate_date(date: Optional[datetime.date]) -> datetime.date:
     return date
 
 def sanitize_exchange(exchange: Optional[str]) -> str:
-    return exchange.strip().upper() if exchange else get_config()['NAME']
+    return (exchange or get_config()['NAME']).strip().upper()
 
 
 # Point 4: Performance - Batch caching helper
 def batch_cache_set(keys_values: Dict[str, int], ex: int = 86400):
+    cache = get_cache()
     if cache:
         try:
             with cache.pipeline() as pipe:
@@ -90,22 +109,158 @@ def get_timezone_aware_now(tz_str: str = TIMEZONE) -> datetime.datetime:
     tz = pytz.timezone(tz_str)
     return datetime.datetime.now(tz).date()
 
-async def fetch_exchange_status_async(exchange: str) -> bool:
-    # Point 4: Async for performance
-    try:
-        # Use explicit async lib
-        exc_class = getattr(ccxt_async, exchange.lower(), None)
-        if exc_class:
-            exc = exc_class({'apiKey': CCXT_API_KEY, 'secret': CCXT_API_SECRET} if CCXT_API_KEY else {})
-            if exc.has.get('fetchStatus'):
-                status = await exc.fetch_status()
-                await exc.close()
-                return status.get('status') == 'ok'
-            await exc.close()
-    except Exception as e:
-        logger.error(f"Async status check failed: {e}")
-        return True
-    return True
+class ExchangeStatusMonitor:
+    """
+    Live exchange status for crypto trading-day checks, kept off the request path.
+
+    A background task polls ``fetch_status`` for every configured exchange every ``interval``
+    seconds over persistent ccxt async clients and keeps the latest (ok, checked_at) per
+    exchange in memory, mirrored to the Redis hash ``redis_key``. Processes started with
+    ``poll=False`` (extra workers, scripts) only follow that Redis mirror. Readers get the
+    snapshot instantly; a missing or stale (older than ``max_age``) status reads as unknown.
+
+    ``client_factory`` (lower-case exchange id -> ccxt async client) lets a host process share
+    its own clients, e.g. the API's exchange pool; those are never closed here. Without it the
+    monitor creates and owns one client per exchange.
+    """
+
+    def __init__(self, exchanges: List[str], interval: float = 60.0, timeout: float = 10.0,
+                 max_age: Optional[float] = None, redis_key: str = 'exchange_status',
+                 client_factory: Optional[Callable[[str], object]] = None):
+        self.exchanges = [sanitize_exchange(exc) for exc in exchanges]
+        self.client_factory = client_factory
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age if max_age is not None else 3 * interval
+        self.redis_key = redis_key
+        self._snapshot: Dict[str, tuple] = {}  # exchange -> (ok, checked_at epoch seconds)
+        self._clients: Dict[str, object] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._redis_ok = True
+        self._stats = {"polls": 0, "errors": 0, "redis_errors": 0}
+
+    def status(self, exchange: str) -> Optional[bool]:
+        """Latest status of ``exchange``: True / False, or None when unknown or stale."""
+        item = self._snapshot.get(exchange)
+        if item is None or time.time() - item[1] > self.max_age:
+            return None
+        return item[0]
+
+    def start(self, poll: bool = True, client_factory: Optional[Callable[[str], object]] = None):
+        if client_factory is not None:
+            self.client_factory = client_factory
+        if self._task is None:
+            step = self.refresh if poll else self._load_mirror
+            self._task = asyncio.create_task(self._loop(step), name="exchange-status")
+
+    async def _loop(self, step):
+        while True:
+            try:
+                await step()
+            except Exception as e:
+                # Never let one bad round end the task: the snapshot would silently go stale
+                self._stats["errors"] += 1
+                logger.error(f"Exchange status refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self):
+        """Polls every exchange once (concurrently) and publishes the results."""
+        results = await asyncio.gather(*(self._fetch(exc) for exc in self.exchanges))
+        now = time.time()
+        for exchange, ok in zip(self.exchanges, results):
+            if ok is not None:
+                self._snapshot[exchange] = (ok, now)
+        self._stats["polls"] += 1
+        await self._save_mirror()
+
+    def _client(self, exchange: str):
+        if self.client_factory is not None:
+            try:
+                return self.client_factory(exchange.lower())  # Shared: looked up per poll, never cached
+            except Exception:
+                pass  # Not in the host's pool: use an own client below
+        client = self._clients.get(exchange)
+        if client is None:
+            exc_class = getattr(ccxt_async, exchange.lower(), None)
+            if exc_class is None:
+                return None
+            client = self._clients[exchange] = exc_class(
+                {'apiKey': CCXT_API_KEY, 'secret': CCXT_API_SECRET} if CCXT_API_KEY else {})
+        return client
+
+    async def _fetch(self, exchange: str) -> Optional[bool]:
+        """True / False from fetch_status; True when the exchange has no status endpoint; None on error."""
+        try:
+            client = self._client(exchange)
+            if client is None or not client.has.get('fetchStatus'):
+                return True
+            status = await asyncio.wait_for(client.fetch_status(), self.timeout)
+            return status.get('status') == 'ok'
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Async status check failed for {exchange}: {e}")
+            return None
+
+    async def _save_mirror(self):
+        cache = get_cache()
+        if not cache or not self._snapshot:
+            return
+        mapping = {exc: f"{int(ok)} {checked_at}" for exc, (ok, checked_at) in self._snapshot.items()}
+        try:
+            await asyncio.to_thread(cache.hset, self.redis_key, mapping=mapping)
+            self._redis_ok = True
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def _load_mirror(self):
+        cache = get_cache()
+        if not cache:
+            return
+        try:
+            raw = await asyncio.to_thread(cache.hgetall, self.redis_key)
+            self._redis_ok = True
+        except Exception as e:
+            self._redis_failed(e)
+            return
+        for exc, value in raw.items():
+            try:
+                ok, checked_at = value.decode().split()
+                self._snapshot[exc.decode()] = (ok == '1', float(checked_at))
+            except (ValueError, UnicodeDecodeError):
+                self._stats["errors"] += 1
+                logger.warning(f"Ignoring malformed exchange status in {self.redis_key}: {exc!r} = {value!r}")
+
+    def _redis_failed(self, e: Exception):
+        self._stats["redis_errors"] += 1
+        if self._redis_ok:
+            logger.warning(f"Exchange status mirror unavailable: {e}")
+        self._redis_ok = False
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(c.close() for c in clients), return_exceptions=True)
+
+    def metrics(self) -> Dict:
+        now = time.time()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "exchanges": {exc: {"ok": ok, "ageSeconds": round(now - checked_at, 1)}
+                          for exc, (ok, checked_at) in self._snapshot.items()},
+            **self._stats,
+        }
+
+
+# Global status monitor (started by the API lifespan)
+exchange_status = ExchangeStatusMonitor(
+    os.getenv('CALENDAR_STATUS_EXCHANGES', get_config()['NAME']).split(','),
+    interval=float(os.getenv('CALENDAR_STATUS_INTERVAL', '60')),
+)
 
 def is_weekend(date: datetime.date) -> bool:
     return date.weekday() >= 5
@@ -115,73 +270,291 @@ def is_custom_holiday(date: datetime.date, asset_type: str) -> bool:
     month_day = (date.month, date.day)
     return month_day in holidays
 
-async def is_trading_day_async(
-    date: Optional[datetime.date] = None,
-    exchange: Optional[str] = None,
-    exchanges: Optional[List[str]] = None
-) -> bool:
-    """
-    Checks if date is trading day with dynamic config.
+# Trading-day bitmap index: one packed bit per calendar day over a fixed multi-year range,
+# built once per (asset type, exchange) with vectorized operations and kept in memory
+# (optionally memory-mapped from CALENDAR_INDEX_DIR). Every index shares the same range,
+# so multi-exchange queries are bitwise ANDs of the packed arrays.
+CALENDAR_YEARS_BACK = int(os.getenv('CALENDAR_YEARS_BACK', '10'))
+CALENDAR_YEARS_AHEAD = int(os.getenv('CALENDAR_YEARS_AHEAD', '2'))
+CALENDAR_INDEX_DIR = os.getenv('CALENDAR_INDEX_DIR')  # unset = in-memory only
+NO_SESSION = np.iinfo(np.int64).min  # open/close time of a closed day
+
+_INDEXES: Dict[tuple, 'TradingDayIndex'] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def _epoch_day(date: datetime.date) -> int:
+    return (date - datetime.date(1970, 1, 1)).days
+
+
+_TODAY = datetime.date.today()
+_RANGE = (_epoch_day(datetime.date(_TODAY.year - CALENDAR_YEARS_BACK, 1, 1)),
+          _epoch_day(datetime.date(_TODAY.year + CALENDAR_YEARS_AHEAD, 12, 31)))
+
+
+class TradingDayIndex:
     """
-    try:
-        cfg = get_config()
-        current_type = cfg['TYPE']
-        
-        date = validate_date(date)
-        exchange = sanitize_exchange(exchange)
-        handler = ASSET_TYPE_HANDLERS.get(current_type, 'calendar_based')
+    Trading days of one calendar between ``first_day`` and ``last_day`` (epoch days, inclusive).
 
-        if exchanges:
-            results = await asyncio.gather(*[is_trading_day_async(date, exc) for exc in exchanges])
-            return all(results)
+    - bits: np.packbits of the open/closed flags (1 bit per day).
+    - open_ms / close_ms: session open / close per day in UTC epoch ms (NO_SESSION when closed).
 
-        cache_key = f"trading_day:{current_type}:{exchange}:{date.isoformat()}"
-        if cache:
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return bool(int(cached))
+    is_open() is O(1); range and multi-calendar queries are slices and bitwise ops.
+    """
+
+    def __init__(self, first_day: int, last_day: int, bits: np.ndarray, open_ms: np.ndarray, close_ms: np.ndarray):
+        self.first_day = first_day
+        self.last_day = last_day
+        self.bits = bits
+        self.open_ms = open_ms
+        self.close_ms = close_ms
+
+    @classmethod
+    def build(cls, asset_type: str, exchange: str, first_day: int, last_day: int) -> 'TradingDayIndex':
+        days = np.arange(first_day, last_day + 1, dtype=np.int64)
+        dates = pd.DatetimeIndex(days.astype('datetime64[D]'))
+        handler = ASSET_TYPE_HANDLERS.get(asset_type, 'calendar_based')
+        tz = pytz.timezone(TIMEZONE)
+
+        if handler == 'calendar_based':
+            try:
+                schedule = calendar_service.calendar(exchange).schedule(start_date=dates[0], end_date=dates[-1])
+                positions = ((schedule.index.values.astype('datetime64[D]').astype(np.int64)) - first_day)
+                is_open = np.zeros(len(days), dtype=bool)
+                is_open[positions] = True
+                open_ms = np.full(len(days), NO_SESSION, dtype=np.int64)
+                close_ms = np.full(len(days), NO_SESSION, dtype=np.int64)
+                open_ms[positions] = schedule['market_open'].dt.tz_convert('UTC').values.astype('datetime64[ms]').astype(np.int64)
+                close_ms[positions] = schedule['market_close'].dt.tz_convert('UTC').values.astype('datetime64[ms]').astype(np.int64)
+                return cls(first_day, last_day, np.packbits(is_open), open_ms, close_ms)
+            except Exception as e:
+                # Unknown calendar: treated as always open, like the per-date path
+                logger.warning(f"Unsupported exchange/calendar {exchange} ({type(e).__name__}). Fallback to open.")
+                is_open = np.ones(len(days), dtype=bool)
+        elif handler == 'weekday_with_holidays':
+            weekday = (days + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+            month_day = dates.month * 100 + dates.day
+            holidays = [m * 100 + d for m, d in CUSTOM_HOLIDAYS.get(asset_type, [])]
+            is_open = (weekday < 5) & ~np.isin(month_day, holidays)
+        else:  # always_open_with_status (crypto): calendar-wise always open
+            is_open = np.ones(len(days), dtype=bool)
+
+        # Whole local days in TIMEZONE, as the per-date calendar reported them
+        starts = dates.tz_localize(tz, ambiguous=False, nonexistent='shift_forward')
+        ends = (dates + pd.Timedelta(days=1)).tz_localize(tz, ambiguous=False, nonexistent='shift_forward')
+        open_ms = np.where(is_open, starts.as_unit('ms').asi8, NO_SESSION)
+        close_ms = np.where(is_open, ends.as_unit('ms').asi8 - 1, NO_SESSION)
+        if handler == 'weekday_with_holidays':
+            for month, day, close in EARLY_CLOSES.get(asset_type, []):
+                early = is_open & (month_day == month * 100 + day)
+                local_close = (dates + pd.Timedelta(close + ':00')).tz_localize(
+                    tz, ambiguous=False, nonexistent='shift_forward')
+                close_ms = np.where(early, local_close.as_unit('ms').asi8, close_ms)
+        return cls(first_day, last_day, np.packbits(is_open), open_ms, close_ms)
+
+    def covers(self, first_day: int, last_day: int) -> bool:
+        return self.first_day <= first_day and last_day <= self.last_day
+
+    def is_open(self, date: datetime.date) -> bool:
+        i = _epoch_day(date) - self.first_day
+        return bool((self.bits[i >> 3] >> (7 - (i & 7))) & 1)
+
+    def mask(self, start: datetime.date, end: datetime.date) -> np.ndarray:
+        """Open flags for every day in [start, end]."""
+        lo = _epoch_day(start) - self.first_day
+        hi = _epoch_day(end) - self.first_day + 1
+        unpacked = np.unpackbits(self.bits[lo >> 3:(hi + 7) >> 3])
+        offset = lo & ~7
+        return unpacked[lo - offset:hi - offset].astype(bool)
+
+    def __and__(self, other: 'TradingDayIndex') -> 'TradingDayIndex':
+        """Days open on both calendars (sessions are dropped; same range required)."""
+        if (self.first_day, self.last_day) != (other.first_day, other.last_day):
+            raise ValueError("Trading-day indexes cover different ranges")
+        bits = np.bitwise_and(self.bits, other.bits)
+        empty = np.full(len(self.open_ms), NO_SESSION, dtype=np.int64)
+        return TradingDayIndex(self.first_day, self.last_day, bits, empty, empty)
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'bits.npy'), self.bits)
+        np.save(os.path.join(path, 'open_ms.npy'), self.open_ms)
+        np.save(os.path.join(path, 'close_ms.npy'), self.close_ms)
+
+    @classmethod
+    def load(cls, path: str, first_day: int, last_day: int) -> 'TradingDayIndex':
+        arrays = [np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in ('bits', 'open_ms', 'close_ms')]
+        return cls(first_day, last_day, *arrays)
+
+
+def _widen_range(start: Optional[datetime.date], end: Optional[datetime.date]) -> tuple:
+    """
+    The epoch-day range shared by every index: CALENDAR_YEARS_BACK / AHEAD years around today,
+    widened (whole years, never narrowed) to include [start, end].
+    """
+    global _RANGE
+    first, last = _RANGE
+    if start is not None and _epoch_day(start) < first:
+        first = _epoch_day(datetime.date(start.year, 1, 1))
+    if end is not None and _epoch_day(end) > last:
+        last = _epoch_day(datetime.date(end.year, 12, 31))
+    _RANGE = (first, last)
+    return _RANGE
 
-        is_open = True
 
-        try:
-            if handler == 'always_open_with_status':  # crypto
-                is_open = await fetch_exchange_status_async(exchange)
+def get_trading_day_index(
+    exchange: Optional[str] = None,
+    asset_type: Optional[str] = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> TradingDayIndex:
+    """
+    Cached TradingDayIndex for (asset type, exchange) covering at least [start, end].
+    Built on first use (or loaded from CALENDAR_INDEX_DIR); rebuilt only when some query
+    widened the shared range past the indexed years.
+    """
+    asset_type = asset_type or get_config()['TYPE']
+    exchange = sanitize_exchange(exchange)
+    key = (asset_type, exchange)
+    with _INDEX_LOCK:
+        first_day, last_day = _widen_range(start, end)
+        index = _INDEXES.get(key)
+        if index is not None and (index.first_day, index.last_day) == (first_day, last_day):
+            return index
+        path = os.path.join(CALENDAR_INDEX_DIR, f'{asset_type}_{exchange}_{first_day}_{last_day}') \
+            if CALENDAR_INDEX_DIR else None
+        if path and os.path.exists(os.path.join(path, 'close_ms.npy')):
+            index = TradingDayIndex.load(path, first_day, last_day)
+        else:
+            index = TradingDayIndex.build(asset_type, exchange, first_day, last_day)
+            if path:
+                index.save(path)
+        _INDEXES[key] = index
+        return index
+
+
+def combined_index(exchanges: List[str], start: Optional[datetime.date] = None,
+                   end: Optional[datetime.date] = None) -> TradingDayIndex:
+    """Days open on every exchange in ``exchanges`` (bitwise AND of their packed bitmaps)."""
+    _widen_range(start, end)
+    indexes = [get_trading_day_index(exc, start=start, end=end) for exc in exchanges]
+    combined = indexes[0]
+    for ix in indexes[1:]:
+        combined = combined & ix
+    return combined
+
+
+class CalendarService:
+    """
+    Memoized trading-day answers for the request path.
 
-            elif handler == 'weekday_with_holidays':  # forex
-                if is_weekend(date) or is_custom_holiday(date, current_type):
-                    is_open = False
+    Calendar-based and forex checks are sync and do no I/O: an O(1) bit test on the
+    trading-day index, memoized per (asset type, exchange, date) for ``ttl`` seconds, as are
+    the pandas_market_calendars objects. Crypto checks for today also read the live exchange
+    status from ``status_monitor``'s in-memory snapshot, so no check does network I/O.
+    """
 
-            elif handler == 'calendar_based':  # traditional etc
-                cal = get_calendar(exchange)
-                schedule = cal.schedule(start_date=date, end_date=date)
-                is_open = not schedule.empty
+    _MISSING = object()
+
+    def __init__(self, status_monitor: ExchangeStatusMonitor, ttl: float = 3600.0, max_entries: int = 100_000):
+        self.status_monitor = status_monitor
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memo: Dict[tuple, tuple] = {}  # key -> (expires_at, value)
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _memo_get(self, key: tuple):
+        item = self._memo.get(key)
+        if item is not None and item[0] > time.monotonic():
+            self._stats["hits"] += 1
+            return item[1]
+        self._stats["misses"] += 1
+        return self._MISSING
+
+    def _memo_set(self, key: tuple, value, ttl: float):
+        if len(self._memo) >= self.max_entries:
+            now = time.monotonic()
+            self._memo = {k: v for k, v in self._memo.items() if v[0] > now}
+            if len(self._memo) >= self.max_entries:
+                self._memo.clear()
+        self._memo[key] = (time.monotonic() + ttl, value)
+
+    def calendar(self, exchange: str):
+        """pandas_market_calendars calendar for ``exchange`` (raises like get_calendar)."""
+        key = ('calendar', exchange)
+        cal = self._memo_get(key)
+        if cal is self._MISSING:
+            cal = get_calendar(exchange)
+            self._memo_set(key, cal, self.ttl)
+        return cal
+
+    def _calendar_open(self, date: datetime.date, exchange: str, asset_type: str) -> bool:
+        key = ('day', asset_type, exchange, date)
+        is_open = self._memo_get(key)
+        if is_open is self._MISSING:
+            is_open = get_trading_day_index(exchange, asset_type, date, date).is_open(date)
+            self._memo_set(key, is_open, self.ttl)
+        return is_open
 
-        except ValueError as ve:
-            logger.warning(f"Unsupported exchange/calendar: {ve}. Fallback to open.")
-            is_open = True
+    def _needs_status(self, date: datetime.date, asset_type: str) -> bool:
+        return ASSET_TYPE_HANDLERS.get(asset_type, 'calendar_based') == 'always_open_with_status' \
+            and date == get_timezone_aware_now()
+
+    def is_open(
+        self,
+        date: Optional[datetime.date] = None,
+        exchange: Optional[str] = None,
+        exchanges: Optional[List[str]] = None,
+    ) -> bool:
+        """Sync check without I/O (crypto: the status monitor's snapshot, open when unknown)."""
+        try:
+            asset_type = get_config()['TYPE']
+            date = validate_date(date)
+            if exchanges:
+                return all(self.is_open(date, exc) for exc in exchanges)
+            exchange = sanitize_exchange(exchange)
+            is_open = self._calendar_open(date, exchange, asset_type)
+            if is_open and self._needs_status(date, asset_type):
+                is_open = self.status_monitor.status(exchange) is not False
+            return is_open
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             send_alert(f"Market calendar error for {exchange}: {e}")
-            is_open = True
-            
-        if cache:
-             try:
-                cache.set(cache_key, int(is_open), ex=86400)
-             except Exception:
-                 pass
+            return True
 
-        return is_open
-    except Exception as outer_e:
-        logger.error(f"Critical error in is_trading_day_async: {outer_e}")
-        return True
+    def clear(self):
+        self._memo.clear()
 
-def is_trading_day(*args, **kwargs) -> bool:
-    # Sync wrapper for async (Point 4: Performance in sync contexts)
-    try:
-        return asyncio.run(is_trading_day_async(*args, **kwargs))
-    except Exception as e:
-        logger.error(f"Sync wrapper failed: {e}")
-        return True
+    def metrics(self) -> Dict:
+        return {"entries": len(self._memo), "ttl": self.ttl, **self._stats,
+                "exchangeStatus": self.status_monitor.metrics()}
+
+
+# Global calendar service
+calendar_service = CalendarService(exchange_status, ttl=float(os.getenv('CALENDAR_MEMO_TTL', '3600')))
+
+
+async def is_trading_day_async(
+    date: Optional[datetime.date] = None,
+    exchange: Optional[str] = None,
+    exchanges: Optional[List[str]] = None
+) -> bool:
+    """
+    Checks if date is trading day with dynamic config.
+    Kept for async callers: the check does no I/O (see is_trading_day), so it never awaits.
+    """
+    return calendar_service.is_open(date, exchange, exchanges)
+
+def is_trading_day(
+    date: Optional[datetime.date] = None,
+    exchange: Optional[str] = None,
+    exchanges: Optional[List[str]] = None
+) -> bool:
+    """
+    Sync check, safe inside a running event loop (never starts one): calendar and forex
+    answers come from the index, crypto uses the background-polled exchange status.
+    """
+    return calendar_service.is_open(date, exchange, exchanges)
 
 def get_market_calendar(
     start_date: str,
@@ -191,56 +564,27 @@ def get_market_calendar(
 ) -> pd.DataFrame:
     """
     Generates calendar DataFrame for range with dynamic config.
+    Sliced from the precomputed trading-day index (multi-exchange: bitwise AND).
     """
+    start = pd.to_datetime(start_date).date()
+    end = pd.to_datetime(end_date).date()
+    dates = pd.date_range(start=start, end=end, freq='D')
+    df = pd.DataFrame({'date': dates.date})
     try:
-        cfg = get_config()
-        current_type = cfg['TYPE']
-
-        start = pd.to_datetime(start_date).date()
-        end = pd.to_datetime(end_date).date()
-        exchange = sanitize_exchange(exchange)
-
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        df = pd.DataFrame({'date': dates.date})
-
-        handler = ASSET_TYPE_HANDLERS.get(current_type, 'calendar_based')
-
-        cache_values = {}
-        
         if exchanges:
-            multi_dfs = []
-            for exc in exchanges:
-                sub_df = get_market_calendar(start_date, end_date, exc)
-                multi_dfs.append(sub_df['open'])
-            df['open'] = pd.concat(multi_dfs, axis=1).all(axis=1)
+            df['open'] = combined_index(exchanges, start, end).mask(start, end)
             return df
 
-        if handler == 'always_open_with_status':
-            df['open'] = True
-
-        elif handler == 'weekday_with_holidays':
-            df['open'] = df['date'].apply(lambda d: not (is_weekend(d) or is_custom_holiday(d, current_type)))
+        index = get_trading_day_index(exchange, start=start, end=end)
+        df['open'] = index.mask(start, end)
 
-        elif handler == 'calendar_based':
-            try:
-                cal = get_calendar(exchange)
-                valid = cal.valid_days(start_date=start_date, end_date=end_date)
-                valid_dates = set([d.date() for d in valid])
-                df['open'] = df['date'].isin(valid_dates)
-            except Exception:
-                df['open'] = True
-
-        try:
-            tz = pytz.timezone(TIMEZONE)
-            df['open_time'] = df['date'].apply(lambda d: datetime.datetime.combine(d, datetime.time.min).replace(tzinfo=tz))
-            df['close_time'] = df['date'].apply(lambda d: datetime.datetime.combine(d, datetime.time.max).replace(tzinfo=tz))
-        except Exception as tze:
-            logger.warning(f"Timezone conversion failed: {tze}")
-
-        for _, row in df.iterrows():
-            key = f"trading_day:{current_type}:{exchange}:{row['date'].isoformat()}"
-            cache_values[key] = int(row['open'])
-        batch_cache_set(cache_values)
+        lo = _epoch_day(start) - index.first_day
+        hi = lo + len(df)
+        tz = pytz.timezone(TIMEZONE)
+        for column, values in (('open_time', index.open_ms[lo:hi]), ('close_time', index.close_ms[lo:hi])):
+            # Closed days (NO_SESSION) become NaT
+            times = pd.to_datetime(pd.Series(values).where(values != NO_SESSION), unit='ms', utc=True)
+            df[column] = times.dt.tz_convert(tz)
 
     except Exception as e:
         logger.error(f"Calendar generation error: {e}")
@@ -249,7 +593,154 @@ def get_market_calendar(
 
     return df
 
+# Intraday sessions: vectorized open masks and expected-bar positions for bar timestamps of any
+# timeframe up to 1d, from the same index (exchange sessions with their early closes, custom
+# holidays and early closes). Sessions are [open, close); bars start at the session open.
+DAY_MS = 86_400_000
+
+
+def _timeframe_ms(timeframe: str) -> int:
+    tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+    if tf_ms > DAY_MS:
+        raise ValueError(f"Session masks support timeframes up to 1d, got {timeframe}")
+    return tf_ms
+
+
+def _utc_ms(index: pd.DatetimeIndex) -> np.ndarray:
+    """Epoch ms of ``index``; naive timestamps are taken as UTC (like ccxt candles)."""
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.as_unit('ms').asi8
+
+
+def _wall_days(index: pd.DatetimeIndex) -> np.ndarray:
+    """Epoch day of each timestamp's own (wall clock) date: daily bars are labelled by date."""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit('s').asi8 // 86400
+
+
+def _day(epoch_day: int) -> datetime.date:
+    return datetime.date(1970, 1, 1) + datetime.timedelta(days=int(epoch_day))
+
+
+def trading_sessions(
+    start: datetime.date,
+    end: datetime.date,
+    exchange: Optional[str] = None,
+    asset_type: Optional[str] = None,
+) -> tuple:
+    """(open_ms, close_ms) arrays of the sessions of every trading day in [start, end], ascending."""
+    index = get_trading_day_index(exchange, asset_type, start, end)
+    lo = _epoch_day(start) - index.first_day
+    hi = _epoch_day(end) - index.first_day + 1
+    opens = np.asarray(index.open_ms[lo:hi])
+    closes = np.asarray(index.close_ms[lo:hi])
+    keep = opens != NO_SESSION
+    return opens[keep], closes[keep]
+
+
+def _session_grid(first_ms: int, last_ms: int, tf_ms: int, exchange: Optional[str], asset_type: Optional[str]) -> tuple:
+    """
+    Sessions around [first_ms, last_ms] (one extra day each side for timezones off UTC) with the
+    number of bars in each and the position of each session's first bar.
+    """
+    start = _day(first_ms // DAY_MS - 1)
+    end = _day(last_ms // DAY_MS + 1)
+    opens, closes = trading_sessions(start, end, exchange, asset_type)
+    bars = -(-(closes - opens) // tf_ms)
+    first_bar = np.concatenate(([0], np.cumsum(bars)[:-1])).astype(np.int64)
+    return opens, closes, bars, first_bar
+
+
+def _locate_bars(index, timeframe: str, exchange: Optional[str], asset_type: Optional[str]) -> tuple:
+    """(open mask, bar index, session index) for every timestamp of ``index``; -1 when off-session."""
+    index = pd.DatetimeIndex(index)
+    tf_ms = _timeframe_ms(timeframe)
+    if len(index) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return np.empty(0, dtype=bool), empty, empty
+
+    if tf_ms == DAY_MS:
+        days = _wall_days(index)
+        first, last = _day(days.min()), _day(days.max())
+        open_days = get_trading_day_index(exchange, asset_type, first, last).mask(first, last)
+        pos = days - _epoch_day(first)
+        mask = open_days[pos]
+        bar_index = np.where(mask, np.cumsum(open_days)[pos] - 1, -1)
+        return mask, bar_index, bar_index
+
+    ts = _utc_ms(index)
+    opens, closes, _, first_bar = _session_grid(int(ts.min()), int(ts.max()), tf_ms, exchange, asset_type)
+    if len(opens) == 0:
+        none = np.full(len(ts), -1, dtype=np.int64)
+        return np.zeros(len(ts), dtype=bool), none, none
+    k = np.searchsorted(opens, ts, side='right') - 1
+    kk = np.maximum(k, 0)
+    mask = (k >= 0) & (ts < closes[kk])
+    bar_index = np.where(mask, first_bar[kk] + (ts - opens[kk]) // tf_ms, -1)
+    return mask, bar_index, np.where(mask, k, -1)
+
+
+def session_mask(
+    index,
+    timeframe: str,
+    exchange: Optional[str] = None,
+    asset_type: Optional[str] = None,
+) -> tuple:
+    """
+    Vectorized session lookup for bar open times (any DatetimeIndex; naive means UTC).
+
+    Returns:
+        (open_mask, bar_index): open_mask marks bars inside a session; bar_index is each bar's
+        position in the sequence of bars the calendar expects (-1 off-session), so consecutive
+        bars differ by 1 and a larger step is a gap. Positions are counted from the start of the
+        looked-up range: only differences between them are meaningful.
+    """
+    mask, bar_index, _ = _locate_bars(index, timeframe, exchange, asset_type)
+    return mask, bar_index
+
+
+def session_ids(
+    index,
+    timeframe: str,
+    exchange: Optional[str] = None,
+    asset_type: Optional[str] = None,
+) -> np.ndarray:
+    """Session ordinal of every bar (-1 off-session), for per-session features without a groupby."""
+    return _locate_bars(index, timeframe, exchange, asset_type)[2]
+
+
+def expected_bars(
+    start,
+    end,
+    timeframe: str,
+    exchange: Optional[str] = None,
+    asset_type: Optional[str] = None,
+) -> pd.DatetimeIndex:
+    """
+    Every bar open time the calendar expects in [start, end]: UTC timestamps for intraday
+    timeframes, trading dates (naive, midnight) for 1d.
+    """
+    tf_ms = _timeframe_ms(timeframe)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if tf_ms == DAY_MS:
+        first, last = start.date(), end.date()
+        open_days = get_trading_day_index(exchange, asset_type, first, last).mask(first, last)
+        dates = pd.date_range(first, last, freq='D')
+        return dates[open_days]
+
+    first_ms = int(_utc_ms(pd.DatetimeIndex([start]))[0])
+    last_ms = int(_utc_ms(pd.DatetimeIndex([end]))[0])
+    opens, _, bars, first_bar = _session_grid(first_ms, last_ms, tf_ms, exchange, asset_type)
+    offsets = np.arange(bars.sum(), dtype=np.int64) - np.repeat(first_bar, bars)
+    times = np.repeat(opens, bars) + offsets * tf_ms
+    times = times[(times >= first_ms) & (times <= last_ms)]
+    return pd.to_datetime(times, unit='ms', utc=True)
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     # Point 8: Unit tests (run python market_calendar.py to test)
     try:
         test_date = datetime.date(2026, 1, 1)  # New Year's - holiday for many
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def ohlcv() -> pd.DataFrame:
+    """800 hourly bars of a seeded random walk in the MarketFeatureProcessor input layout."""
+    bars = 800
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, bars)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, bars)),
+        'close': close,
+        'volume': rng.lognormal(3, 0.5, bars),
+        'open_interest': 1e6 * np.exp(np.cumsum(rng.normal(0, 0.002, bars))),
+        'funding_rate': rng.normal(1e-4, 5e-5, bars),
+    }, index=pd.date_range('2024-01-01', periods=bars, freq='h', name='datetime'))
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.python.utils.data_gap_filling import fill_gaps, find_gaps
+from src.python.utils.market_calendar import expected_bars
+
+NYSE = dict(exchange='NYSE', asset_type='traditional')
+
+
+@pytest.fixture
+def grid() -> pd.DatetimeIndex:
+    """NYSE 30m bars from Thanksgiving week to the week after Christmas (two half-days, two holidays)."""
+    return expected_bars('2024-11-27', '2024-12-27 23:59', '30m', **NYSE)
+
+
+def bars(index: pd.DatetimeIndex) -> pd.DataFrame:
+    close = 100 + np.arange(len(index), dtype=float)
+    return pd.DataFrame({'open': close - 0.5, 'high': close + 1, 'low': close - 1, 'close': close,
+                         'volume': np.full(len(index), 10.0)}, index=index)
+
+
+def test_session_breaks_are_not_gaps(grid):
+    # Overnight, weekend, holiday (Nov 28, Dec 25) and early-close (Nov 29, Dec 24) breaks
+    assert find_gaps(grid, '30m', **NYSE).empty
+
+
+def test_gaps_across_half_day_and_holiday(grid):
+    # Last bar of the Nov 29 half-day; last bar of the Dec 24 half-day + first of Dec 26
+    dropped = pd.DatetimeIndex(['2024-11-29 17:30', '2024-12-24 17:30', '2024-12-26 14:30'], tz='UTC')
+    gaps = find_gaps(grid.difference(dropped), '30m', **NYSE)
+
+    assert list(gaps['after']) == [pd.Timestamp('2024-11-29 17:00', tz='UTC'),
+                                   pd.Timestamp('2024-12-24 17:00', tz='UTC')]
+    # The missing bar ended the half-day, so the next real bar is Monday's open
+    assert list(gaps['before']) == [pd.Timestamp('2024-12-02 14:30', tz='UTC'),
+                                    pd.Timestamp('2024-12-26 15:00', tz='UTC')]
+    # Christmas contributes no expected bars to the gap
+    assert list(gaps['missing']) == [1, 2]
+
+
+def test_fill_gaps_restores_the_session_grid(grid):
+    dropped = pd.DatetimeIndex(['2024-12-24 17:00', '2024-12-24 17:30', '2024-12-26 14:30'], tz='UTC')
+    df = bars(grid.difference(dropped))
+    # An off-session bar (Christmas) is dropped, not kept
+    df = pd.concat([df, bars(pd.DatetimeIndex(['2024-12-25 15:00'], tz='UTC').as_unit('ms'))]).sort_index()
+
+    filled = fill_gaps(df, '30m', **NYSE)
+
+    pd.testing.assert_index_equal(filled.index, grid)
+    assert list(filled.index[filled['filled']]) == list(dropped)
+    before = df.loc[pd.Timestamp('2024-12-24 16:30', tz='UTC'), 'close']
+    inserted = filled[filled['filled']]
+    assert (inserted[['open', 'high', 'low', 'close']] == before).all().all()
+    assert (inserted['volume'] == 0).all()
+    real = filled[~filled['filled']]
+    pd.testing.assert_frame_equal(real.drop(columns='filled'), df.drop(pd.Timestamp('2024-12-25 15:00', tz='UTC')))
+
+
+def test_fill_gaps_keeps_naive_indexes_naive(grid):
+    naive = grid.tz_convert(None)
+    filled = fill_gaps(bars(naive.delete([10, 11])), '30m', **NYSE)
+    pd.testing.assert_index_equal(filled.index, naive)
+    assert filled['filled'].sum() == 2
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from apps.api.core.feature_cache import FeatureState, ohlcv_frame
+from apps.api.utils.technical_features import MarketFeatureProcessor
+
+FEATURES = ['trend_adx', 'vol_bb_width', 'volume_obv']
+
+
+def _rows(ohlcv):
+    timestamps = pd.DatetimeIndex(ohlcv.index).as_unit('ms').asi8
+    values = ohlcv[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+    return [[int(ts), *map(float, row)] for ts, row in zip(timestamps, values)]
+
+
+def test_snapshot_holds_only_the_requested_features(ohlcv):
+    state = FeatureState.build(_rows(ohlcv), FEATURES)
+
+    assert state.features == FEATURES
+    assert list(state.frame.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume'] + FEATURES
+
+
+def test_tail_update_matches_a_full_rebuild(ohlcv):
+    rows = _rows(ohlcv)
+    state = FeatureState.build(rows[:700], FEATURES)
+    assert state.apply(rows[699:750]) == 50
+
+    rebuilt = MarketFeatureProcessor(FEATURES).add_technical_features(ohlcv_frame(rows[:750]), dropna=False)
+    rebuilt = rebuilt.iloc[-len(state.frame):]
+    pd.testing.assert_index_equal(state.frame.index, rebuilt.index)
+    for name in FEATURES:
+        np.testing.assert_allclose(state.frame[name], rebuilt[name], rtol=1e-9, atol=1e-12, err_msg=name)
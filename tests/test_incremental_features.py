@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from apps.api.utils.incremental_features import IncrementalFeatureEngine
+from apps.api.utils.technical_features import FEATURE_COLUMNS, MarketFeatureProcessor
+
+
+def test_replay_matches_batch(ohlcv):
+    batch = MarketFeatureProcessor().add_technical_features(ohlcv)
+    streamed = ohlcv.join(IncrementalFeatureEngine().extend(ohlcv)).dropna()
+
+    pd.testing.assert_index_equal(streamed.index, batch.index)
+    for name in FEATURE_COLUMNS:
+        np.testing.assert_allclose(streamed[name], batch[name], rtol=1e-9, atol=1e-12, err_msg=name)
+
+
+def test_appending_continues_the_replayed_state(ohlcv):
+    engine = IncrementalFeatureEngine.from_frame(ohlcv.iloc[:-50])
+    tail = engine.extend(ohlcv.iloc[-50:])
+    batch = MarketFeatureProcessor().add_technical_features(ohlcv).iloc[-50:]
+
+    for name in FEATURE_COLUMNS:
+        np.testing.assert_allclose(tail[name], batch[name], rtol=1e-9, atol=1e-12, err_msg=name)
+
+
+def test_preview_does_not_commit(ohlcv):
+    engine = IncrementalFeatureEngine.from_frame(ohlcv.iloc[:-1])
+    candle = ohlcv.iloc[-1].to_dict()
+    preview = engine.preview(ohlcv.index[-1], candle)
+
+    assert engine.bars == len(ohlcv) - 1
+    assert preview == engine.append(ohlcv.index[-1], candle)
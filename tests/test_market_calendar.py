@@ -0,0 +1,31 @@
+import pandas as pd
+import pandas_market_calendars as mcal
+import pytest
+
+from src.python.utils.market_calendar import expected_bars
+
+
+@pytest.mark.parametrize('timeframe, frequency', [('1h', '1h'), ('5m', '5min')])
+def test_expected_bars_match_pandas_market_calendars(timeframe, frequency):
+    # 2024 has NYSE holidays (Thanksgiving, Christmas) and half-days (Jul 3, Nov 29, Dec 24)
+    schedule = mcal.get_calendar('NYSE').schedule('2024-01-01', '2024-12-31')
+    reference = mcal.date_range(schedule, frequency=frequency, closed='left', force_close=False)
+    bars = expected_bars('2024-01-01', '2024-12-31 23:59', timeframe, 'NYSE', 'traditional')
+    pd.testing.assert_index_equal(bars, reference.as_unit('ms'))
+
+
+def test_expected_bars_stop_at_early_close_and_skip_holidays():
+    bars = expected_bars('2024-11-27', '2024-12-27 23:59', '30m', 'NYSE', 'traditional')
+    dates = pd.Index(bars.date)
+    # Thanksgiving and Christmas have no session
+    assert not dates.isin([pd.Timestamp('2024-11-28').date(), pd.Timestamp('2024-12-25').date()]).any()
+    # 13:00 ET closes: last bar opens 17:30 UTC
+    half_day = bars[dates == pd.Timestamp('2024-11-29').date()]
+    assert half_day[0] == pd.Timestamp('2024-11-29 14:30', tz='UTC')
+    assert half_day[-1] == pd.Timestamp('2024-11-29 17:30', tz='UTC')
+    assert len(half_day) == 7
+
+
+def test_daily_bars_are_trading_dates():
+    bars = expected_bars('2024-12-23', '2024-12-27', '1d', 'NYSE', 'traditional')
+    assert list(bars.strftime('%Y-%m-%d')) == ['2024-12-23', '2024-12-24', '2024-12-26', '2024-12-27']
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from apps.api.utils.panel_features import compute_universe_features
+from apps.api.utils.technical_features import FEATURE_COLUMNS, MarketFeatureProcessor
+
+
+def test_panel_matches_per_symbol_batch(ohlcv):
+    frames = {
+        'AAA': ohlcv,
+        'BBB': ohlcv.assign(close=ohlcv['close'] * 1.5, high=ohlcv['high'] * 1.5, low=ohlcv['low'] * 1.5),
+        # Listed later: NaN-padded at the start of the panel
+        'CCC': ohlcv.iloc[300:].assign(volume=ohlcv['volume'].iloc[300:][::-1].to_numpy()),
+    }
+    panel = compute_universe_features(frames)
+    processor = MarketFeatureProcessor()
+
+    for symbol, frame in frames.items():
+        batch = processor.add_technical_features(frame)
+        rows = panel.xs(symbol, level='symbol')
+        pd.testing.assert_index_equal(rows.index, batch.index, check_names=False)
+        for name in FEATURE_COLUMNS:
+            np.testing.assert_allclose(rows[name], batch[name], rtol=1e-9, atol=1e-12, err_msg=f"{symbol} {name}")